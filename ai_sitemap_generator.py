@@ -5,9 +5,137 @@ This module generates AI-friendly sitemaps (llms.txt, .ai-sitemap) that help
 LLMs and AI agents discover and prioritize documentation content.
 """
 
+import heapq
 import json
-from typing import List, Dict, Any, Optional
+import os
+import re
+from string import Formatter
+from typing import List, Dict, Any, Iterable, Iterator, Optional, TextIO
 from datetime import datetime
+from urllib.parse import urlparse
+
+# Page metadata fields the sitemaps and reports read
+PAGE_SUMMARY_FIELDS = (
+    "url",
+    "title",
+    "description",
+    "content_type",
+    "keywords",
+    "last_updated",
+    "word_count",
+    "reading_time",
+    "code_blocks_count",
+)
+
+
+# Base AI priority by content type (unlisted types get 0.3)
+CONTENT_TYPE_WEIGHTS = {
+    "api_reference": 1.0,
+    "how_to": 0.9,
+    "tutorial": 0.8,
+    "reference": 0.7,
+    "faq": 0.6,
+    "troubleshooting": 0.6,
+    "conceptual": 0.5,
+    "general": 0.3,
+}
+
+# Sharded sitemaps: what pages are grouped by, and the index of the shards
+SHARD_KEYS = ("content_type", "path")
+SHARD_INDEX_FILE = "index.json"
+
+
+def _join_lines(lines: Iterable[str]) -> Iterator[str]:
+    """Yield lines with newlines between them, like "\\n".join"""
+
+    separator = ""
+    for line in lines:
+        yield separator
+        yield line
+        separator = "\n"
+
+
+def _shard_name(page: Dict[str, Any], shard_by: str, base_url: str) -> str:
+    """File-safe shard name for a page: its content type or first path segment"""
+
+    if shard_by == "content_type":
+        name = page.get("content_type") or "unknown"
+    else:
+        path = urlparse(page.get("url", "")).path
+        base_path = urlparse(base_url).path.rstrip("/")
+        if base_path and path.startswith(base_path):
+            path = path[len(base_path):]
+        name = path.strip("/").split("/", 1)[0] or "index"
+    return re.sub(r"[^A-Za-z0-9_.-]+", "_", name).strip(".") or "index"
+
+
+def load_sitemap_shard(directory: str, name: str) -> Optional[Dict[str, Any]]:
+    """Load one shard written by write_sharded_sitemap, or None if missing"""
+
+    with open(os.path.join(directory, SHARD_INDEX_FILE), "r", encoding="utf-8") as f:
+        index = json.load(f)
+    for shard in index["shards"]:
+        if shard["name"] == name:
+            with open(os.path.join(directory, shard["file"]), "r", encoding="utf-8") as f:
+                return json.load(f)
+    return None
+
+
+def calculate_page_priority(page: Dict[str, Any]) -> float:
+    """Calculate AI priority score for a page"""
+
+    score = 0.0
+
+    # Content type priority
+    ct = page.get("content_type", "general")
+    score += CONTENT_TYPE_WEIGHTS.get(ct, 0.3)
+
+    # Title quality (shorter, more descriptive titles score higher)
+    title = page.get("title", "")
+    if title:
+        title_length = len(title.split())
+        if 3 <= title_length <= 10:
+            score += 0.2
+        elif title_length > 15:
+            score -= 0.1
+
+    # Description quality
+    description = page.get("description", "")
+    if len(description) > 50:
+        score += 0.1
+
+    # Code content (higher for technical docs)
+    code_blocks = page.get("code_blocks_count", 0)
+    if code_blocks > 0:
+        score += min(0.2, code_blocks * 0.05)
+
+    # Freshness (recently updated pages score higher)
+    last_updated = page.get("last_updated")
+    if last_updated:
+        try:
+            # Simple heuristic: if it has a date, give slight boost
+            score += 0.05
+        except:
+            pass
+
+    return min(1.0, score)  # Cap at 1.0
+
+
+def summarize_page_metadata(metadata: Dict[str, Any]) -> Dict[str, Any]:
+    """Reduce full page metadata to what AISitemapGenerator uses
+
+    Crawlers keep one of these per page in memory, so the sitemaps can be
+    built without reading the metadata files back. It carries the page's
+    precomputed "priority".
+    """
+
+    summary = {field: metadata.get(field) for field in PAGE_SUMMARY_FIELDS}
+    api_endpoints = metadata.get("entities", {}).get("api_endpoints")
+    if api_endpoints:
+        summary["entities"] = {"api_endpoints": api_endpoints}
+    # Scored once here rather than by every output that ranks pages
+    summary["priority"] = calculate_page_priority(summary)
+    return summary
 
 
 class AISitemapGenerator:
@@ -66,29 +194,53 @@ This is a machine-readable sitemap for AI agents and LLMs to efficiently discove
     ) -> str:
         """Generate llms.txt format sitemap"""
 
-        # Sort pages by priority
-        sorted_pages = self._sort_pages_by_priority(pages_metadata)
-
-        # Generate content sections
-        type_summary = self._generate_type_summary(pages_metadata)
-        priority_pages = self._generate_priority_list(sorted_pages[:10])
-        page_list = self._generate_page_list(sorted_pages)
-        api_endpoints = self._generate_api_endpoints(pages_metadata)
-
-        # Fill template
-        content = self.templates["llms_txt"].format(
-            site_name=site_name,
-            base_url=base_url,
-            total_pages=len(pages_metadata),
-            last_updated=self._get_latest_update(pages_metadata),
-            generated_at=datetime.now().isoformat(),
-            type_summary=type_summary,
-            priority_pages=priority_pages,
-            page_list=page_list,
-            api_endpoints=api_endpoints,
-        )
+        return "".join(self.iter_llms_txt(pages_metadata, site_name, base_url))
+
+    def write_llms_txt(
+        self,
+        f: TextIO,
+        pages_metadata: List[Dict[str, Any]],
+        site_name: str = "Documentation",
+        base_url: str = "",
+    ):
+        """Stream llms.txt to an open text file, one line at a time"""
+
+        for chunk in self.iter_llms_txt(pages_metadata, site_name, base_url):
+            f.write(chunk)
 
-        return content
+    def iter_llms_txt(
+        self,
+        pages_metadata: List[Dict[str, Any]],
+        site_name: str = "Documentation",
+        base_url: str = "",
+    ) -> Iterator[str]:
+        """Yield llms.txt in pieces; the page lists are never joined in memory"""
+
+        fields = {
+            "site_name": site_name,
+            "base_url": base_url,
+            "total_pages": len(pages_metadata),
+            "last_updated": self._get_latest_update(pages_metadata),
+            "generated_at": datetime.now().isoformat(),
+        }
+        sections = {
+            "type_summary": lambda: self._iter_type_summary(pages_metadata),
+            "priority_pages": lambda: self._iter_priority_list(
+                self.top_pages(pages_metadata, 10)
+            ),
+            "page_list": lambda: self._iter_page_list(
+                self._sort_pages_by_priority(pages_metadata)
+            ),
+            "api_endpoints": lambda: self._iter_api_endpoints(pages_metadata),
+        }
+
+        # Walk the template, streaming the sections in place of their fields
+        for literal, field, _, _ in Formatter().parse(self.templates["llms_txt"]):
+            yield literal
+            if field in sections:
+                yield from _join_lines(sections[field]())
+            elif field is not None:
+                yield str(fields[field])
 
     def generate_ai_sitemap_json(
         self,
@@ -98,51 +250,129 @@ This is a machine-readable sitemap for AI agents and LLMs to efficiently discove
     ) -> Dict[str, Any]:
         """Generate JSON format AI sitemap"""
 
-        sitemap = self.templates["ai_sitemap_json"].copy()
+        sitemap = self._sitemap_header(site_name, base_url)
+        sitemap["mainEntity"] = [self._page_entity(page) for page in pages_metadata]
+        return sitemap
+
+    def write_ai_sitemap_json(
+        self,
+        f: TextIO,
+        pages_metadata: Iterable[Dict[str, Any]],
+        site_name: str = "Documentation",
+        base_url: str = "",
+    ):
+        """Stream the JSON sitemap to an open text file, one page at a time
+
+        The output is the same as json.dumps(generate_ai_sitemap_json(...),
+        indent=2).
+        """
+
+        header = json.dumps(self._sitemap_header(site_name, base_url), indent=2)
+        # Reopen the object to append mainEntity as its last member
+        f.write(header[: -len("\n}")])
+        f.write(',\n  "mainEntity": [')
+
+        separator = "\n    "
+        for page in pages_metadata:
+            entity = json.dumps(self._page_entity(page), indent=2)
+            f.write(separator)
+            f.write(entity.replace("\n", "\n    "))
+            separator = ",\n    "
+
+        f.write("]\n}" if separator == "\n    " else "\n  ]\n}")
+
+    def write_sharded_sitemap(
+        self,
+        directory: str,
+        pages_metadata: List[Dict[str, Any]],
+        site_name: str = "Documentation",
+        base_url: str = "",
+        shard_by: str = "content_type",
+    ) -> Dict[str, Any]:
+        """Write one JSON sitemap per content type or path prefix, plus an index
+
+        Shards go to `directory`/shard-<shard>.json, so that no shard name can
+        clash with the index in `directory`/index.json; see load_sitemap_shard.
+        Returns the index.
+        """
+
+        if shard_by not in SHARD_KEYS:
+            raise ValueError(
+                f"Unknown sitemap shard key '{shard_by}' "
+                f"(expected one of: {', '.join(SHARD_KEYS)})"
+            )
+
+        shards: Dict[str, List[Dict[str, Any]]] = {}
+        for page in pages_metadata:
+            shards.setdefault(_shard_name(page, shard_by, base_url), []).append(page)
+
+        os.makedirs(directory, exist_ok=True)
+        index = self._sitemap_header(site_name, base_url)
+        index["shardBy"] = shard_by
+        index["shards"] = []
+        for name, pages in sorted(shards.items()):
+            file_name = f"shard-{name}.json"
+            with open(os.path.join(directory, file_name), "w", encoding="utf-8") as f:
+                self.write_ai_sitemap_json(f, pages, site_name, base_url)
+            index["shards"].append({"name": name, "file": file_name, "pages": len(pages)})
+
+        with open(os.path.join(directory, SHARD_INDEX_FILE), "w", encoding="utf-8") as f:
+            json.dump(index, f, indent=2)
+
+        return index
+
+    def _sitemap_header(self, site_name: str, base_url: str) -> Dict[str, Any]:
+        """The sitemap template filled in, without its pages"""
+
+        sitemap = {
+            key: value
+            for key, value in self.templates["ai_sitemap_json"].items()
+            if key != "mainEntity"
+        }
         sitemap["name"] = sitemap["name"].format(site_name=site_name)
         sitemap["description"] = sitemap["description"].format(site_name=site_name)
         sitemap["url"] = base_url or sitemap["url"]
         sitemap["dateCreated"] = sitemap["dateCreated"].format(
             generated_at=datetime.now().isoformat()
         )
+        return sitemap
 
-        # Add pages as main entities
-        for page in pages_metadata:
-            page_entity = {
-                "@type": "WebPage",
-                "name": page.get("title", "Untitled"),
-                "url": page.get("url", ""),
-                "description": page.get("description", ""),
-                "keywords": page.get("keywords", [])[:5],  # Limit keywords
-                "dateModified": page.get("last_updated"),
-                "additionalProperty": [
-                    {
-                        "@type": "PropertyValue",
-                        "name": "contentType",
-                        "value": page.get("content_type", "unknown"),
-                    },
-                    {
-                        "@type": "PropertyValue",
-                        "name": "wordCount",
-                        "value": page.get("word_count", 0),
-                    },
-                    {
-                        "@type": "PropertyValue",
-                        "name": "readingTime",
-                        "value": page.get("reading_time", 0),
-                    },
-                ],
-            }
-
-            # Add priority score
-            priority = self._calculate_page_priority(page)
-            page_entity["additionalProperty"].append(
-                {"@type": "PropertyValue", "name": "aiPriority", "value": priority}
-            )
+    def _page_entity(self, page: Dict[str, Any]) -> Dict[str, Any]:
+        """A page as a schema.org WebPage for the JSON sitemap"""
+
+        page_entity = {
+            "@type": "WebPage",
+            "name": page.get("title", "Untitled"),
+            "url": page.get("url", ""),
+            "description": page.get("description", ""),
+            "keywords": page.get("keywords", [])[:5],  # Limit keywords
+            "dateModified": page.get("last_updated"),
+            "additionalProperty": [
+                {
+                    "@type": "PropertyValue",
+                    "name": "contentType",
+                    "value": page.get("content_type", "unknown"),
+                },
+                {
+                    "@type": "PropertyValue",
+                    "name": "wordCount",
+                    "value": page.get("word_count", 0),
+                },
+                {
+                    "@type": "PropertyValue",
+                    "name": "readingTime",
+                    "value": page.get("reading_time", 0),
+                },
+            ],
+        }
 
-            sitemap["mainEntity"].append(page_entity)
+        # Add priority score
+        priority = self._page_priority(page)
+        page_entity["additionalProperty"].append(
+            {"@type": "PropertyValue", "name": "aiPriority", "value": priority}
+        )
 
-        return sitemap
+        return page_entity
 
     def generate_navigation_index(
         self, pages_metadata: List[Dict[str, Any]], base_url: str = ""
@@ -279,9 +509,7 @@ This is a machine-readable sitemap for AI agents and LLMs to efficiently discove
         # Add content type sections
         for content_type, pages in grouped_pages.items():
             # Sort pages by priority
-            pages_sorted = sorted(
-                pages, key=self._calculate_page_priority, reverse=True
-            )
+            pages_sorted = self._sort_pages_by_priority(pages)
 
             html_parts.append(f"""
     <div class="content-type">
@@ -289,9 +517,8 @@ This is a machine-readable sitemap for AI agents and LLMs to efficiently discove
         <ul class="page-list">""")
 
             for page in pages_sorted:
-                priority_class = self._get_priority_class(
-                    self._calculate_page_priority(page)
-                )
+                priority = self._page_priority(page)
+                priority_class = self._get_priority_class(priority)
                 reading_time = page.get("reading_time", 0)
                 word_count = page.get("word_count", 0)
 
@@ -300,7 +527,7 @@ This is a machine-readable sitemap for AI agents and LLMs to efficiently discove
                 <a href="{page.get("url", "#")}" class="page-link">
                     <div class="page-title">{page.get("title", "Untitled")}</div>
                     <div class="page-meta">
-                        <span class="ai-priority {priority_class}">Priority: {self._calculate_page_priority(page)}</span>
+                        <span class="ai-priority {priority_class}">Priority: {priority}</span>
                         • {reading_time} min read • {word_count:,} words
                     </div>
                     {f'<div class="page-description">{page.get("description", "")[:150]}...</div>' if page.get("description") else ""}
@@ -363,123 +590,76 @@ This is a machine-readable sitemap for AI agents and LLMs to efficiently discove
     ) -> List[Dict[str, Any]]:
         """Sort pages by AI priority score"""
 
-        return sorted(pages_metadata, key=self._calculate_page_priority, reverse=True)
+        return sorted(pages_metadata, key=self._page_priority, reverse=True)
 
-    def _calculate_page_priority(self, page: Dict[str, Any]) -> float:
-        """Calculate AI priority score for a page"""
+    def top_pages(
+        self, pages_metadata: List[Dict[str, Any]], k: int
+    ) -> List[Dict[str, Any]]:
+        """The k highest-priority pages, in the order a full sort would give"""
 
-        score = 0.0
+        return heapq.nlargest(k, pages_metadata, key=self._page_priority)
 
-        # Content type priority
-        content_type_weights = {
-            "api_reference": 1.0,
-            "how_to": 0.9,
-            "tutorial": 0.8,
-            "reference": 0.7,
-            "faq": 0.6,
-            "troubleshooting": 0.6,
-            "conceptual": 0.5,
-            "general": 0.3,
-        }
+    def _page_priority(self, page: Dict[str, Any]) -> float:
+        """A page's AI priority, precomputed on summaries from summarize_page_metadata"""
+
+        priority = page.get("priority")
+        return priority if priority is not None else calculate_page_priority(page)
 
-        ct = page.get("content_type", "general")
-        score += content_type_weights.get(ct, 0.3)
-
-        # Title quality (shorter, more descriptive titles score higher)
-        title = page.get("title", "")
-        if title:
-            title_length = len(title.split())
-            if 3 <= title_length <= 10:
-                score += 0.2
-            elif title_length > 15:
-                score -= 0.1
-
-        # Description quality
-        description = page.get("description", "")
-        if len(description) > 50:
-            score += 0.1
-
-        # Code content (higher for technical docs)
-        code_blocks = page.get("code_blocks_count", 0)
-        if code_blocks > 0:
-            score += min(0.2, code_blocks * 0.05)
-
-        # Freshness (recently updated pages score higher)
-        last_updated = page.get("last_updated")
-        if last_updated:
-            try:
-                # Simple heuristic: if it has a date, give slight boost
-                score += 0.05
-            except:
-                pass
-
-        return min(1.0, score)  # Cap at 1.0
-
-    def _generate_type_summary(self, pages_metadata: List[Dict[str, Any]]) -> str:
-        """Generate content type summary for llms.txt"""
+    def _iter_type_summary(self, pages_metadata: List[Dict[str, Any]]) -> Iterator[str]:
+        """Generate content type summary lines for llms.txt"""
 
         content_types = {}
         for page in pages_metadata:
             ct = page.get("content_type", "unknown")
             content_types[ct] = content_types.get(ct, 0) + 1
 
-        summary_lines = []
         for ct, count in sorted(
             content_types.items(), key=lambda x: x[1], reverse=True
         ):
-            summary_lines.append(f"- **{ct.replace('_', ' ').title()}**: {count} pages")
-
-        return "\n".join(summary_lines)
+            yield f"- **{ct.replace('_', ' ').title()}**: {count} pages"
 
-    def _generate_priority_list(self, priority_pages: List[Dict[str, Any]]) -> str:
-        """Generate priority pages list for llms.txt"""
+    def _iter_priority_list(self, priority_pages: List[Dict[str, Any]]) -> Iterator[str]:
+        """Generate priority pages lines for llms.txt"""
 
-        lines = []
         for i, page in enumerate(priority_pages[:10], 1):
             title = page.get("title", "Untitled")
             url = page.get("url", "")
             ct = page.get("content_type", "unknown")
-            lines.append(f"{i}. **{title}** ({ct.replace('_', ' ')}) - {url}")
+            yield f"{i}. **{title}** ({ct.replace('_', ' ')}) - {url}"
 
-        return "\n".join(lines)
+    def _iter_page_list(self, sorted_pages: List[Dict[str, Any]]) -> Iterator[str]:
+        """Generate complete page list lines for llms.txt"""
 
-    def _generate_page_list(self, sorted_pages: List[Dict[str, Any]]) -> str:
-        """Generate complete page list for llms.txt"""
-
-        lines = []
         for page in sorted_pages:
             title = page.get("title", "Untitled")
             url = page.get("url", "")
             ct = page.get("content_type", "unknown")
-            lines.append(f"- [{title}]({url}) - {ct.replace('_', ' ')}")
-
-        return "\n".join(lines)
+            yield f"- [{title}]({url}) - {ct.replace('_', ' ')}"
 
-    def _generate_api_endpoints(self, pages_metadata: List[Dict[str, Any]]) -> str:
-        """Extract and list API endpoints for llms.txt"""
+    def _iter_api_endpoints(self, pages_metadata: List[Dict[str, Any]]) -> Iterator[str]:
+        """Extract and list API endpoint lines for llms.txt"""
 
         api_pages = [
             p for p in pages_metadata if p.get("content_type") == "api_reference"
         ]
 
         if not api_pages:
-            return "No dedicated API documentation pages found."
+            yield "No dedicated API documentation pages found."
+            return
 
-        endpoints = []
+        found = False
         for page in api_pages:
             title = page.get("title", "")
             url = page.get("url", "")
             entities = page.get("entities", {}).get("api_endpoints", [])
             if entities:
-                endpoints.append(f"- **{title}**: {url}")
+                found = True
+                yield f"- **{title}**: {url}"
                 for endpoint in entities[:5]:  # Limit to 5 per page
-                    endpoints.append(f"  - `{endpoint}`")
+                    yield f"  - `{endpoint}`"
 
-        return (
-            "\n".join(endpoints)
-            if endpoints
-            else "API endpoints found in documentation pages."
-        )
+        if not found:
+            yield "API endpoints found in documentation pages."
 
     def _get_latest_update(self, pages_metadata: List[Dict[str, Any]]) -> Optional[str]:
         """Get the latest update date from all pages"""
@@ -0,0 +1,393 @@
+#!/usr/bin/env python3
+"""
+End-to-end crawl throughput benchmark against a synthetic docs site
+
+Starts a local aiohttp server (in its own process) serving a generated
+documentation site, runs DocumentationCrawler.crawl against it and reports
+pages/s, per-page latency, CPU time, peak RSS, bytes written and the
+per-stage timings from crawl_metrics. The site is generated from --seed,
+so runs with the same options are comparable across commits.
+
+    python benchmarks/crawl_throughput.py [--pages 200] [--fanout 8]
+        [--page-size 20] [--images 2] [--latency 20] [--error-rate 0.01]
+
+Per-page latency is measured from the server receiving the page request
+(the last attempt, if it was retried) to the crawler reporting the page
+done, so it includes processing, output writes and asset downloads. CPU
+time and peak RSS come from the resource module (Linux/macOS only).
+"""
+
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import random
+import resource
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from aiohttp import web  # noqa: E402
+
+from crawler import DocumentationCrawler  # noqa: E402
+
+WORDS = (
+    "install configure request response client server endpoint token "
+    "session cache header payload schema field value option default "
+    "module function method class instance return error timeout retry "
+    "stream buffer queue worker process thread async await parse render"
+).split()
+
+
+class SyntheticSite:
+    """Deterministic documentation site generated from the benchmark options"""
+
+    def __init__(self, args):
+        self.args = args
+        self.pages = args.pages
+
+    def _rng(self, *key) -> random.Random:
+        return random.Random(f"{self.args.seed}:{':'.join(map(str, key))}")
+
+    def links(self, index: int):
+        """A tree (so every page is reachable) topped up with random links"""
+        fanout = self.args.fanout
+        links = [
+            child
+            for child in range(index * fanout + 1, index * fanout + fanout + 1)
+            if child < self.pages
+        ]
+        rng = self._rng("links", index)
+        while len(links) < min(fanout, self.pages - 1):
+            target = rng.randrange(self.pages)
+            if target != index and target not in links:
+                links.append(target)
+        return links
+
+    def assets(self, index: int):
+        rng = self._rng("assets", index)
+        pool = self.args.asset_pool
+        return {
+            kind: [rng.randrange(pool) for _ in range(count)]
+            for kind, count in (
+                ("css", self.args.stylesheets),
+                ("js", self.args.scripts),
+                ("img", self.args.images),
+            )
+        }
+
+    def is_broken(self, index: int) -> bool:
+        """Pages that always answer 500 (never the start page)"""
+        return index != 0 and self._rng("error", index).random() < self.args.error_rate
+
+    def page(self, index: int) -> str:
+        rng = self._rng("page", index)
+        assets = self.assets(index)
+        head = "".join(
+            f'<link rel="stylesheet" href="/static/style{n}.css">'
+            for n in assets["css"]
+        ) + "".join(
+            f'<script src="/static/script{n}.js"></script>' for n in assets["js"]
+        )
+        nav = "".join(
+            f'<li><a href="/docs/page{n}">Page {n}</a></li>' for n in self.links(index)
+        )
+
+        body = [f"<h1>Page {index} guide</h1>"]
+        target = self.args.page_size * 1024
+        size = 0
+        section = 0
+        while size < target:
+            section += 1
+            words = " ".join(rng.choice(WORDS) for _ in range(80))
+            code = "\n".join(
+                f"    {rng.choice(WORDS)}_{n} = {rng.choice(WORDS)}()" for n in range(6)
+            )
+            block = (
+                f"<h2>Section {section}</h2><p>{words}.</p>"
+                f'<pre><code class="language-python">def example():\n{code}'
+                f"</code></pre>"
+            )
+            if section <= len(assets["img"]):
+                block += f'<img src="/static/image{assets["img"][section - 1]}.png">'
+            body.append(block)
+            size += len(block)
+
+        return (
+            f"<!DOCTYPE html><html><head><title>Page {index} guide</title>"
+            f'<meta name="description" content="Synthetic documentation page {index} '
+            f'used to benchmark the crawler.">{head}</head><body><nav><ul>{nav}</ul>'
+            f'</nav><main>{"".join(body)}</main></body></html>'
+        )
+
+
+def run_server(args, port_conn, stop_conn):
+    """Serve the synthetic site until told to stop, then send request times"""
+
+    site = SyntheticSite(args)
+    rng = random.Random(args.seed)
+    arrivals = {}
+    image = b"\x89PNG\r\n\x1a\n" + bytes(args.image_size * 1024)
+
+    async def delay():
+        if args.latency:
+            jitter = args.latency * args.jitter
+            await asyncio.sleep(
+                max(0.0, args.latency + rng.uniform(-jitter, jitter)) / 1000
+            )
+
+    async def page(request):
+        name = request.match_info["name"]
+        index = int(name[len("page") :])
+        if index >= site.pages:
+            raise web.HTTPNotFound()
+        arrivals[request.path] = time.time()
+        await delay()
+        if rng.random() < args.throttle_rate:
+            return web.Response(status=429, headers={"Retry-After": "0"})
+        if site.is_broken(index):
+            return web.Response(status=500, text="Internal Server Error")
+        return web.Response(text=site.page(index), content_type="text/html")
+
+    async def asset(request):
+        await delay()
+        name = request.match_info["name"]
+        if name.endswith(".css"):
+            return web.Response(
+                text="body { margin: 0; }\n" * 50, content_type="text/css"
+            )
+        if name.endswith(".js"):
+            return web.Response(
+                text="function f() { return 1; }\n" * 50,
+                content_type="application/javascript",
+            )
+        return web.Response(body=image, content_type="image/png")
+
+    async def robots(request):
+        return web.Response(text="User-agent: *\nAllow: /\n")
+
+    async def serve():
+        app = web.Application()
+        app.router.add_get("/docs/{name}", page)
+        app.router.add_get("/static/{name}", asset)
+        app.router.add_get("/robots.txt", robots)
+        runner = web.AppRunner(app, access_log=None)
+        await runner.setup()
+        tcp_site = web.TCPSite(runner, "127.0.0.1", args.port)
+        await tcp_site.start()
+        port_conn.send(runner.addresses[0][1])
+
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, stop_conn.recv)
+        stop_conn.send(arrivals)
+        await runner.cleanup()
+
+    asyncio.run(serve())
+
+
+async def crawl(args, port: int):
+    """Run one crawl, returning its result and when each page finished"""
+
+    crawler = DocumentationCrawler(
+        f"http://127.0.0.1:{port}/docs/page0",
+        max_depth=args.max_depth,
+        rate_limit=0.0,
+        output_formats=args.formats.split(","),
+        concurrency=args.concurrency,
+        per_host_concurrency=args.concurrency,
+        incremental=False,
+        process_workers=args.process_workers,
+        output_mode=args.output_mode,
+        write_workers=args.write_workers,
+    )
+    finished = {}
+    events = crawler.subscribe(max_events=100000)
+
+    async def collect():
+        while True:
+            event = await events.get()
+            if event["type"] == "page":
+                finished[event["url"]] = time.time()
+
+    collector = asyncio.create_task(collect())
+    started = time.perf_counter()
+    result = await crawler.crawl()
+    elapsed = time.perf_counter() - started
+    await asyncio.sleep(0)
+    collector.cancel()
+    return result, elapsed, finished
+
+
+def directory_size(path: str):
+    total = 0
+    files = 0
+    for root, _, names in os.walk(path):
+        for name in names:
+            total += os.path.getsize(os.path.join(root, name))
+            files += 1
+    return total, files
+
+
+def percentile(values, fraction: float) -> float:
+    if not values:
+        return 0.0
+    if len(values) == 1:
+        return values[0]
+    return statistics.quantiles(values, n=100)[int(fraction * 100) - 1]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark end-to-end crawling")
+    site = parser.add_argument_group("synthetic site")
+    site.add_argument("--pages", type=int, default=200, help="Number of pages")
+    site.add_argument("--fanout", type=int, default=8, help="Links per page")
+    site.add_argument("--page-size", type=int, default=20, help="Page body in KB")
+    site.add_argument("--stylesheets", type=int, default=1, help="CSS per page")
+    site.add_argument("--scripts", type=int, default=1, help="Scripts per page")
+    site.add_argument("--images", type=int, default=2, help="Images per page")
+    site.add_argument(
+        "--asset-pool", type=int, default=20, help="Distinct assets of each kind"
+    )
+    site.add_argument("--image-size", type=int, default=16, help="Image size in KB")
+    site.add_argument(
+        "--latency", type=float, default=20.0, help="Response delay in ms"
+    )
+    site.add_argument(
+        "--jitter", type=float, default=0.5, help="Latency jitter (fraction)"
+    )
+    site.add_argument(
+        "--error-rate", type=float, default=0.0, help="Pages answering 500"
+    )
+    site.add_argument(
+        "--throttle-rate", type=float, default=0.0, help="Requests answered 429"
+    )
+    site.add_argument("--seed", type=int, default=1, help="Site generation seed")
+    site.add_argument("--port", type=int, default=0, help="Server port (0 = any free)")
+    crawl_group = parser.add_argument_group("crawler")
+    crawl_group.add_argument("--concurrency", type=int, default=4)
+    crawl_group.add_argument(
+        "--process-workers", type=int, default=None, help="0 = parse inline"
+    )
+    crawl_group.add_argument("--max-depth", type=int, default=50)
+    crawl_group.add_argument(
+        "--output-mode", choices=["files", "pack"], default="files"
+    )
+    crawl_group.add_argument(
+        "--write-workers", type=int, default=2, help="Output writer tasks"
+    )
+    crawl_group.add_argument(
+        "--formats", default="html,markdown,json,chunks", help="Output formats"
+    )
+    parser.add_argument("--keep", action="store_true", help="Keep the crawl output")
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON")
+    args = parser.parse_args()
+
+    port_conn, port_child = multiprocessing.Pipe()
+    stop_conn, stop_child = multiprocessing.Pipe()
+    server = multiprocessing.Process(
+        target=run_server, args=(args, port_child, stop_child), daemon=True
+    )
+    server.start()
+    port = port_conn.recv()
+
+    workdir = tempfile.mkdtemp(prefix="crawl-bench-")
+    cwd = os.getcwd()
+    os.chdir(workdir)
+    try:
+        self_before = resource.getrusage(resource.RUSAGE_SELF)
+        children_before = resource.getrusage(resource.RUSAGE_CHILDREN)
+        result, elapsed, finished = asyncio.run(crawl(args, port))
+        # The process pool has been shut down, so its workers are included
+        self_after = resource.getrusage(resource.RUSAGE_SELF)
+        children_after = resource.getrusage(resource.RUSAGE_CHILDREN)
+
+        stop_conn.send(True)
+        arrivals = stop_conn.recv()
+        server.join()
+
+        output_path = os.path.join(workdir, result["output_path"])
+        bytes_written, files_written = directory_size(output_path)
+    finally:
+        os.chdir(cwd)
+        if server.is_alive():
+            server.terminate()
+
+    latencies = []
+    for url, done in finished.items():
+        path = url.split(str(port), 1)[-1]
+        if path in arrivals:
+            latencies.append((done - arrivals[path]) * 1000)
+
+    cpu_main = (self_after.ru_utime - self_before.ru_utime) + (
+        self_after.ru_stime - self_before.ru_stime
+    )
+    cpu_workers = (children_after.ru_utime - children_before.ru_utime) + (
+        children_after.ru_stime - children_before.ru_stime
+    )
+    pages = result["pages_downloaded"]
+    report = {
+        "pages": pages,
+        "errors": len(result["errors"]),
+        "seconds": round(elapsed, 3),
+        "pages_per_second": round(pages / elapsed, 2) if elapsed else 0.0,
+        "latency_p50_ms": round(percentile(latencies, 0.50), 2),
+        "latency_p95_ms": round(percentile(latencies, 0.95), 2),
+        "cpu_seconds": round(cpu_main + cpu_workers, 3),
+        "cpu_seconds_workers": round(cpu_workers, 3),
+        # ru_maxrss is in KB on Linux
+        "peak_rss_mb": round(self_after.ru_maxrss / 1024, 1),
+        "peak_rss_workers_mb": round(children_after.ru_maxrss / 1024, 1),
+        "bytes_written": bytes_written,
+        "files_written": files_written,
+        "stages_ms": {
+            stage: round(values["mean_seconds"] * 1000, 3)
+            for stage, values in result.get("metrics", {}).get("stages", {}).items()
+            if values["count"]
+        },
+    }
+
+    if args.keep:
+        report["output_path"] = output_path
+    else:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+
+    print(
+        f"{args.pages} pages, fan-out {args.fanout}, {args.page_size} KB/page, "
+        f"{args.latency:g}ms latency, {args.error_rate:.0%} errors, "
+        f"{args.throttle_rate:.0%} throttled\n"
+    )
+    print(f"Pages crawled:    {pages} ({report['errors']} errors)")
+    print(f"Wall time:        {report['seconds']:.2f}s")
+    print(f"Throughput:       {report['pages_per_second']:.1f} pages/s")
+    print(
+        f"Page latency:     p50 {report['latency_p50_ms']:.1f}ms, "
+        f"p95 {report['latency_p95_ms']:.1f}ms"
+    )
+    print(
+        f"CPU time:         {report['cpu_seconds']:.2f}s "
+        f"({report['cpu_seconds_workers']:.2f}s in worker processes)"
+    )
+    print(
+        f"Peak RSS:         {report['peak_rss_mb']:.1f} MB "
+        f"(workers {report['peak_rss_workers_mb']:.1f} MB)"
+    )
+    print(
+        f"Bytes written:    {bytes_written / 1024 / 1024:.2f} MB "
+        f"in {files_written} files"
+    )
+    print("\nMean time per stage:")
+    for stage, ms in report["stages_ms"].items():
+        print(f"  {stage:<10} {ms:>9.3f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Benchmark HTML parser backends on saved documentation pages
+
+Parses every saved .html page under downloads/ with each available
+backend and reports per-page parse time, plus the time for the full
+page analysis (parse + ContentExtractor.analyze_page + Markdown).
+
+    python benchmarks/parser_backends.py [--root downloads] [--limit 200]
+"""
+
+import argparse
+import glob
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from content_extractor import ContentExtractor  # noqa: E402
+from html_backend import available_backends, parse_html  # noqa: E402
+
+
+def load_pages(root: str, limit: int):
+    """Read up to `limit` saved HTML pages"""
+
+    paths = sorted(glob.glob(os.path.join(root, "**", "*.html"), recursive=True))
+    pages = []
+    for path in paths[:limit] if limit else paths:
+        with open(path, "r", encoding="utf-8", errors="ignore") as f:
+            pages.append(f.read())
+    return pages
+
+
+def benchmark(pages, backend: str, extractor: ContentExtractor):
+    """Per-page parse and analysis times in milliseconds"""
+
+    parse_times = []
+    analysis_times = []
+    for html in pages:
+        start = time.perf_counter()
+        soup = parse_html(html, backend)
+        parsed = time.perf_counter()
+        analysis = extractor.analyze_page(soup, "https://example.com/docs/page")
+        extractor.render_markdown(analysis)
+        done = time.perf_counter()
+
+        parse_times.append((parsed - start) * 1000)
+        analysis_times.append((done - start) * 1000)
+    return parse_times, analysis_times
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark HTML parser backends")
+    parser.add_argument("--root", default="downloads", help="Directory of saved pages")
+    parser.add_argument("--limit", type=int, default=0, help="Max pages (0 = all)")
+    args = parser.parse_args()
+
+    pages = load_pages(args.root, args.limit)
+    if not pages:
+        print(f"No .html pages found under {args.root}", file=sys.stderr)
+        sys.exit(1)
+
+    total_kb = sum(len(html) for html in pages) / 1024
+    print(f"{len(pages)} pages, {total_kb / len(pages):.1f} KB average\n")
+
+    extractor = ContentExtractor()
+    results = {}
+    for backend in available_backends():
+        results[backend] = benchmark(pages, backend, extractor)
+
+    print(
+        f"{'BACKEND':<14} {'PARSE MEAN':>12} {'PARSE P50':>11} "
+        f"{'PARSE P95':>11} {'+ANALYSIS':>11}"
+    )
+    print("-" * 63)
+    for backend, (parse_times, analysis_times) in results.items():
+        p95 = (
+            statistics.quantiles(parse_times, n=20)[-1]
+            if len(parse_times) > 1
+            else parse_times[0]
+        )
+        print(
+            f"{backend:<14} {statistics.mean(parse_times):>10.2f}ms "
+            f"{statistics.median(parse_times):>9.2f}ms {p95:>9.2f}ms "
+            f"{statistics.mean(analysis_times):>9.2f}ms"
+        )
+
+    if "html.parser" in results and len(results) > 1:
+        baseline = statistics.mean(results["html.parser"][0])
+        print()
+        for backend, (parse_times, _) in results.items():
+            if backend != "html.parser":
+                speedup = baseline / statistics.mean(parse_times)
+                print(f"{backend} parses {speedup:.2f}x faster than html.parser")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+"""
+Benchmark section extraction on the largest saved documentation pages
+
+Parses the largest .html pages under downloads/ (by file size, or by
+number of headings with --by headings) and times
+ContentExtractor._extract_sections on them: the heading hierarchy with
+section text that feeds the JSON output and the chunker. Each page is
+also timed with the previous implementation, which scanned the siblings
+of every heading separately, and the two are shown side by side. Pages
+with many headings are where the per-heading scan shows.
+
+    python benchmarks/section_extraction.py [--root downloads] [--top 10]
+        [--by size|headings] [--repeat 5]
+"""
+
+import argparse
+import glob
+import os
+import statistics
+import sys
+import time
+
+from bs4 import NavigableString, Tag
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from content_extractor import ContentExtractor  # noqa: E402
+from html_backend import default_backend, parse_html  # noqa: E402
+from page_analysis import collect_dom_stats  # noqa: E402
+
+
+def per_heading_sections(soup, headings):
+    """The previous _extract_sections: one sibling scan per heading"""
+
+    sections = []
+    current_section = None
+
+    for heading in headings:
+        level = int(heading.name[1])
+        title = heading.get_text(strip=True)
+        if not title:
+            continue
+
+        section = {
+            "level": level,
+            "title": title,
+            "content": per_heading_content(heading, headings),
+            "id": heading.get("id", ""),
+            "subsections": [],
+        }
+
+        if level == 1:
+            sections.append(section)
+            current_section = section
+        elif level == 2 and sections:
+            sections[-1]["subsections"].append(section)
+            current_section = section
+        elif level > 2 and current_section:
+            current_section["subsections"].append(section)
+
+    return sections
+
+
+def per_heading_content(heading, all_headings) -> str:
+    """The previous _extract_section_content: siblings up to the next heading"""
+
+    content_parts = []
+    current = heading.next_sibling
+
+    try:
+        current_index = all_headings.index(heading)
+        next_heading = (
+            all_headings[current_index + 1]
+            if current_index + 1 < len(all_headings)
+            else None
+        )
+    except ValueError:
+        next_heading = None
+
+    while current:
+        if current == next_heading:
+            break
+
+        if isinstance(current, NavigableString):
+            text = str(current).strip()
+            if text:
+                content_parts.append(text)
+        elif isinstance(current, Tag):
+            if current.name in ["p", "div", "section", "article"]:
+                text = current.get_text(strip=True)
+                if text:
+                    content_parts.append(text)
+            elif current.name == "ul":
+                items = [li.get_text(strip=True) for li in current.find_all("li")]
+                if items:
+                    content_parts.append("• " + "\n• ".join(items))
+            elif current.name == "ol":
+                items = [li.get_text(strip=True) for li in current.find_all("li")]
+                if items:
+                    content_parts.append("1. " + "\n2. ".join(items))
+
+        current = current.next_sibling
+
+    return "\n\n".join(content_parts)
+
+
+def largest_pages(root: str, top: int, by: str, backend: str):
+    """The `top` largest saved HTML pages as (path, soup), largest first"""
+
+    paths = glob.glob(os.path.join(root, "**", "*.html"), recursive=True)
+    if by == "size":
+        paths = sorted(paths, key=os.path.getsize, reverse=True)[:top]
+
+    pages = []
+    for path in paths:
+        with open(path, "r", encoding="utf-8", errors="ignore") as f:
+            pages.append((path, parse_html(f.read(), backend)))
+
+    if by == "headings":
+        pages.sort(key=lambda page: len(collect_dom_stats(page[1]).headings))
+        pages = pages[::-1][:top]
+    return pages
+
+
+def benchmark(extract, soup, headings, repeat: int):
+    """Best of `repeat` runs of `extract` in milliseconds, and the sections found"""
+
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        sections = extract(soup, headings)
+        times.append((time.perf_counter() - start) * 1000)
+    return min(times), sections
+
+
+def count_sections(sections) -> int:
+    return sum(1 + count_sections(section["subsections"]) for section in sections)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark section extraction")
+    parser.add_argument("--root", default="downloads", help="Directory of saved pages")
+    parser.add_argument("--top", type=int, default=10, help="Largest pages to time")
+    parser.add_argument(
+        "--by", choices=["size", "headings"], default="size", help="Page size measure"
+    )
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per page")
+    args = parser.parse_args()
+
+    backend = default_backend()
+    pages = largest_pages(args.root, args.top, args.by, backend)
+    if not pages:
+        print(f"No .html pages found under {args.root}", file=sys.stderr)
+        sys.exit(1)
+
+    extractor = ContentExtractor()
+    print(
+        f"{len(pages)} largest pages by {args.by} under {args.root}, "
+        f"parsed with {backend}\n"
+    )
+    print(
+        f"{'PAGE':<40} {'KB':>6} {'HEADINGS':>9} {'SECTIONS':>9} "
+        f"{'PER-HEADING':>12} {'ONE WALK':>10} {'SPEEDUP':>8}"
+    )
+    print("-" * 100)
+
+    old_times = []
+    new_times = []
+    for path, soup in pages:
+        headings = collect_dom_stats(soup).headings
+        old, _ = benchmark(per_heading_sections, soup, headings, args.repeat)
+        new, sections = benchmark(
+            extractor._extract_sections, soup, headings, args.repeat
+        )
+        old_times.append(old)
+        new_times.append(new)
+
+        name = os.path.relpath(path, args.root)
+        if len(name) > 40:
+            name = "..." + name[-37:]
+        print(
+            f"{name:<40} {os.path.getsize(path) / 1024:>6.0f} {len(headings):>9} "
+            f"{count_sections(sections):>9} {old:>10.2f}ms {new:>8.2f}ms "
+            f"{old / new if new else float('inf'):>7.1f}x"
+        )
+
+    print(
+        f"\nPer-heading total {sum(old_times):.1f}ms, "
+        f"mean {statistics.mean(old_times):.2f}ms per page"
+    )
+    print(
+        f"One walk total {sum(new_times):.1f}ms, "
+        f"mean {statistics.mean(new_times):.2f}ms per page"
+    )
+    if sum(new_times):
+        print(f"One walk is {sum(old_times) / sum(new_times):.2f}x faster overall")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""
+Content-Addressed Blob Store for Crawl Assets
+
+This module keeps one copy of every binary asset (CSS, JS, fonts, images)
+under downloads/.blobs, named by its SHA-256 hash. Crawl directories get
+hard links to the blobs, so an unchanged stylesheet shared by many crawls
+of the same site takes disk space once.
+
+The hard link count is the reference count: a blob whose only remaining
+link is the store's own has no crawl using it, and collect_garbage()
+deletes it. Where hard links are not supported (some filesystems, or the
+per-inode link limit), files are copied and simply not deduplicated.
+"""
+
+import os
+import shutil
+from typing import Dict
+
+BLOB_DIR = ".blobs"
+
+
+class BlobStore:
+    """SHA-256 keyed blobs shared by hard link between crawl directories"""
+
+    def __init__(self, root: str):
+        self.root = root
+
+    @classmethod
+    def for_crawl(cls, crawl_dir: str) -> "BlobStore":
+        """The store shared by a crawl directory and its sibling crawls"""
+
+        parent = os.path.dirname(os.path.normpath(crawl_dir))
+        return cls(os.path.join(parent, BLOB_DIR))
+
+    def path(self, digest: str) -> str:
+        """Location of a blob, fanned out by the first two hex digits"""
+
+        return os.path.join(self.root, digest[:2], digest)
+
+    def link(self, source: str, digest: str, dest: str):
+        """Make `dest` a link to the blob for `digest`
+
+        If the store has no such blob yet, `source` (a file with that
+        content) becomes it. `source` itself is left in place.
+        """
+
+        blob_path = self.path(digest)
+        os.makedirs(os.path.dirname(blob_path), exist_ok=True)
+
+        # Two attempts: collect_garbage() may remove the blob in between
+        for _ in range(2):
+            try:
+                os.link(source, blob_path)
+            except FileExistsError:
+                pass
+            except OSError:
+                break
+
+            if os.path.lexists(dest):
+                os.remove(dest)
+            try:
+                os.link(blob_path, dest)
+                return
+            except FileNotFoundError:
+                continue
+            except OSError:
+                break
+
+        # No hard links here: keep a private copy
+        shutil.copyfile(source, dest)
+
+    def collect_garbage(self) -> Dict[str, int]:
+        """Delete blobs no crawl directory links to any more"""
+
+        removed = 0
+        freed = 0
+        if not os.path.isdir(self.root):
+            return {"blobs_removed": 0, "bytes_freed": 0}
+
+        for fanout in os.listdir(self.root):
+            fanout_dir = os.path.join(self.root, fanout)
+            if not os.path.isdir(fanout_dir):
+                continue
+            for name in os.listdir(fanout_dir):
+                blob_path = os.path.join(fanout_dir, name)
+                try:
+                    stat = os.stat(blob_path)
+                except OSError:
+                    continue
+                if stat.st_nlink <= 1:
+                    os.remove(blob_path)
+                    removed += 1
+                    freed += stat.st_size
+            if not os.listdir(fanout_dir):
+                os.rmdir(fanout_dir)
+
+        return {"blobs_removed": removed, "bytes_freed": freed}
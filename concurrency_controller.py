@@ -0,0 +1,154 @@
+"""
+Adaptive Concurrency Controller for the Documentation Crawler
+
+This module limits how many requests may be in flight to one host. In
+adaptive mode the limit follows AIMD (additive increase, multiplicative
+decrease): it grows by one while the p95 fetch latency stays flat and is
+cut multiplicatively on timeouts, 429s and 5xx responses.
+"""
+
+import asyncio
+import math
+from collections import deque
+from typing import Any, Deque, Dict, Optional
+
+
+class AdaptiveConcurrencyLimit:
+    """Per-host in-flight request limit driven by observed latency and errors"""
+
+    def __init__(
+        self,
+        initial: int,
+        minimum: int = 1,
+        maximum: int = 32,
+        adaptive: bool = True,
+        window: int = 20,
+        latency_tolerance: float = 1.5,
+        decrease_factor: float = 0.5,
+    ):
+        self.minimum = max(1, minimum)
+        self.maximum = max(self.minimum, maximum)
+        self.limit = float(min(max(initial, self.minimum), self.maximum))
+        self.adaptive = adaptive
+        self.window = window  # Samples per latency evaluation
+        self.latency_tolerance = latency_tolerance  # p95 growth still "flat"
+        self.decrease_factor = decrease_factor
+
+        self.in_flight = 0
+        self._waiters: Deque[asyncio.Future] = deque()
+
+        self.latencies: Deque[float] = deque(maxlen=window)
+        self.baseline_p95: Optional[float] = None
+        self.last_p95: Optional[float] = None
+        self._samples_since_decrease = 0
+
+        # Statistics
+        self.increases = 0
+        self.decreases = 0
+        self.failures = 0
+
+    @property
+    def current_limit(self) -> int:
+        """Number of requests currently allowed in flight"""
+        return int(self.limit)
+
+    async def acquire(self):
+        """Wait for a free slot"""
+
+        while self.in_flight >= self.current_limit:
+            waiter = asyncio.get_running_loop().create_future()
+            self._waiters.append(waiter)
+            try:
+                await waiter
+            except asyncio.CancelledError:
+                if waiter in self._waiters:
+                    self._waiters.remove(waiter)
+                elif waiter.done() and not waiter.cancelled():
+                    # Woken for a slot it will not take: hand it to the next waiter
+                    self._wake_waiters()
+                raise
+
+        self.in_flight += 1
+
+    def release(self):
+        """Give a slot back and wake as many waiters as there are free slots"""
+
+        self.in_flight -= 1
+        self._wake_waiters()
+
+    def record_response(self, status: int, latency: float):
+        """Feed one completed request into the controller"""
+
+        if status == 429 or status >= 500:
+            self.record_failure()
+            return
+
+        if not self.adaptive:
+            return
+
+        self._samples_since_decrease += 1
+        self.latencies.append(latency)
+        if len(self.latencies) < self.window:
+            return
+
+        p95 = self._percentile(95)
+        self.last_p95 = p95
+        self.latencies.clear()
+
+        if self.baseline_p95 is None or p95 <= self.baseline_p95:
+            self.baseline_p95 = p95
+
+        # Additive increase while latency has not grown with the extra load
+        if p95 <= self.baseline_p95 * self.latency_tolerance:
+            if self.limit < self.maximum:
+                self.limit = min(self.maximum, self.limit + 1)
+                self.increases += 1
+                self._wake_waiters()
+
+    def record_failure(self):
+        """Register a timeout, 429 or 5xx and back off"""
+
+        self.failures += 1
+        if not self.adaptive:
+            return
+
+        # Requests already in flight when we backed off will fail too; only
+        # cut again once a full round of requests has been sent at the new limit
+        if self._samples_since_decrease < self.current_limit and self.decreases:
+            return
+
+        self.limit = max(self.minimum, self.limit * self.decrease_factor)
+        self.latencies.clear()
+        self._samples_since_decrease = 0
+        self.decreases += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Current controller state for status reporting"""
+
+        return {
+            "limit": self.current_limit,
+            "in_flight": self.in_flight,
+            "adaptive": self.adaptive,
+            "p95_latency_ms": round(self.last_p95 * 1000, 1)
+            if self.last_p95 is not None
+            else None,
+            "baseline_p95_latency_ms": round(self.baseline_p95 * 1000, 1)
+            if self.baseline_p95 is not None
+            else None,
+            "increases": self.increases,
+            "decreases": self.decreases,
+            "failures": self.failures,
+        }
+
+    def _wake_waiters(self):
+        free_slots = self.current_limit - self.in_flight
+        while free_slots > 0 and self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                free_slots -= 1
+
+    def _percentile(self, percentile: float) -> float:
+        ordered = sorted(self.latencies)
+        index = max(0, math.ceil(len(ordered) * percentile / 100) - 1)
+        return ordered[index]
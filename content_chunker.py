@@ -7,9 +7,17 @@ consumption, with configurable overlap and semantic boundary detection.
 
 import re
 import hashlib
-from typing import List, Dict, Any, Optional
+from bisect import bisect_right
+from itertools import accumulate
+from typing import List, Dict, Any, Optional, Tuple
 from bs4 import BeautifulSoup
 
+# Blank lines between paragraphs, and the next paragraph's indentation
+PARAGRAPH_BREAK = re.compile(r"\n\s*\n\s*")
+
+# Punctuation and whitespace between sentences
+SENTENCE_BREAK = re.compile(r"[.!?]+\s+")
+
 
 class ContentChunker:
     """Chunks documentation content for AI consumption"""
@@ -21,7 +29,11 @@ class ContentChunker:
     def chunk_by_sections(
         self, sections: List[Dict[str, Any]], base_url: str = ""
     ) -> List[Dict[str, Any]]:
-        """Chunk content by document sections (semantic chunking)"""
+        """Chunk content by document sections (semantic chunking)
+
+        Each chunk's start_char and end_char locate it in the text of its
+        section: the title and content joined by a blank line.
+        """
 
         chunks = []
 
@@ -42,6 +54,8 @@ class ContentChunker:
                             "url": base_url,
                             "chunk_type": "section",
                             "token_count": self._estimate_tokens(combined_text),
+                            "start_char": 0,
+                            "end_char": len(combined_text),
                         },
                     }
                 )
@@ -106,7 +120,10 @@ class ContentChunker:
     def chunk_markdown_file(
         self, markdown_content: str, url: str = ""
     ) -> List[Dict[str, Any]]:
-        """Chunk markdown content by headers and sections"""
+        """Chunk markdown content by headers and sections
+
+        Each chunk's start_char and end_char locate it in the markdown.
+        """
 
         chunks = []
 
@@ -114,11 +131,12 @@ class ContentChunker:
         sections = self._split_markdown_by_headers(markdown_content)
 
         for section in sections:
-            section_text = section["content"]
-            token_count = self._estimate_tokens(section_text)
+            start, end = section["start"], section["end"]
+            token_count = self._tokens_for_length(end - start)
 
             if token_count <= self.chunk_size:
                 # Keep section as one chunk
+                section_text = markdown_content[start:end]
                 chunks.append(
                     {
                         "id": self._generate_chunk_id(section_text),
@@ -129,13 +147,15 @@ class ContentChunker:
                             "url": url,
                             "chunk_type": "markdown_section",
                             "token_count": token_count,
+                            "start_char": start,
+                            "end_char": end,
                         },
                     }
                 )
             else:
                 # Split large sections
                 section_chunks = self._chunk_text_by_paragraphs(
-                    section_text, section["header"], url
+                    markdown_content, section["header"], url, start, end
                 )
                 chunks.extend(section_chunks)
 
@@ -204,130 +224,174 @@ class ContentChunker:
         return results[:limit]
 
     def _chunk_text_by_paragraphs(
-        self, text: str, context: str = "", url: str = ""
+        self,
+        text: str,
+        context: str = "",
+        url: str = "",
+        start: int = 0,
+        end: Optional[int] = None,
     ) -> List[Dict[str, Any]]:
-        """Split text by paragraphs when sections are too large"""
+        """Split text by paragraphs when sections are too large
+
+        Works on offsets into text (or its [start, end) range), so each chunk
+        is sliced out once, and records them as start_char and end_char.
+        """
+
+        start, end = self._strip_span(text, start, len(text) if end is None else end)
+        if start == end:
+            return []
+
+        # Split by blank lines (paragraphs)
+        starts, ends = [start], []
+        for match in PARAGRAPH_BREAK.finditer(text, start, end):
+            para_end = match.start()
+            while text[para_end - 1].isspace():
+                para_end -= 1
+            ends.append(para_end)
+            starts.append(match.end())
+        ends.append(end)
+
+        # Paragraphs i to j - 1 have token_prefix[j] - token_prefix[i] tokens
+        token_prefix = [0]
+        token_prefix.extend(
+            accumulate(
+                self._tokens_for_length(para_end - para_start)
+                for para_start, para_end in zip(starts, ends)
+            )
+        )
 
-        # Split by double newlines (paragraphs)
-        paragraphs = re.split(r"\n\s*\n", text.strip())
         chunks = []
-
-        current_chunk = ""
-        current_tokens = 0
-
-        for para in paragraphs:
-            para_tokens = self._estimate_tokens(para)
-
-            # If adding this paragraph would exceed chunk size
-            if current_tokens + para_tokens > self.chunk_size and current_chunk:
-                # Save current chunk
-                chunks.append(
-                    {
-                        "id": self._generate_chunk_id(current_chunk),
-                        "content": current_chunk.strip(),
-                        "metadata": {
-                            "context": context,
-                            "url": url,
-                            "chunk_type": "paragraph_group",
-                            "token_count": current_tokens,
-                        },
-                    }
+        chunk_start = start
+        first = 0  # First paragraph of the current chunk
+        overlap_tokens = 0  # Tokens repeated from the previous chunk
+
+        while True:
+            # The first paragraph that would exceed chunk size if added
+            limit = self.chunk_size - overlap_tokens + token_prefix[first]
+            i = bisect_right(token_prefix, limit, first + 2) - 1
+            if i == len(starts):
+                break
+
+            # Save current chunk
+            tokens = overlap_tokens + token_prefix[i] - token_prefix[first]
+            chunk_end = ends[i - 1]
+            chunks.append(
+                self._paragraph_chunk(
+                    text, chunk_start, chunk_end, tokens, context, url
                 )
+            )
 
-                # Start new chunk with overlap
-                overlap_text = self._get_overlap_text(current_chunk, paragraphs)
-                current_chunk = overlap_text + "\n\n" + para if overlap_text else para
-                current_tokens = self._estimate_tokens(current_chunk)
+            # Start new chunk with overlap
+            chunk_start = self._overlap_start(text, chunk_start, chunk_end)
+            if chunk_start < chunk_end:
+                overlap_tokens = self._tokens_for_length(chunk_end - chunk_start)
             else:
-                # Add paragraph to current chunk
-                if current_chunk:
-                    current_chunk += "\n\n" + para
-                else:
-                    current_chunk = para
-                current_tokens += para_tokens
+                chunk_start = starts[i]
+                overlap_tokens = 0
+            first = i
 
         # Add final chunk
-        if current_chunk.strip():
-            chunks.append(
-                {
-                    "id": self._generate_chunk_id(current_chunk),
-                    "content": current_chunk.strip(),
-                    "metadata": {
-                        "context": context,
-                        "url": url,
-                        "chunk_type": "paragraph_group",
-                        "token_count": current_tokens,
-                    },
-                }
-            )
+        tokens = overlap_tokens + token_prefix[-1] - token_prefix[first]
+        chunks.append(
+            self._paragraph_chunk(text, chunk_start, end, tokens, context, url)
+        )
 
         return chunks
 
+    def _paragraph_chunk(
+        self, text: str, start: int, end: int, tokens: int, context: str, url: str
+    ) -> Dict[str, Any]:
+        content = text[start:end]
+        return {
+            "id": self._generate_chunk_id(content),
+            "content": content,
+            "metadata": {
+                "context": context,
+                "url": url,
+                "chunk_type": "paragraph_group",
+                "token_count": tokens,
+                "start_char": start,
+                "end_char": end,
+            },
+        }
+
     def _split_markdown_by_headers(self, markdown: str) -> List[Dict[str, Any]]:
-        """Split markdown content by headers"""
+        """Split markdown content by headers
 
-        sections = []
-        lines = markdown.split("\n")
-        current_section = {"header": "", "level": 0, "content": ""}
+        Sections record their span of the markdown as start and end, from
+        their header line up to the next one.
+        """
 
-        for line in lines:
+        # (header, level, start) of every section, the first without a header
+        boundaries = [("", 0, 0)]
+        position = 0
+
+        for line in markdown.split("\n"):
             # Check if line is a header
             header_match = re.match(r"^(#{1,6})\s+(.+)$", line.strip())
             if header_match:
-                # Save previous section if it has content
-                if current_section["content"].strip():
-                    sections.append(current_section)
-
-                # Start new section
                 level = len(header_match.group(1))
-                header = header_match.group(2)
-                current_section = {
-                    "header": header,
-                    "level": level,
-                    "content": line + "\n",
-                }
-            else:
-                # Add line to current section
-                current_section["content"] += line + "\n"
+                boundaries.append((header_match.group(2), level, position))
+            position += len(line) + 1
 
-        # Add final section
-        if current_section["content"].strip():
-            sections.append(current_section)
+        sections = []
+        ends = [start for _, _, start in boundaries[1:]] + [len(markdown)]
+        for (header, level, start), end in zip(boundaries, ends):
+            # Skip sections without content
+            if self._strip_span(markdown, start, end)[0] < end:
+                sections.append(
+                    {"header": header, "level": level, "start": start, "end": end}
+                )
 
         return sections
 
     def _estimate_tokens(self, text: str) -> int:
         """Rough token estimation (words + punctuation)"""
 
+        return self._tokens_for_length(len(text))
+
+    def _tokens_for_length(self, char_count: int) -> int:
+        """Rough token estimation from a character count"""
+
         # Simple estimation: ~4/5 characters per token
-        char_count = len(text)
         return max(1, char_count // 4)
 
     def _generate_chunk_id(self, content: str) -> str:
         """Generate unique chunk ID"""
 
-        # Use first 50 chars + hash for uniqueness
-        prefix = content[:50].replace("\n", " ").strip()
+        # Hash the content for uniqueness
         hash_suffix = hashlib.md5(content.encode()).hexdigest()[:8]
         return f"chunk_{hash_suffix}"
 
-    def _get_overlap_text(self, text: str, paragraphs: List[str]) -> str:
-        """Get overlap text from end of current chunk"""
+    def _overlap_start(self, text: str, start: int, end: int) -> int:
+        """Offset where the overlap taken from the end of a chunk starts
 
-        if not text or self.overlap == 0:
-            return ""
+        Returns end when there is no overlap.
+        """
 
         # Get last few sentences/paragraphs for overlap
-        overlap_chars = int(len(text) * self.overlap)
-        overlap_text = text[-overlap_chars:]
-
-        # Try to start at a sentence boundary
-        sentences = re.split(r"[.!?]+\s+", overlap_text)
-        if len(sentences) > 1:
-            # Keep last 2-3 sentences
-            overlap_text = " ".join(sentences[-min(3, len(sentences)) :])
-
-        return overlap_text.strip()
+        overlap_chars = int((end - start) * self.overlap)
+        if overlap_chars <= 0:
+            return end
+        start = end - overlap_chars
+
+        # Try to start at a sentence boundary, keeping the last 2-3 sentences
+        sentence_starts = [
+            match.end() for match in SENTENCE_BREAK.finditer(text, start, end)
+        ]
+        if len(sentence_starts) >= 3:
+            start = sentence_starts[-3]
+
+        return self._strip_span(text, start, end)[0]
+
+    def _strip_span(self, text: str, start: int, end: int) -> Tuple[int, int]:
+        """Narrow text[start:end] to exclude leading and trailing whitespace"""
+
+        while start < end and text[start].isspace():
+            start += 1
+        while end > start and text[end - 1].isspace():
+            end -= 1
+        return start, end
 
     def _get_timestamp(self) -> str:
         """Get current timestamp"""
@@ -6,6 +6,7 @@ removing navigation, scripts, styles, and other UI elements that
 are not useful for LLM consumption.
 """
 
+import copy
 import re
 import json
 from typing import Dict, List, Optional, Any
@@ -13,6 +14,14 @@ from bs4 import BeautifulSoup, NavigableString, Tag
 import html2text
 from urllib.parse import urljoin, urlparse
 
+from page_analysis import (
+    HEADING_SET,
+    HEADING_TAGS,
+    DomStats,
+    PageAnalysis,
+    collect_dom_stats,
+)
+
 
 class ContentExtractor:
     """Extracts clean content from HTML pages for AI consumption"""
@@ -69,6 +78,26 @@ class ContentExtractor:
             "youtube",
         }
 
+        # Class and id fragments that indicate UI elements
+        self.ui_indicators = [
+            "nav",
+            "navigation",
+            "menu",
+            "sidebar",
+            "footer",
+            "header",
+            "banner",
+            "advertisement",
+            "ads",
+            "social",
+            "share",
+            "comment",
+            "disqus",
+            "modal",
+            "popup",
+            "overlay",
+        ]
+
         # Attributes to remove from elements
         self.attributes_to_remove = [
             "class",
@@ -85,60 +114,89 @@ class ContentExtractor:
             "disabled",
         ]
 
-    def extract_clean_html(self, soup: BeautifulSoup, base_url: str = "") -> str:
-        """Extract clean HTML content, removing navigation and UI elements"""
-
-        # Create a copy to avoid modifying original
-        soup_copy = BeautifulSoup(str(soup), "html.parser")
-
-        # Remove unwanted elements
-        self._remove_unwanted_elements(soup_copy)
-
-        # Clean remaining elements
-        self._clean_elements(soup_copy)
+        # The rules above as lookups, so a page is cleaned in a single pass
+        self._removed_tags = frozenset(
+            name for name in self.elements_to_remove if not name.startswith("link[")
+        )
+        self._removed_link_rels = frozenset(
+            name.split('rel="')[1].rstrip('"]')
+            for name in self.elements_to_remove
+            if name.startswith("link[")
+        )
+        self._ui_indicator = re.compile(
+            "|".join(re.escape(indicator) for indicator in self.ui_indicators)
+        )
+        self._removed_attributes = frozenset(
+            attr for attr in self.attributes_to_remove if not attr.endswith("-*")
+        )
+        # Wildcard attributes like data-*
+        self._removed_attribute_prefixes = tuple(
+            attr[:-2] for attr in self.attributes_to_remove if attr.endswith("-*")
+        )
 
-        # Fix relative links to absolute
-        if base_url:
-            self._fix_links(soup_copy, base_url)
+    def analyze_page(
+        self,
+        soup: BeautifulSoup,
+        url: str = "",
+        base_url: str = "",
+        include_main_content: bool = True,
+    ) -> PageAnalysis:
+        """Walk a parsed page once and collect what every output format needs"""
+
+        stats = collect_dom_stats(soup)
+
+        return PageAnalysis(
+            url=url,
+            title=self._extract_title(stats),
+            description=self._extract_description(stats),
+            sections=self._extract_sections(soup, stats.headings),
+            code_blocks=self.extract_code_blocks(soup),
+            links=self._extract_links(soup, url),
+            stats=stats,
+            main_content=(
+                self._clean_main_content(soup, base_url)
+                if include_main_content
+                else None
+            ),
+        )
 
-        # Extract main content area
-        main_content = self._extract_main_content(soup_copy)
+    def extract_clean_html(self, soup: BeautifulSoup, base_url: str = "") -> str:
+        """Extract clean HTML content, removing navigation and UI elements"""
 
-        return str(main_content)
+        return str(self._clean_main_content(soup, base_url))
 
     def extract_markdown(self, soup: BeautifulSoup, base_url: str = "") -> str:
         """Convert HTML to clean Markdown for AI consumption"""
 
-        # Get clean HTML first
-        clean_html = self.extract_clean_html(soup, base_url)
-
-        # Convert to markdown
-        markdown = self.html2md.handle(clean_html)
-
-        # Post-process markdown
-        markdown = self._clean_markdown(markdown)
-
-        return markdown
+        return self._to_markdown(self._clean_main_content(soup, base_url))
 
     def extract_structured_json(
         self, soup: BeautifulSoup, url: str = ""
     ) -> Dict[str, Any]:
         """Extract structured JSON representation of the page"""
 
-        title = self._extract_title(soup)
-        description = self._extract_description(soup)
-        sections = self._extract_sections(soup)
-        code_blocks = self.extract_code_blocks(soup)
-        links = self._extract_links(soup, url)
+        return self.render_structured_json(
+            self.analyze_page(soup, url, include_main_content=False)
+        )
+
+    def render_markdown(self, analysis: PageAnalysis) -> str:
+        """Render the cleaned main content of an analyzed page as Markdown"""
+
+        if analysis.main_content is None:
+            raise ValueError("Page was analyzed without its main content")
+        return self._to_markdown(analysis.main_content)
+
+    def render_structured_json(self, analysis: PageAnalysis) -> Dict[str, Any]:
+        """Structured JSON representation of an analyzed page"""
 
         return {
-            "url": url,
-            "title": title,
-            "description": description,
-            "sections": sections,
-            "code_blocks": code_blocks,
-            "internal_links": links["internal"],
-            "external_links": links["external"],
+            "url": analysis.url,
+            "title": analysis.title,
+            "description": analysis.description,
+            "sections": analysis.sections,
+            "code_blocks": analysis.code_blocks,
+            "internal_links": analysis.links["internal"],
+            "external_links": analysis.links["external"],
             "last_extracted": self._get_timestamp(),
         }
 
@@ -193,67 +251,75 @@ class ContentExtractor:
 
         return code_blocks
 
-    def _remove_unwanted_elements(self, soup: BeautifulSoup):
-        """Remove navigation, scripts, styles, and other UI elements"""
+    def _clean_main_content(self, soup: BeautifulSoup, base_url: str = "") -> Tag:
+        """Clean a copy of the page and return its main content area"""
 
-        # Remove by tag name
-        for tag_name in self.elements_to_remove:
-            if tag_name.startswith("link["):
-                # Handle CSS selector syntax
-                rel_type = tag_name.split('rel="')[1].rstrip('"]')
-                for link in soup.find_all("link", rel=rel_type):
-                    link.decompose()
-            else:
-                for element in soup.find_all(tag_name):
-                    element.decompose()
+        # Work on a copy to avoid modifying the original
+        soup_copy = copy.copy(soup)
 
-        # Remove elements with specific classes/IDs that indicate UI elements
-        ui_indicators = [
-            "nav",
-            "navigation",
-            "menu",
-            "sidebar",
-            "footer",
-            "header",
-            "banner",
-            "advertisement",
-            "ads",
-            "social",
-            "share",
-            "comment",
-            "disqus",
-            "modal",
-            "popup",
-            "overlay",
-        ]
+        # Remove unwanted elements and clean the remaining ones
+        self._clean_tree(soup_copy)
 
-        for element in soup.find_all(attrs={"class": True}):
-            classes = element.get("class", [])
-            for cls in classes:
-                if any(indicator in cls.lower() for indicator in ui_indicators):
-                    element.decompose()
-                    break
+        # Fix relative links to absolute
+        if base_url:
+            self._fix_links(soup_copy, base_url)
+
+        # Extract main content area
+        return self._extract_main_content(soup_copy)
 
-        for element in soup.find_all(attrs={"id": True}):
-            element_id = element.get("id", "").lower()
-            if any(indicator in element_id for indicator in ui_indicators):
-                element.decompose()
-
-    def _clean_elements(self, soup: BeautifulSoup):
-        """Clean remaining elements by removing unwanted attributes"""
-
-        for element in soup.find_all():
-            # Remove unwanted attributes
-            for attr in self.attributes_to_remove:
-                if attr.endswith("-*"):  # Wildcard attributes like data-*
-                    prefix = attr[:-2]
-                    attrs_to_remove = [
-                        a for a in element.attrs.keys() if a.startswith(prefix)
-                    ]
-                    for a in attrs_to_remove:
-                        del element.attrs[a]
-                elif attr in element.attrs:
-                    del element.attrs[attr]
+    def _to_markdown(self, main_content: Tag) -> str:
+        """Convert cleaned HTML to Markdown"""
+
+        markdown = self.html2md.handle(str(main_content))
+
+        # Post-process markdown
+        return self._clean_markdown(markdown)
+
+    def _clean_tree(self, soup: BeautifulSoup):
+        """Remove navigation, scripts, styles, and other UI elements, and strip
+        unwanted attributes from the elements that remain"""
+
+        unwanted = []
+        stack = [soup]
+        while stack:
+            for element in stack.pop().contents:
+                if not isinstance(element, Tag):
+                    continue
+                if self._is_unwanted(element):
+                    # Removed with everything inside it, so not descended into
+                    unwanted.append(element)
+                    continue
+
+                attrs = element.attrs
+                if attrs:
+                    for attr in [
+                        attr
+                        for attr in attrs
+                        if attr in self._removed_attributes
+                        or attr.startswith(self._removed_attribute_prefixes)
+                    ]:
+                        del attrs[attr]
+                stack.append(element)
+
+        for element in unwanted:
+            element.decompose()
+
+    def _is_unwanted(self, element: Tag) -> bool:
+        """Check whether an element's tag, rel, classes or id mark it as UI"""
+
+        if element.name in self._removed_tags:
+            return True
+        if element.name == "link" and not self._removed_link_rels.isdisjoint(
+            element.get("rel") or ()
+        ):
+            return True
+
+        for cls in element.get("class") or ():
+            if self._ui_indicator.search(cls.lower()):
+                return True
+
+        element_id = element.get("id")
+        return bool(element_id) and bool(self._ui_indicator.search(element_id.lower()))
 
     def _fix_links(self, soup: BeautifulSoup, base_url: str):
         """Convert relative links to absolute links"""
@@ -298,130 +364,152 @@ class ContentExtractor:
         body = soup.find("body")
         return body if body else soup
 
-    def _extract_title(self, soup: BeautifulSoup) -> str:
+    def _extract_title(self, stats: DomStats) -> str:
         """Extract page title"""
 
         # Try title tag
-        title_tag = soup.find("title")
-        if title_tag:
-            return title_tag.get_text(strip=True)
+        if stats.title is not None:
+            return stats.title
 
         # Try h1
-        h1 = soup.find("h1")
-        if h1:
-            return h1.get_text(strip=True)
+        if stats.h1 is not None:
+            return stats.h1
 
         # Try meta title
-        meta_title = soup.find("meta", attrs={"property": "og:title"})
+        meta_title = stats.meta_tag("property", "og:title")
         if meta_title:
             return meta_title.get("content", "")
 
         return "Untitled Page"
 
-    def _extract_description(self, soup: BeautifulSoup) -> str:
+    def _extract_description(self, stats: DomStats) -> str:
         """Extract page description"""
 
         # Try meta description
-        meta_desc = soup.find("meta", attrs={"name": "description"})
+        meta_desc = stats.meta_tag("name", "description")
         if meta_desc:
             return meta_desc.get("content", "")
 
         # Try og:description
-        og_desc = soup.find("meta", attrs={"property": "og:description"})
+        og_desc = stats.meta_tag("property", "og:description")
         if og_desc:
             return og_desc.get("content", "")
 
         # Try first paragraph
-        first_p = soup.find("p")
-        if first_p:
-            text = first_p.get_text(strip=True)
-            if len(text) > 50:  # Only if substantial
-                return text[:200] + "..." if len(text) > 200 else text
+        text = stats.first_paragraph
+        if text and len(text) > 50:  # Only if substantial
+            return text[:200] + "..." if len(text) > 200 else text
 
         return ""
 
-    def _extract_sections(self, soup: BeautifulSoup) -> List[Dict[str, Any]]:
-        """Extract hierarchical sections with headings"""
+    def _extract_sections(
+        self, soup: BeautifulSoup, headings: Optional[List[Tag]] = None
+    ) -> List[Dict[str, Any]]:
+        """Extract hierarchical sections with headings
+
+        One walk in document order gives every block of content to the
+        heading before it, including headings nested in wrapper elements.
+        """
 
         sections = []
         current_section = None
 
         # Find all headings and their content
-        headings = soup.find_all(["h1", "h2", "h3", "h4", "h5", "h6"])
+        if headings is None:
+            headings = soup.find_all(HEADING_TAGS)
 
+        # Elements with a heading somewhere inside are walked into; any
+        # other element is a block that belongs to a single section
+        wrappers = set()
         for heading in headings:
-            level = int(heading.name[1])  # h1 -> 1, h2 -> 2, etc.
-            title = heading.get_text(strip=True)
-
-            # Skip if empty
-            if not title:
+            for parent in heading.parents:
+                if id(parent) in wrappers:
+                    break
+                wrappers.add(id(parent))
+
+        # Content outside the element holding every heading (page chrome
+        # such as footers) belongs to no section
+        root = soup
+        while True:
+            holders = [
+                child
+                for child in root.contents
+                if id(child) in wrappers or child.name in HEADING_SET
+            ]
+            if len(holders) != 1 or holders[0].name in HEADING_SET:
+                break
+            root = holders[0]
+
+        section = None
+        stack = [iter(root.contents)]
+        while stack:
+            element = next(stack[-1], None)
+            if element is None:
+                stack.pop()
                 continue
 
-            # Find content until next heading of same or higher level
-            content = self._extract_section_content(heading, headings)
-
-            section = {
-                "level": level,
-                "title": title,
-                "content": content,
-                "id": heading.get("id", ""),
-                "subsections": [],
-            }
-
-            # Build hierarchy
-            if level == 1:
-                sections.append(section)
-                current_section = section
-            elif level == 2 and sections:
-                sections[-1]["subsections"].append(section)
-                current_section = section
-            elif level > 2 and current_section:
-                current_section["subsections"].append(section)
+            if isinstance(element, Tag) and element.name in HEADING_SET:
+                # Every heading ends the section before it, even one
+                # skipped below for having no title
+                section = None
+                title = element.get_text(strip=True)
+
+                # Skip if empty
+                if not title:
+                    continue
+
+                level = int(element.name[1])  # h1 -> 1, h2 -> 2, etc.
+                section = {
+                    "level": level,
+                    "title": title,
+                    "content": [],
+                    "id": element.get("id", ""),
+                    "subsections": [],
+                }
+
+                # Build hierarchy
+                if level == 1:
+                    sections.append(section)
+                    current_section = section
+                elif level == 2 and sections:
+                    sections[-1]["subsections"].append(section)
+                    current_section = section
+                elif level > 2 and current_section:
+                    current_section["subsections"].append(section)
+            elif id(element) in wrappers:
+                stack.append(iter(element.contents))
+            elif section is not None:
+                text = self._block_text(element)
+                if text:
+                    section["content"].append(text)
 
+        self._join_section_content(sections)
         return sections
 
-    def _extract_section_content(self, heading: Tag, all_headings: List[Tag]) -> str:
-        """Extract content for a section until the next heading"""
-
-        content_parts = []
-        current = heading.next_sibling
-
-        # Get index of current heading
-        try:
-            current_index = all_headings.index(heading)
-            next_heading = (
-                all_headings[current_index + 1]
-                if current_index + 1 < len(all_headings)
-                else None
-            )
-        except ValueError:
-            next_heading = None
-
-        while current:
-            if current == next_heading:
-                break
+    def _block_text(self, element) -> str:
+        """Text of a block of section content, or "" for other elements"""
+
+        if type(element) is NavigableString:
+            return str(element).strip()
+        if not isinstance(element, Tag):
+            return ""
+
+        if element.name in ["p", "div", "section", "article"]:
+            return element.get_text(strip=True)
+        elif element.name == "ul":
+            items = [li.get_text(strip=True) for li in element.find_all("li")]
+            if items:
+                return "• " + "\n• ".join(items)
+        elif element.name == "ol":
+            items = [li.get_text(strip=True) for li in element.find_all("li")]
+            if items:
+                return "1. " + "\n2. ".join(items)
+        return ""
 
-            if isinstance(current, NavigableString):
-                text = str(current).strip()
-                if text:
-                    content_parts.append(text)
-            elif isinstance(current, Tag):
-                if current.name in ["p", "div", "section", "article"]:
-                    text = current.get_text(strip=True)
-                    if text:
-                        content_parts.append(text)
-                elif current.name == "ul":
-                    items = [li.get_text(strip=True) for li in current.find_all("li")]
-                    if items:
-                        content_parts.append("• " + "\n• ".join(items))
-                elif current.name == "ol":
-                    items = [li.get_text(strip=True) for li in current.find_all("li")]
-                    if items:
-                        content_parts.append("1. " + "\n2. ".join(items))
-
-            current = current.next_sibling
-
-        return "\n\n".join(content_parts)
+    def _join_section_content(self, sections: List[Dict[str, Any]]):
+        for section in sections:
+            section["content"] = "\n\n".join(section["content"])
+            self._join_section_content(section["subsections"])
 
     def _extract_links(
         self, soup: BeautifulSoup, base_url: str
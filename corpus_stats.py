@@ -0,0 +1,187 @@
+"""
+Corpus Statistics for Keyword Extraction
+
+This module ranks each page's keywords against the whole crawl rather
+than the page alone, so words every page uses (such as "documentation")
+stop crowding out the words that set a page apart.
+
+Worker processes count a page's terms once and hand them over as a
+compact string (see document_terms). CorpusStats keeps document
+frequencies up to date as pages are added or replaced, and keywords()
+scores every page with BM25 when the crawl is finalized, vectorized with
+numpy over a sparse document-term matrix.
+"""
+
+import heapq
+import math
+from array import array
+from typing import Any, Dict, List, Mapping, Tuple
+
+import numpy as np
+
+# Terms kept per page, most frequent first; the rest barely affect ranking
+MAX_DOCUMENT_TERMS = 200
+
+# Keywords kept per page, as in page metadata
+KEYWORD_COUNT = 20
+
+# BM25 term frequency saturation and document length normalization
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+
+def document_terms(term_counts: Mapping[str, int]) -> Dict[str, Any]:
+    """Reduce a page's term counts to what CorpusStats stores
+
+    Returns {"length": total number of terms, "counts": "term:count ..."}
+    for the page's MAX_DOCUMENT_TERMS most frequent terms. Terms must not
+    contain spaces or colons.
+    """
+
+    top = heapq.nsmallest(
+        MAX_DOCUMENT_TERMS, term_counts.items(), key=lambda item: (-item[1], item[0])
+    )
+    return {
+        "length": sum(term_counts.values()),
+        "counts": " ".join(f"{term}:{count}" for term, count in top),
+    }
+
+
+class CorpusStats:
+    """Document frequencies over a crawl's pages, updated page by page"""
+
+    def __init__(self):
+        self._term_ids: Dict[str, int] = {}
+        self._terms: List[str] = []
+        self._document_frequency = array("I")
+        self._total_length = 0
+        # Document id -> (term ids, term counts, length)
+        self._documents: Dict[str, Tuple[array, array, int]] = {}
+
+    def __len__(self) -> int:
+        return len(self._documents)
+
+    def __contains__(self, doc_id: str) -> bool:
+        return doc_id in self._documents
+
+    def document_frequency(self, term: str) -> int:
+        """Number of documents a term occurs in"""
+
+        term_id = self._term_ids.get(term)
+        return 0 if term_id is None else self._document_frequency[term_id]
+
+    def add_document(self, doc_id: str, terms: Dict[str, Any]):
+        """Add a document's terms (from document_terms), replacing any earlier ones"""
+
+        self.remove_document(doc_id)
+        if not terms["counts"]:
+            return
+
+        term_ids = array("I")
+        counts = array("I")
+        for entry in terms["counts"].split(" "):
+            term, count = entry.rsplit(":", 1)
+            term_id = self._term_ids.get(term)
+            if term_id is None:
+                term_id = len(self._terms)
+                self._term_ids[term] = term_id
+                self._terms.append(term)
+                self._document_frequency.append(0)
+            term_ids.append(term_id)
+            counts.append(int(count))
+            self._document_frequency[term_id] += 1
+
+        self._documents[doc_id] = (term_ids, counts, terms["length"])
+        self._total_length += terms["length"]
+
+    def remove_document(self, doc_id: str):
+        """Take a document's terms back out of the document frequencies"""
+
+        document = self._documents.pop(doc_id, None)
+        if document is None:
+            return
+
+        term_ids, _, length = document
+        for term_id in term_ids:
+            self._document_frequency[term_id] -= 1
+        self._total_length -= length
+
+    def keywords(self, k: int = KEYWORD_COUNT) -> Dict[str, List[str]]:
+        """Every document's k best terms by BM25 score, best first
+
+        Ties are broken alphabetically.
+        """
+
+        if not self._documents:
+            return {}
+
+        doc_ids = list(self._documents)
+        documents = list(self._documents.values())
+        sizes = np.array(
+            [len(term_ids) for term_ids, _, _ in documents], dtype=np.int64
+        )
+        lengths = np.array([length for _, _, length in documents], dtype=np.float64)
+        indptr = np.zeros(len(documents) + 1, dtype=np.int64)
+        np.cumsum(sizes, out=indptr[1:])
+
+        # Sparse document-term matrix in CSR form
+        indices = np.concatenate(
+            [np.frombuffer(term_ids, dtype=np.uintc) for term_ids, _, _ in documents]
+        ).astype(np.int64)
+        tf = np.concatenate(
+            [np.frombuffer(counts, dtype=np.uintc) for _, counts, _ in documents]
+        ).astype(np.float64)
+        rows = np.repeat(np.arange(len(documents)), sizes)
+
+        idf = np.array(self._idf(), dtype=np.float64)
+        norm = BM25_K1 * (1 - BM25_B + BM25_B * lengths / self._average_length())
+        scores = idf[indices] * tf * (BM25_K1 + 1) / (tf + norm[rows])
+
+        # Only entries scoring at least a row's k-th best score can make
+        # its top k; partitioning a padded matrix finds that score per row
+        width = int(sizes.max())
+        if width > k:
+            padded = np.full((len(documents), width), np.inf)
+            padded[rows, np.arange(len(rows)) - indptr[rows]] = -scores
+            threshold = -np.partition(padded, k - 1, axis=1)[:, k - 1]
+            candidates = np.flatnonzero(scores >= threshold[rows])
+        else:
+            candidates = np.arange(len(rows))
+
+        # Alphabetical rank of every term, for tie-breaking
+        rank = np.empty(len(self._terms), dtype=np.int64)
+        rank[np.argsort(np.array(self._terms))] = np.arange(len(self._terms))
+
+        # Sort the candidates of each row by score, then keep the first k
+        candidate_rows = rows[candidates]
+        order = candidates[
+            np.lexsort((rank[indices[candidates]], -scores[candidates], candidate_rows))
+        ]
+        starts = np.zeros(len(documents) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(candidate_rows, minlength=len(documents)), out=starts[1:])
+        top = order[np.arange(len(order)) - starts[rows[order]] < k]
+        top_terms = np.array(self._terms, dtype=object)[indices[top]].tolist()
+
+        keywords = {}
+        start = 0
+        for doc_id, size in zip(doc_ids, np.minimum(sizes, k).tolist()):
+            keywords[doc_id] = top_terms[start : start + size]
+            start += size
+        return keywords
+
+    def _idf(self) -> List[float]:
+        """BM25 inverse document frequency of every term, by term id"""
+
+        n = len(self._documents)
+        # Computed once per distinct frequency, so equal terms tie exactly
+        by_frequency: Dict[int, float] = {}
+        idf = []
+        for df in self._document_frequency:
+            value = by_frequency.get(df)
+            if value is None:
+                value = by_frequency[df] = math.log1p((n - df + 0.5) / (df + 0.5))
+            idf.append(value)
+        return idf
+
+    def _average_length(self) -> float:
+        return self._total_length / len(self._documents)
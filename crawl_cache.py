@@ -0,0 +1,110 @@
+"""
+Validator Cache for Incremental Recrawls
+
+This module persists per-URL HTTP validators (ETag, Last-Modified) and a
+content hash alongside each crawl's output. The next crawl of the same
+site loads them to send conditional requests, and reuses the previous
+crawl's files for pages that have not changed.
+"""
+
+import json
+import os
+import re
+from typing import Any, Dict, Optional
+
+VALIDATORS_FILE = "validators.json"
+
+# Crawl output directories are named "<domain>_<YYYYmmdd>_<HHMMSS>"
+CRAWL_DIR_PATTERN = re.compile(r"^(?P<site>.+)_\d{8}_\d{6}$")
+
+
+class ValidatorCache:
+    """Validators from the previous crawl plus the ones collected in this crawl"""
+
+    def __init__(self, previous_dir: Optional[str] = None):
+        self.previous_dir = previous_dir
+        self.previous: Dict[str, Dict[str, Any]] = {}
+        self.current: Dict[str, Dict[str, Any]] = {}
+
+        if previous_dir:
+            self.previous = self._load(os.path.join(previous_dir, VALIDATORS_FILE))
+
+    @classmethod
+    def from_latest_crawl(cls, output_dir: str) -> "ValidatorCache":
+        """Load validators from the newest earlier crawl of the same site"""
+
+        return cls(find_previous_crawl(output_dir))
+
+    def lookup(self, url: str) -> Optional[Dict[str, Any]]:
+        """Get the previous crawl's record for a URL"""
+
+        return self.previous.get(url)
+
+    def conditional_headers(self, url: str) -> Dict[str, str]:
+        """Build If-None-Match / If-Modified-Since headers for a URL"""
+
+        record = self.previous.get(url)
+        if not record:
+            return {}
+
+        headers = {}
+        if record.get("etag"):
+            headers["If-None-Match"] = record["etag"]
+        if record.get("last_modified"):
+            headers["If-Modified-Since"] = record["last_modified"]
+        return headers
+
+    def previous_path(self, relative_path: str) -> Optional[str]:
+        """Absolute path of a file in the previous crawl, if it still exists"""
+
+        if not self.previous_dir:
+            return None
+        path = os.path.join(self.previous_dir, relative_path)
+        return path if os.path.isfile(path) else None
+
+    def remember(self, url: str, record: Dict[str, Any]):
+        """Store the record for a URL fetched (or reused) in this crawl"""
+
+        self.current[url] = record
+
+    def save(self, output_dir: str):
+        """Write this crawl's validators next to its output"""
+
+        path = os.path.join(output_dir, VALIDATORS_FILE)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.current, f)
+        os.replace(tmp_path, path)
+
+    def _load(self, path: str) -> Dict[str, Dict[str, Any]]:
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+
+def find_previous_crawl(output_dir: str) -> Optional[str]:
+    """Find the newest sibling crawl directory of the same site with validators"""
+
+    parent, name = os.path.split(os.path.normpath(output_dir))
+    match = CRAWL_DIR_PATTERN.match(name)
+    if not match or not os.path.isdir(parent or "."):
+        return None
+
+    candidates = []
+    for sibling in os.listdir(parent or "."):
+        sibling_match = CRAWL_DIR_PATTERN.match(sibling)
+        if (
+            sibling != name
+            and sibling_match
+            and sibling_match.group("site") == match.group("site")
+            and os.path.isfile(os.path.join(parent, sibling, VALIDATORS_FILE))
+        ):
+            candidates.append(sibling)
+
+    if not candidates:
+        return None
+
+    # Timestamps sort lexicographically
+    return os.path.join(parent, max(candidates))
@@ -0,0 +1,58 @@
+"""
+Crawl Frontier for the Documentation Crawler
+
+This module holds the queue of URLs waiting to be crawled. URLs are
+deduplicated at enqueue time, so a link that appears in the sidebar of
+every page is only ever queued once.
+"""
+
+from collections import deque
+from typing import Deque, Iterator, Set, Tuple
+
+
+class CrawlFrontier:
+    """FIFO queue of (url, depth) pairs with an "already enqueued" set"""
+
+    def __init__(self):
+        self._queue: Deque[Tuple[str, int]] = deque()
+        self._seen: Set[str] = set()
+
+    def push(self, url: str, depth: int) -> bool:
+        """Queue a URL unless it has been seen before; returns True if queued"""
+
+        if url in self._seen:
+            return False
+        self._seen.add(url)
+        self._queue.append((url, depth))
+        return True
+
+    def requeue(self, url: str, depth: int):
+        """Queue an already-seen URL again, e.g. to retry it after a 429"""
+
+        self._seen.add(url)
+        self._queue.append((url, depth))
+
+    def mark_seen(self, url: str):
+        """Record a URL as already discovered without queueing it"""
+
+        self._seen.add(url)
+
+    def pop(self) -> Tuple[str, int]:
+        """Remove and return the oldest queued (url, depth) pair"""
+
+        return self._queue.popleft()
+
+    @property
+    def discovered(self) -> int:
+        """Number of unique URLs ever queued"""
+
+        return len(self._seen)
+
+    def __len__(self) -> int:
+        return len(self._queue)
+
+    def __bool__(self) -> bool:
+        return bool(self._queue)
+
+    def __iter__(self) -> Iterator[Tuple[str, int]]:
+        return iter(self._queue)
@@ -0,0 +1,162 @@
+"""
+Crawl Journal for Checkpointing and Resume
+
+This module records crawl progress in a SQLite database (WAL mode) inside
+the crawl's output directory: the crawl settings, every URL queued and
+whether it finished, every file written, and the cache validators. If the
+process dies mid-crawl, the journal is enough to continue from the last
+checkpoint without refetching finished pages.
+"""
+
+import json
+import os
+import sqlite3
+from typing import Any, Dict, List, Optional, Tuple
+
+JOURNAL_FILE = "crawl-journal.sqlite"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS settings (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS frontier (
+    url TEXT PRIMARY KEY,
+    depth INTEGER NOT NULL,
+    done INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS files (
+    path TEXT PRIMARY KEY,
+    url TEXT,
+    content_type TEXT,
+    size INTEGER
+);
+CREATE TABLE IF NOT EXISTS validators (
+    url TEXT PRIMARY KEY,
+    record TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS errors (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    message TEXT NOT NULL
+);
+"""
+
+
+class CrawlJournal:
+    """SQLite-backed record of a crawl's frontier and completed work"""
+
+    def __init__(self, output_dir: str):
+        self.path = os.path.join(output_dir, JOURNAL_FILE)
+        self.conn = sqlite3.connect(self.path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        # WAL + NORMAL survives process crashes; only an OS crash can lose
+        # the last few checkpoints
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+        self.conn.commit()
+
+    @staticmethod
+    def exists(output_dir: str) -> bool:
+        """Check whether a crawl directory has a journal to resume from"""
+
+        return os.path.isfile(os.path.join(output_dir, JOURNAL_FILE))
+
+    def set(self, key: str, value: Any):
+        """Store a JSON-serializable setting"""
+
+        self.conn.execute(
+            "INSERT OR REPLACE INTO settings (key, value) VALUES (?, ?)",
+            (key, json.dumps(value)),
+        )
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """Read a setting stored with set()"""
+
+        row = self.conn.execute(
+            "SELECT value FROM settings WHERE key = ?", (key,)
+        ).fetchone()
+        return json.loads(row[0]) if row else default
+
+    def url_queued(self, url: str, depth: int):
+        """Record a URL added to the frontier"""
+
+        self.conn.execute(
+            "INSERT OR IGNORE INTO frontier (url, depth) VALUES (?, ?)", (url, depth)
+        )
+
+    def url_done(self, url: str):
+        """Record that a queued URL has been fully processed"""
+
+        self.conn.execute("UPDATE frontier SET done = 1 WHERE url = ?", (url,))
+
+    def file_written(self, path: str, url: Optional[str], content_type: str, size: int):
+        """Record a file written to the output directory"""
+
+        self.conn.execute(
+            "INSERT OR REPLACE INTO files (path, url, content_type, size) "
+            "VALUES (?, ?, ?, ?)",
+            (path, url, content_type, size),
+        )
+
+    def validators_recorded(self, url: str, record: Dict[str, Any]):
+        """Record cache validators collected for a URL"""
+
+        self.conn.execute(
+            "INSERT OR REPLACE INTO validators (url, record) VALUES (?, ?)",
+            (url, json.dumps(record)),
+        )
+
+    def error(self, message: str):
+        """Record a crawl error"""
+
+        self.conn.execute("INSERT INTO errors (message) VALUES (?)", (message,))
+
+    def checkpoint(self):
+        """Make everything recorded so far durable"""
+
+        self.conn.commit()
+
+    def pending_urls(self) -> List[Tuple[str, int]]:
+        """URLs queued but not finished, in the order they were queued"""
+
+        return self.conn.execute(
+            "SELECT url, depth FROM frontier WHERE done = 0 ORDER BY rowid"
+        ).fetchall()
+
+    def done_urls(self) -> List[str]:
+        """URLs that were fully processed"""
+
+        return [
+            row[0]
+            for row in self.conn.execute("SELECT url FROM frontier WHERE done = 1")
+        ]
+
+    def files(self) -> List[Dict[str, Any]]:
+        """Files written so far, in the downloaded_files format"""
+
+        return [
+            {"path": path, "url": url, "content_type": content_type, "size": size}
+            for path, url, content_type, size in self.conn.execute(
+                "SELECT path, url, content_type, size FROM files ORDER BY rowid"
+            )
+        ]
+
+    def validators(self) -> Dict[str, Dict[str, Any]]:
+        """Cache validators collected so far"""
+
+        return {
+            url: json.loads(record)
+            for url, record in self.conn.execute("SELECT url, record FROM validators")
+        }
+
+    def errors(self) -> List[str]:
+        """Errors recorded so far"""
+
+        rows = self.conn.execute("SELECT message FROM errors ORDER BY id")
+        return [row[0] for row in rows]
+
+    def close(self):
+        """Commit and close the database"""
+
+        self.conn.commit()
+        self.conn.close()
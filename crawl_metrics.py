@@ -0,0 +1,216 @@
+"""
+Crawl Metrics for the Documentation Crawler
+
+This module collects per-stage timings and byte counters for a crawl, so a
+slow crawl can be traced to the network (DNS/connect, time to first byte,
+body download), the CPU (parse, extraction, markdown, metadata,
+chunking) or the disk (file writes). The numbers are exposed in Prometheus
+text format by the /metrics endpoint and included in the crawl result JSON.
+"""
+
+import bisect
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Tuple
+
+import aiohttp
+
+# Stages timed for every crawl, in pipeline order
+STAGES = [
+    "dns",
+    "connect",
+    "ttfb",
+    "body",
+    "parse",
+    "extract",
+    "markdown",
+    "metadata",
+    "chunking",
+    "write",
+]
+
+# Histogram bucket upper bounds in seconds (Prometheus client defaults)
+BUCKETS = [0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0]
+
+
+class Histogram:
+    """Fixed-bucket latency histogram with a running count and sum"""
+
+    def __init__(self, buckets: List[float] = BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)  # Per bucket, not cumulative
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float):
+        """Record one observation"""
+
+        index = bisect.bisect_left(self.buckets, value)
+        if index < len(self.counts):
+            self.counts[index] += 1
+        self.count += 1
+        self.sum += value
+
+    def cumulative(self) -> Iterator[Tuple[float, int]]:
+        """(upper bound, observations <= bound) pairs, Prometheus style"""
+
+        total = 0
+        for bound, count in zip(self.buckets, self.counts):
+            total += count
+            yield bound, total
+
+    def merge(self, other: "Histogram"):
+        """Add another histogram's observations to this one"""
+
+        for index, count in enumerate(other.counts):
+            self.counts[index] += count
+        self.count += other.count
+        self.sum += other.sum
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "count": self.count,
+            "sum_seconds": round(self.sum, 6),
+            "mean_seconds": round(self.sum / self.count, 6) if self.count else 0.0,
+        }
+
+
+class CrawlMetrics:
+    """Stage histograms and byte counters for one crawl"""
+
+    def __init__(self):
+        self.stages: Dict[str, Histogram] = {stage: Histogram() for stage in STAGES}
+        self.bytes_in = 0  # Response bodies received
+        self.bytes_out = 0  # Files written to the output directory
+        self.responses: Dict[int, int] = {}  # HTTP status -> count
+
+    def observe(self, stage: str, seconds: float):
+        """Record how long one stage took for one page or request"""
+
+        self.stages[stage].observe(seconds)
+
+    @contextmanager
+    def timer(self, stage: str):
+        """Time the body of a with-block as one observation of a stage"""
+
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(stage, time.perf_counter() - started)
+
+    def record_response(self, status: int):
+        """Count a response by HTTP status"""
+
+        self.responses[status] = self.responses.get(status, 0) + 1
+
+    def merge(self, other: "CrawlMetrics"):
+        """Add another crawl's metrics to this one's"""
+
+        for stage, histogram in other.stages.items():
+            self.stages.setdefault(stage, Histogram()).merge(histogram)
+        self.bytes_in += other.bytes_in
+        self.bytes_out += other.bytes_out
+        for status, count in other.responses.items():
+            self.responses[status] = self.responses.get(status, 0) + count
+
+    def trace_config(self) -> aiohttp.TraceConfig:
+        """aiohttp hooks that time DNS, connection setup and first byte"""
+
+        trace_config = aiohttp.TraceConfig()
+
+        async def on_request_start(session, context, params):
+            context.request_start = time.perf_counter()
+
+        async def on_request_end(session, context, params):
+            # Sent once the status line and headers have been read
+            self.observe("ttfb", time.perf_counter() - context.request_start)
+
+        async def on_dns_start(session, context, params):
+            context.dns_start = time.perf_counter()
+
+        async def on_dns_end(session, context, params):
+            self.observe("dns", time.perf_counter() - context.dns_start)
+
+        async def on_connect_start(session, context, params):
+            context.connect_start = time.perf_counter()
+
+        async def on_connect_end(session, context, params):
+            self.observe("connect", time.perf_counter() - context.connect_start)
+
+        trace_config.on_request_start.append(on_request_start)
+        trace_config.on_request_end.append(on_request_end)
+        trace_config.on_dns_resolvehost_start.append(on_dns_start)
+        trace_config.on_dns_resolvehost_end.append(on_dns_end)
+        trace_config.on_connection_create_start.append(on_connect_start)
+        trace_config.on_connection_create_end.append(on_connect_end)
+        return trace_config
+
+    def snapshot(self) -> Dict[str, Any]:
+        """JSON-serializable summary for crawl results"""
+
+        return {
+            "stages": {
+                stage: histogram.snapshot() for stage, histogram in self.stages.items()
+            },
+            "bytes_in": self.bytes_in,
+            "bytes_out": self.bytes_out,
+            "responses": {
+                str(status): count for status, count in sorted(self.responses.items())
+            },
+        }
+
+
+def render_prometheus(metrics: Dict[str, CrawlMetrics]) -> str:
+    """Render the metrics of several crawls, labelled by crawl id"""
+
+    lines = [
+        "# HELP docs_crawl_stage_seconds Time spent in each crawl stage",
+        "# TYPE docs_crawl_stage_seconds histogram",
+    ]
+    for crawl_id, crawl_metrics in metrics.items():
+        for stage, histogram in crawl_metrics.stages.items():
+            labels = f'crawl_id="{crawl_id}",stage="{stage}"'
+            for bound, count in histogram.cumulative():
+                lines.append(
+                    f'docs_crawl_stage_seconds_bucket{{{labels},le="{bound}"}} {count}'
+                )
+            lines.append(
+                f'docs_crawl_stage_seconds_bucket{{{labels},le="+Inf"}} '
+                f"{histogram.count}"
+            )
+            lines.append(f"docs_crawl_stage_seconds_sum{{{labels}}} {histogram.sum}")
+            lines.append(
+                f"docs_crawl_stage_seconds_count{{{labels}}} {histogram.count}"
+            )
+
+    lines.extend(
+        [
+            "# HELP docs_crawl_bytes_total Bytes received and written by a crawl",
+            "# TYPE docs_crawl_bytes_total counter",
+        ]
+    )
+    for crawl_id, crawl_metrics in metrics.items():
+        for direction, value in (
+            ("in", crawl_metrics.bytes_in),
+            ("out", crawl_metrics.bytes_out),
+        ):
+            lines.append(
+                f'docs_crawl_bytes_total{{crawl_id="{crawl_id}",'
+                f'direction="{direction}"}} {value}'
+            )
+
+    lines.extend(
+        [
+            "# HELP docs_crawl_responses_total HTTP responses by status code",
+            "# TYPE docs_crawl_responses_total counter",
+        ]
+    )
+    for crawl_id, crawl_metrics in metrics.items():
+        for status, count in sorted(crawl_metrics.responses.items()):
+            lines.append(
+                f'docs_crawl_responses_total{{crawl_id="{crawl_id}",'
+                f'code="{status}"}} {count}'
+            )
+
+    return "\n".join(lines) + "\n"
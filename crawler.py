@@ -1,24 +1,126 @@
 import asyncio
 import aiohttp
 import aiofiles
-from urllib.parse import urljoin, urlparse, parse_qs
-from bs4 import BeautifulSoup
+from urllib.parse import urlparse, parse_qs
 import os
 import re
-from pathlib import Path
 from datetime import datetime, timedelta
 from typing import Dict, List, Set, Optional, Tuple, Any
 import time
 import json
+import hashlib
+import shutil
+import threading
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import asynccontextmanager
 
 # AI-friendly modules
-from content_extractor import ContentExtractor
-from metadata_generator import MetadataGenerator
-from content_chunker import ContentChunker
-from ai_sitemap_generator import AISitemapGenerator
+from ai_sitemap_generator import SHARD_INDEX_FILE, SHARD_KEYS, AISitemapGenerator
+from blob_store import BlobStore
+from concurrency_controller import AdaptiveConcurrencyLimit
+from corpus_stats import CorpusStats
+from crawl_cache import ValidatorCache
+from crawl_frontier import CrawlFrontier
+from crawl_journal import CrawlJournal
+from crawl_metrics import CrawlMetrics
+from html_backend import resolve_backend
+from page_pack import PagePack, PagePackWriter
+from page_processor import is_internal_link, process_page
+from rate_limiter import HostRateLimiter, parse_crawl_delay, parse_retry_after
 from parsers import OpenAPIParser
 
 
+# Responses that mean "slow down and try again later"
+RETRYABLE_STATUSES = {429, 503}
+
+# Assets are streamed to disk in chunks of this many bytes
+ASSET_CHUNK_SIZE = 64 * 1024
+
+# Most queued files a writer applies in one trip to its thread
+WRITE_BATCH_SIZE = 32
+
+# Files written per HTML page, by _get_file_path extension
+PAGE_OUTPUT_TYPES = {
+    "html": "text/html",
+    "md": "text/markdown",
+    "json": "application/json",
+    "metadata.json": "application/json",
+    "schema.jsonld": "application/ld+json",
+    "chunks.json": "application/json",
+}
+
+# "files": one file per page output; "pack": all page outputs in page_pack
+OUTPUT_MODES = ("files", "pack")
+
+# Counters in _get_ai_outputs_summary, by page output extension (longest
+# suffix first, so "x.metadata.json" is not counted as JSON)
+OUTPUT_COUNTERS = {
+    "metadata.json": "metadata_files",
+    "schema.jsonld": "schema_files",
+    "chunks.json": "chunk_files",
+    "tools.json": None,
+    "md": "markdown_files",
+    "json": "json_files",
+}
+
+# Site-level files written by _generate_ai_summaries
+AI_SUMMARY_FILES = ("llms.txt", "ai-sitemap.json", "ai-index.html", "ai-summary.json")
+
+# Where a sharded JSON sitemap goes instead of ai-sitemap.json
+SITEMAP_SHARD_DIR = "ai-sitemap"
+
+# Worker processes for page processing, shared by all running crawls
+_process_pool: Optional[ProcessPoolExecutor] = None
+_process_pool_workers: Optional[int] = None
+_process_pool_users = 0
+_process_pool_lock = threading.Lock()
+
+
+def _acquire_process_pool(workers: Optional[int]) -> ProcessPoolExecutor:
+    """Get the shared process pool, starting it for the first crawl that needs it
+
+    The pool keeps the size it was started with (None: one process per CPU)
+    until the last crawl using it releases it.
+    """
+    global _process_pool, _process_pool_workers, _process_pool_users
+
+    with _process_pool_lock:
+        if _process_pool is None:
+            _process_pool = ProcessPoolExecutor(workers)
+            _process_pool_workers = workers
+        _process_pool_users += 1
+        return _process_pool
+
+
+def _replace_process_pool(broken: ProcessPoolExecutor) -> ProcessPoolExecutor:
+    """Swap a broken shared pool for a new one of the same size
+
+    A worker process that dies breaks the whole pool, for every crawl using
+    it. Crawls that find the same broken pool all get one replacement.
+    """
+    global _process_pool
+
+    with _process_pool_lock:
+        if _process_pool is broken:
+            broken.shutdown(wait=False)
+            _process_pool = ProcessPoolExecutor(_process_pool_workers)
+        return _process_pool
+
+
+def _release_process_pool():
+    """Stop using the shared process pool; the last crawl shuts it down"""
+    global _process_pool, _process_pool_users
+
+    with _process_pool_lock:
+        _process_pool_users -= 1
+        if _process_pool_users == 0 and _process_pool is not None:
+            # Called from the event loop: let the idle workers exit on their own
+            _process_pool.shutdown(wait=False)
+            _process_pool = None
+
+
 class DocumentationCrawler:
     def __init__(
         self,
@@ -34,32 +136,88 @@ class DocumentationCrawler:
         generate_metadata: bool = True,
         chunk_size: int = 400,
         chunk_overlap: float = 0.15,
+        concurrency: int = 4,
+        per_host_concurrency: int = 4,
+        max_retries: int = 3,
+        adaptive_concurrency: bool = False,
+        incremental: bool = True,
+        process_workers: Optional[int] = None,
+        parser_backend: Optional[str] = None,
+        max_asset_size: int = 10 * 1024 * 1024,
+        output_mode: str = "files",
+        write_workers: int = 2,
+        write_queue_size: int = 256,
+        sitemap_shard_by: Optional[str] = None,
     ):
+        if output_mode not in OUTPUT_MODES:
+            raise ValueError(
+                f"Unknown output mode '{output_mode}' "
+                f"(expected one of: {', '.join(OUTPUT_MODES)})"
+            )
+        if sitemap_shard_by is not None and sitemap_shard_by not in SHARD_KEYS:
+            raise ValueError(
+                f"Unknown sitemap shard key '{sitemap_shard_by}' "
+                f"(expected one of: {', '.join(SHARD_KEYS)})"
+            )
+
         self.base_url = base_url.rstrip("/")
         self.max_depth = max_depth
         self.include_images = include_images
         self.include_css = include_css
         self.include_js = include_js
         self.include_fonts = include_fonts
+        self.max_asset_size = max_asset_size  # Bytes per asset; 0 disables the cap
         self.rate_limit = rate_limit
         self.user_agent = user_agent
 
+        # Worker pool limits
+        self.concurrency = max(1, concurrency)
+        self.per_host_concurrency = max(1, min(per_host_concurrency, self.concurrency))
+        # Let each host's limit float between 1 and `concurrency` (AIMD)
+        self.adaptive_concurrency = adaptive_concurrency
+
+        # Politeness: rate_limit is the average delay between requests to one
+        # host; bursts of up to per_host_concurrency requests are allowed
+        self.max_retries = max_retries
+        self.rate_limiter = HostRateLimiter(
+            rate=1.0 / rate_limit if rate_limit > 0 else 0.0,
+            burst=self.per_host_concurrency,
+        )
+
+        # Worker processes for parsing and output generation (None: one per
+        # CPU, 0: run on the event loop thread); the pool is shared by all
+        # running crawls and sized by the first of them
+        self.process_workers = process_workers
+        # HTML parser used for every page (None: fastest installed)
+        self.parser_backend = resolve_backend(parser_backend)
+
         # AI-friendly output options
         self.output_formats = output_formats or ["html"]
         self.generate_metadata = generate_metadata
         self.chunk_size = chunk_size
         self.chunk_overlap = chunk_overlap
+        self.output_mode = output_mode
+        # Split the JSON sitemap into ai-sitemap/shard-<shard>.json files by
+        # "content_type" or "path" prefix (None: one ai-sitemap.json)
+        self.sitemap_shard_by = sitemap_shard_by
+
+        # Output files are written behind the crawl by this many writer tasks;
+        # pages wait only when write_queue_size files are already queued
+        self.write_workers = max(1, write_workers)
+        self.write_queue_size = max(1, write_queue_size)
+
+        # Reuse unchanged pages from the previous crawl of this site
+        self.incremental = incremental
+        self.validator_cache = ValidatorCache()
 
         # Initialize AI modules
-        self.content_extractor = ContentExtractor()
-        self.metadata_generator = MetadataGenerator()
-        self.content_chunker = ContentChunker(chunk_size, chunk_overlap)
         self.ai_sitemap_generator = AISitemapGenerator()
         self.openapi_parser = OpenAPIParser()
 
         # State management
         self.visited_urls: Set[str] = set()
-        self.pending_urls: List[Tuple[str, int]] = [(base_url, 0)]
+        self.frontier = CrawlFrontier()
+        self.frontier.push(base_url, 0)
         self.downloaded_files: List[Dict] = []
         self.errors: List[str] = []
         self.current_page: Optional[str] = None
@@ -68,60 +226,262 @@ class DocumentationCrawler:
 
         # Statistics
         self.start_time: Optional[datetime] = None
-        self.pages_found = 0
         self.pages_downloaded = 0
+        self.pages_reused = 0
+        self.assets_skipped = 0
+        # Output files by kind, counted as they are recorded
+        self.output_counts: Dict[str, int] = {}
+
+        # Per-page metadata summaries for the AI sitemaps, by URL
+        self.page_summaries: Dict[str, Dict[str, Any]] = {}
+        # Term statistics for ranking the summaries' keywords site-wide
+        self.corpus_stats = CorpusStats()
+        # Stage timings and byte counters (see crawl_metrics)
+        self.metrics = CrawlMetrics()
 
         # Output directory
         self.output_dir = None
+        # Binary assets are stored once and hard-linked into output_dir
+        self.blob_store: Optional[BlobStore] = None
+        # Page outputs in "pack" mode (opened per crawl inside output_dir)
+        self.page_pack: Optional[PagePackWriter] = None
+        self._previous_pack: Optional[PagePack] = None
+
+        # Checkpoint journal (opened per crawl inside output_dir)
+        self.journal: Optional[CrawlJournal] = None
+        self._resumed = False
+        self._journaled_errors = 0
+        self._restored_validators: Dict[str, Dict[str, Any]] = {}
 
         # Session
         self.session = None
 
+        # Worker pool state (created per crawl, inside the event loop)
+        self._global_semaphore: Optional[asyncio.Semaphore] = None
+        self._host_limits: Dict[str, AdaptiveConcurrencyLimit] = {}
+        self._work_available: Optional[asyncio.Event] = None
+        self._active_workers = 0
+        self._robots_tasks: Dict[str, asyncio.Task] = {}
+        self._retries: Dict[str, int] = {}
+        # The shared process pool, while crawling
+        self._process_pool: Optional[ProcessPoolExecutor] = None
+
+        # Write-behind state: files are numbered as they are queued, and a
+        # page is journaled as done only once every file queued before it
+        # finished has been written
+        self._write_queue: Optional[asyncio.Queue] = None
+        # Pack mode appends pages through a queue of its own, with a single
+        # writer so records go into the pack one at a time
+        self._pack_queue: Optional[asyncio.Queue] = None
+        self._writers: List[asyncio.Task] = []
+        self._writes_queued = 0
+        self._writes_finished: Set[int] = set()
+        self._writes_done_through = 0
+        self._pages_awaiting_writes: deque = deque()
+        # Pages counted in pages_downloaded but not yet journaled as done
+        # (URL -> reused); the journal's progress only counts journaled ones
+        self._unjournaled_pages: Dict[str, bool] = {}
+        self._journaled_progress = {"pages_downloaded": 0, "pages_reused": 0}
+        # First failure to record a written file (see _drain_writes)
+        self._write_error: Optional[Exception] = None
+
+        # Progress event subscribers (see subscribe())
+        self._subscribers: List[asyncio.Queue] = []
+        self._reported_errors = 0
+
+    @classmethod
+    def resume(cls, output_dir: str) -> "DocumentationCrawler":
+        """Recreate an interrupted crawl from the journal in its output directory"""
+        if not CrawlJournal.exists(output_dir):
+            raise FileNotFoundError(f"No crawl journal found in {output_dir}")
+
+        journal = CrawlJournal(output_dir)
+        try:
+            crawler = cls(**journal.get("settings"))
+            crawler.output_dir = output_dir
+            crawler._restore(journal)
+        finally:
+            journal.close()
+        return crawler
+
+    def _restore(self, journal: CrawlJournal):
+        """Load frontier, files and counters from a journal"""
+        self._resumed = True
+
+        # The seed URL is in the journal like everything else
+        self.frontier = CrawlFrontier()
+        for url in journal.done_urls():
+            self.frontier.mark_seen(url)
+            self.visited_urls.add(url)
+        pending = journal.pending_urls()
+        for url, depth in pending:
+            self.frontier.push(url, depth)
+
+        # Pages that were in flight are processed again from scratch
+        pending_urls = {url for url, _ in pending}
+        self.downloaded_files = [
+            file_info
+            for file_info in journal.files()
+            if file_info["url"] not in pending_urls
+        ]
+        self.errors = journal.errors()
+        self._journaled_errors = len(self.errors)
+
+        # Assets saved by finished pages do not need downloading again
+        saved_paths = {file_info["path"] for file_info in self.downloaded_files}
+        validators = journal.validators()
+        for url, record in validators.items():
+            if (
+                "file" in record
+                and os.path.join(self.output_dir, record["file"]) in saved_paths
+            ):
+                self.visited_urls.add(url)
+        self._restored_validators = validators
+
+        for url, record in validators.items():
+            if url in pending_urls:
+                continue
+            if "summary" in record:
+                self.page_summaries[url] = record["summary"]
+            if "terms" in record:
+                self.corpus_stats.add_document(url, record["terms"])
+        for file_info in self.downloaded_files:
+            self._count_output(file_info["path"])
+
+        progress = journal.get("progress", {})
+        self.pages_downloaded = progress.get("pages_downloaded", 0)
+        self.pages_reused = progress.get("pages_reused", 0)
+        self._journaled_progress = {
+            "pages_downloaded": self.pages_downloaded,
+            "pages_reused": self.pages_reused,
+        }
+
+    def _get_settings(self) -> Dict[str, Any]:
+        """Constructor arguments needed to recreate this crawler"""
+        return {
+            "base_url": self.base_url,
+            "max_depth": self.max_depth,
+            "include_images": self.include_images,
+            "include_css": self.include_css,
+            "include_js": self.include_js,
+            "include_fonts": self.include_fonts,
+            "rate_limit": self.rate_limit,
+            "user_agent": self.user_agent,
+            "output_formats": self.output_formats,
+            "generate_metadata": self.generate_metadata,
+            "chunk_size": self.chunk_size,
+            "chunk_overlap": self.chunk_overlap,
+            "concurrency": self.concurrency,
+            "per_host_concurrency": self.per_host_concurrency,
+            "max_retries": self.max_retries,
+            "adaptive_concurrency": self.adaptive_concurrency,
+            "incremental": self.incremental,
+            "process_workers": self.process_workers,
+            "parser_backend": self.parser_backend,
+            "max_asset_size": self.max_asset_size,
+            "output_mode": self.output_mode,
+            "write_workers": self.write_workers,
+            "write_queue_size": self.write_queue_size,
+            "sitemap_shard_by": self.sitemap_shard_by,
+        }
+
+    def _checkpoint(self):
+        """Flush progress to the journal"""
+        if not self.journal:
+            return
+
+        for message in self.errors[self._journaled_errors :]:
+            self.journal.error(message)
+        self._journaled_errors = len(self.errors)
+
+        # Pages still in flight are processed (and counted) again on resume
+        self.journal.set("progress", dict(self._journaled_progress))
+        self.journal.checkpoint()
+
+    @property
+    def pages_found(self) -> int:
+        """Number of unique page URLs discovered so far"""
+        return self.frontier.discovered
+
     async def crawl(self) -> Dict:
         """Main crawling method"""
         self.is_running = True
         self.start_time = datetime.now()
 
         try:
-            # Create output directory
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            domain = urlparse(self.base_url).netloc.replace(".", "_")
-            self.output_dir = f"downloads/{domain}_{timestamp}"
+            # Create output directory (a resumed crawl keeps its own)
+            if not self._resumed:
+                timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+                domain = urlparse(self.base_url).netloc.replace(".", "_")
+                self.output_dir = f"downloads/{domain}_{timestamp}"
             os.makedirs(self.output_dir, exist_ok=True)
+            self.blob_store = BlobStore.for_crawl(self.output_dir)
+
+            if self.incremental:
+                self.validator_cache = ValidatorCache.from_latest_crawl(
+                    self.output_dir
+                )
+
+            if self.output_mode == "pack":
+                self.page_pack = PagePackWriter(self.output_dir)
+                previous_dir = self.validator_cache.previous_dir
+                if previous_dir and PagePackWriter.exists(previous_dir):
+                    self._previous_pack = PagePack(previous_dir)
+
+            self.journal = CrawlJournal(self.output_dir)
+            if self._resumed:
+                self.validator_cache.current.update(self._restored_validators)
+            else:
+                self.journal.set("settings", self._get_settings())
+                for url, depth in self.frontier:
+                    self.journal.url_queued(url, depth)
+            self._checkpoint()
+
+            if self.process_workers != 0:
+                self._process_pool = _acquire_process_pool(self.process_workers)
+
+            self._start_writers()
 
             # Create aiohttp session
             timeout = aiohttp.ClientTimeout(total=30)
             headers = {"User-Agent": self.user_agent}
 
             async with aiohttp.ClientSession(
-                timeout=timeout, headers=headers
+                timeout=timeout,
+                headers=headers,
+                trace_configs=[self.metrics.trace_config()],
             ) as session:
                 self.session = session
+                self._global_semaphore = asyncio.Semaphore(self.concurrency)
+                self._host_limits = {}
+                self._work_available = asyncio.Event()
 
-                while self.pending_urls and not self.should_stop:
-                    if not self.pending_urls:
-                        break
-
-                    url, depth = self.pending_urls.pop(0)
-
-                    if url in self.visited_urls or depth > self.max_depth:
-                        continue
+                stage_start = time.perf_counter()
+                workers = [
+                    asyncio.create_task(self._worker())
+                    for _ in range(self.concurrency)
+                ]
+                await asyncio.gather(*workers)
+                self._report_stage("fetch", stage_start)
 
-                    try:
-                        await self._process_page(url, depth)
-                    except Exception as e:
-                        self.errors.append(f"Error processing {url}: {str(e)}")
-
-                    # Rate limiting
-                    await asyncio.sleep(self.rate_limit)
+            await self._drain_writes()
+            self.validator_cache.save(self.output_dir)
 
             self.is_running = False
 
             # Generate index file
+            stage_start = time.perf_counter()
             await self._generate_index()
+            self._report_stage("index", stage_start)
 
             # Generate AI-friendly outputs
+            stage_start = time.perf_counter()
             await self._generate_ai_summaries()
+            await self._drain_writes()
+            self._report_stage("ai_summaries", stage_start)
+
+            self.journal.set("completed", not self.should_stop)
+            self._checkpoint()
 
             return {
                 "status": "completed"
@@ -130,10 +490,12 @@ class DocumentationCrawler:
                 "success": len(self.errors) == 0 or self.pages_downloaded > 0,
                 "pages_found": self.pages_found,
                 "pages_downloaded": self.pages_downloaded,
+                "pages_reused": self.pages_reused,
                 "errors": self.errors,
                 "output_path": self.output_dir,
                 "file_structure": self._get_file_structure(),
                 "ai_outputs": self._get_ai_outputs_summary(),
+                "metrics": self.metrics.snapshot(),
             }
 
         except Exception as e:
@@ -152,56 +514,227 @@ class DocumentationCrawler:
                 "ai_outputs": self._get_ai_outputs_summary()
                 if hasattr(self, "ai_outputs")
                 else {},
+                "metrics": self.metrics.snapshot(),
             }
 
+        finally:
+            await self._stop_writers()
+            if self._process_pool:
+                _release_process_pool()
+                self._process_pool = None
+            if self.page_pack:
+                self.page_pack.close()
+                self.page_pack = None
+            if self._previous_pack:
+                self._previous_pack.close()
+                self._previous_pack = None
+            if self.journal:
+                self._checkpoint()
+                self.journal.close()
+                self.journal = None
+
+    async def _worker(self):
+        """Pull URLs from the shared frontier until the crawl is drained"""
+        while not self.should_stop:
+            if not self.frontier:
+                # Nothing queued and nobody left to discover more work
+                if self._active_workers == 0:
+                    self._work_available.set()
+                    return
+                self._work_available.clear()
+                await self._work_available.wait()
+                continue
+
+            url, depth = self.frontier.pop()
+
+            if url in self.visited_urls or depth > self.max_depth:
+                continue
+
+            self._active_workers += 1
+            try:
+                await self._process_page(url, depth)
+            except Exception as e:
+                self.errors.append(f"Error processing {url}: {str(e)}")
+            finally:
+                self._active_workers -= 1
+                self._work_available.set()
+
+            # A page put back for a retry is still pending
+            if url in self.visited_urls:
+                self._pages_awaiting_writes.append((url, self._writes_queued))
+                self._journal_written_pages()
+            self._checkpoint()
+            self._report_progress(url)
+
+    def subscribe(self, max_events: int = 256) -> asyncio.Queue:
+        """Get a queue that receives progress events as the crawl runs"""
+        queue: asyncio.Queue = asyncio.Queue(max_events)
+        self._subscribers.append(queue)
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue):
+        """Stop delivering events to a queue returned by subscribe()"""
+        if queue in self._subscribers:
+            self._subscribers.remove(queue)
+
+    def publish(self, event_type: str, **data):
+        """Send an event to every subscriber"""
+        event = {"type": event_type, **data}
+        for queue in self._subscribers:
+            # A subscriber that falls behind loses its oldest events
+            if queue.full():
+                queue.get_nowait()
+            queue.put_nowait(event)
+
+    def _report_progress(self, url: str):
+        """Publish the errors raised since the last page, then the page itself"""
+        if not self._subscribers:
+            return
+
+        for message in self.errors[self._reported_errors :]:
+            self.publish("crawl_error", message=message)
+        self._reported_errors = len(self.errors)
+
+        self.publish(
+            "page",
+            url=url,
+            status="running",
+            pages_found=self.pages_found,
+            pages_downloaded=self.pages_downloaded,
+            pages_reused=self.pages_reused,
+            pending_urls=len(self.frontier),
+            current_page=self.current_page,
+        )
+
+    def _report_stage(self, stage: str, started: float):
+        """Publish how long a crawl stage took"""
+        self.publish(
+            "stage", stage=stage, seconds=round(time.perf_counter() - started, 3)
+        )
+
+    @asynccontextmanager
+    async def _request(self, url: str, headers: Optional[Dict[str, str]] = None):
+        """Issue a GET request under the concurrency caps and host rate limit"""
+        parsed = urlparse(url)
+        host = parsed.netloc
+        host_limit = self._host_limits.get(host)
+        if host_limit is None:
+            host_limit = AdaptiveConcurrencyLimit(
+                initial=self.per_host_concurrency,
+                maximum=self.concurrency,
+                adaptive=self.adaptive_concurrency,
+            )
+            self._host_limits[host] = host_limit
+
+        await self._apply_crawl_delay(parsed.scheme, host)
+
+        # Wait for the host before taking a global slot, so a throttled host
+        # never holds slots that other hosts could use
+        await host_limit.acquire()
+        try:
+            await self.rate_limiter.acquire(host)
+            async with self._global_semaphore:
+                started = time.monotonic()
+                try:
+                    async with self.session.get(url, headers=headers) as response:
+                        self.metrics.record_response(response.status)
+                        if response.status in RETRYABLE_STATUSES:
+                            retry_after = parse_retry_after(
+                                response.headers.get("Retry-After")
+                            )
+                            self.rate_limiter.penalize(host, retry_after)
+                        elif response.status < 500:
+                            self.rate_limiter.record_success(host)
+                        yield response
+                except asyncio.TimeoutError:
+                    host_limit.record_failure()
+                    raise
+                host_limit.record_response(
+                    response.status, time.monotonic() - started
+                )
+        finally:
+            host_limit.release()
+
+    async def _apply_crawl_delay(self, scheme: str, host: str):
+        """Fetch robots.txt once per host and honour its Crawl-delay"""
+        task = self._robots_tasks.get(host)
+        if task is None:
+            task = asyncio.ensure_future(self._fetch_crawl_delay(scheme, host))
+            self._robots_tasks[host] = task
+
+        delay = await task
+        if delay:
+            self.rate_limiter.set_crawl_delay(host, delay)
+
+    async def _fetch_crawl_delay(self, scheme: str, host: str) -> Optional[float]:
+        """Read the Crawl-delay for our user agent from robots.txt"""
+        try:
+            async with self.session.get(f"{scheme}://{host}/robots.txt") as response:
+                if response.status != 200:
+                    return None
+                robots_txt = await response.text()
+        except Exception:
+            return None
+
+        return parse_crawl_delay(robots_txt, self.user_agent)
+
+    async def _rank_keywords(self) -> List[Dict[str, Any]]:
+        """Page summaries with their keywords re-ranked by corpus_stats"""
+        loop = asyncio.get_running_loop()
+        keywords = await loop.run_in_executor(None, self.corpus_stats.keywords)
+
+        pages_metadata = []
+        for url, summary in self.page_summaries.items():
+            # Pages without term counts keep their own keywords
+            if url in keywords:
+                summary = {**summary, "keywords": keywords[url]}
+            pages_metadata.append(summary)
+        return pages_metadata
+
     async def _generate_ai_summaries(self):
         """Generate AI-friendly summary files and sitemaps"""
 
         if not self.generate_metadata or not self.output_dir:
             return
 
-        # Collect all page metadata
-        pages_metadata = []
-        metadata_dir = os.path.join(self.output_dir, "metadata")
-
-        if os.path.exists(metadata_dir):
-            for file_name in os.listdir(metadata_dir):
-                if file_name.endswith(".metadata.json"):
-                    metadata_path = os.path.join(metadata_dir, file_name)
-                    try:
-                        with open(metadata_path, "r", encoding="utf-8") as f:
-                            page_metadata = json.load(f)
-                            pages_metadata.append(page_metadata)
-                    except Exception as e:
-                        self.errors.append(
-                            f"Failed to load metadata {file_name}: {str(e)}"
-                        )
-
-        if not pages_metadata:
+        if not self.page_summaries:
             return
 
+        # Collected from each page as it finished, with keywords ranked
+        # against the whole crawl now that every page is in
+        pages_metadata = await self._rank_keywords()
+
         # Extract site name
         site_name = urlparse(self.base_url).netloc
 
-        # Generate AI sitemap (llms.txt)
+        # Generate AI sitemap (llms.txt), streamed straight to disk
         try:
-            llms_txt = self.ai_sitemap_generator.generate_llms_txt(
-                pages_metadata, site_name, self.base_url
-            )
             llms_path = os.path.join(self.output_dir, "llms.txt")
-            await self._save_file(llms_txt, llms_path, "text/plain")
+            await self._stream_file(
+                llms_path,
+                "text/plain",
+                self.ai_sitemap_generator.write_llms_txt,
+                pages_metadata,
+                site_name,
+                self.base_url,
+            )
         except Exception as e:
             self.errors.append(f"Failed to generate llms.txt: {str(e)}")
 
-        # Generate AI sitemap JSON
+        # Generate AI sitemap JSON, whole or sharded
         try:
-            ai_sitemap_json = self.ai_sitemap_generator.generate_ai_sitemap_json(
-                pages_metadata, site_name, self.base_url
-            )
-            sitemap_path = os.path.join(self.output_dir, "ai-sitemap.json")
-            await self._save_file(
-                json.dumps(ai_sitemap_json, indent=2), sitemap_path, "application/json"
-            )
+            if self.sitemap_shard_by:
+                await self._write_sitemap_shards(pages_metadata, site_name)
+            else:
+                sitemap_path = os.path.join(self.output_dir, "ai-sitemap.json")
+                await self._stream_file(
+                    sitemap_path,
+                    "application/json",
+                    self.ai_sitemap_generator.write_ai_sitemap_json,
+                    pages_metadata,
+                    site_name,
+                    self.base_url,
+                )
         except Exception as e:
             self.errors.append(f"Failed to generate ai-sitemap.json: {str(e)}")
 
@@ -225,47 +758,73 @@ class DocumentationCrawler:
         except Exception as e:
             self.errors.append(f"Failed to generate AI summary: {str(e)}")
 
+    async def _stream_file(self, file_path: str, content_type: str, write, *args):
+        """Write a large file with `write(f, *args)` on a worker thread"""
+
+        def stream() -> int:
+            with open(file_path, "w", encoding="utf-8") as f:
+                write(f, *args)
+            return os.path.getsize(file_path)
+
+        loop = asyncio.get_running_loop()
+        with self.metrics.timer("write"):
+            size = await loop.run_in_executor(None, stream)
+        self.metrics.bytes_out += size
+        self._record_file(file_path, None, content_type, size=size)
+
+    async def _write_sitemap_shards(self, pages_metadata: List[Dict], site_name: str):
+        """Write the JSON sitemap as per-shard files plus an index"""
+        shard_dir = os.path.join(self.output_dir, SITEMAP_SHARD_DIR)
+        loop = asyncio.get_running_loop()
+        with self.metrics.timer("write"):
+            index = await loop.run_in_executor(
+                None,
+                self.ai_sitemap_generator.write_sharded_sitemap,
+                shard_dir,
+                pages_metadata,
+                site_name,
+                self.base_url,
+                self.sitemap_shard_by,
+            )
+
+        for shard in index["shards"]:
+            self._record_file(
+                os.path.join(shard_dir, shard["file"]), None, "application/json"
+            )
+        self._record_file(
+            os.path.join(shard_dir, SHARD_INDEX_FILE), None, "application/json"
+        )
+
     def _get_ai_outputs_summary(self) -> Dict[str, Any]:
         """Get summary of AI-generated outputs"""
         summary = {}
         if not self.output_dir:
             return summary
-        output_dir = Path(self.output_dir)
 
-        # Count files by type
+        counts = self.output_counts
         if "markdown" in self.output_formats:
-            md_files = list(output_dir.glob("**/*.md"))
-            summary["markdown_files"] = len(md_files)
+            summary["markdown_files"] = counts.get("markdown_files", 0)
 
         if "json" in self.output_formats:
-            json_files = list(output_dir.glob("**/*.json"))
-            # Exclude metadata and chunks files from count
-            json_files = [
-                f
-                for f in json_files
-                if not any(x in str(f) for x in ["metadata", "chunks", "summary"])
-            ]
-            summary["json_files"] = len(json_files)
+            summary["json_files"] = counts.get("json_files", 0)
 
         if "chunks" in self.output_formats:
-            chunk_files = list(output_dir.glob("**/chunks.json"))
-            summary["chunk_files"] = len(chunk_files)
+            summary["chunk_files"] = counts.get("chunk_files", 0)
 
         if self.generate_metadata:
-            metadata_files = list(output_dir.glob("**/metadata.json"))
-            schema_files = list(output_dir.glob("**/schema.jsonld"))
-            summary["metadata_files"] = len(metadata_files)
-            summary["schema_files"] = len(schema_files)
+            summary["metadata_files"] = counts.get("metadata_files", 0)
+            summary["schema_files"] = counts.get("schema_files", 0)
 
         # AI summary files
-        ai_files = {
-            "llms.txt": list(output_dir.glob("llms.txt")),
-            "ai-sitemap.json": list(output_dir.glob("ai-sitemap.json")),
-            "ai-index.html": list(output_dir.glob("ai-index.html")),
-            "ai-summary.json": list(output_dir.glob("ai-summary.json")),
+        summary["ai_summary_files"] = {
+            name: counts.get(name, 0) for name in AI_SUMMARY_FILES
         }
 
-        summary["ai_summary_files"] = {k: len(v) for k, v in ai_files.items()}
+        if self.sitemap_shard_by:
+            summary["sitemap_shards"] = counts.get("sitemap_shards", 0)
+
+        if self.page_pack:
+            summary["packed_pages"] = len(self.page_pack.urls)
 
         return summary
 
@@ -281,105 +840,278 @@ class DocumentationCrawler:
             self.errors.append(f"Session not initialized for {url}")
             return
 
+        previous = self._reusable_page(url)
+        headers = self.validator_cache.conditional_headers(url) if previous else None
+
         try:
-            async with self.session.get(url) as response:
-                if response.status != 200:
+            # Only hold a request slot while the body is on the wire, so that
+            # processing and asset downloads never block other workers
+            async with self._request(url, headers) as response:
+                if response.status in RETRYABLE_STATUSES and self._schedule_retry(
+                    url, depth
+                ):
+                    return
+                if response.status == 304 and previous:
+                    reuse = True
+                elif response.status != 200:
                     self.errors.append(f"HTTP {response.status} for {url}")
                     return
-
-                content_type = response.headers.get("content-type", "").lower()
-
-                if "text/html" in content_type:
-                    await self._process_html(url, depth, response)
                 else:
-                    await self._process_asset(url, response, content_type)
+                    reuse = False
+                    content_type = response.headers.get("content-type", "").lower()
+                    validators = self._get_validators(response)
+
+                    with self.metrics.timer("body"):
+                        raw_body = await response.read()
+                    self.metrics.bytes_in += len(raw_body)
+
+                    if "text/html" in content_type:
+                        # Decodes the body read above
+                        body = await response.text()
+                        content_hash = self._hash_content(body.encode("utf-8"))
+                        # Unchanged content served without validator support
+                        reuse = bool(previous) and (
+                            previous.get("content_hash") == content_hash
+                        )
+                    else:
+                        body = raw_body
+
+            if reuse:
+                await self._reuse_page(url, depth, previous)
+            elif "text/html" in content_type:
+                validators["content_hash"] = content_hash
+                await self._process_html(url, depth, body, validators)
+            else:
+                await self._process_asset(url, body, content_type)
 
         except Exception as e:
             self.errors.append(f"Failed to fetch {url}: {str(e)}")
 
-    async def _process_html(self, url: str, depth: int, response):
-        """Process HTML page and extract links"""
-        content = await response.text()
-        soup = BeautifulSoup(content, "html.parser")
+    def _reusable_page(self, url: str) -> Optional[Dict[str, Any]]:
+        """Previous crawl's record for a page if all its outputs can be copied"""
+        record = self.validator_cache.lookup(url)
+        if not record or "links" not in record:
+            return None
+
+        if self.output_mode == "pack":
+            if not self._previous_pack or url not in self._previous_pack:
+                return None
+            packed = {
+                file["extension"] for file in self._previous_pack.get(url)["files"]
+            }
+            if not packed.issuperset(self._page_output_extensions()):
+                return None
+            return record
 
-        # Save HTML file
+        for extension in self._page_output_extensions():
+            relative_path = os.path.relpath(
+                self._get_file_path(url, extension), self.output_dir
+            )
+            if not self.validator_cache.previous_path(relative_path):
+                return None
+
+        return record
+
+    def _page_output_extensions(self) -> List[str]:
+        """Extensions of the files written for every HTML page"""
+        extensions = []
         if "html" in self.output_formats:
-            file_path = self._get_file_path(url, "html")
-            await self._save_file(content, file_path, "text/html")
+            extensions.append("html")
+        if "markdown" in self.output_formats:
+            extensions.append("md")
+        if "json" in self.output_formats:
+            extensions.append("json")
+        if self.generate_metadata:
+            extensions.extend(["metadata.json", "schema.jsonld"])
+        if "chunks" in self.output_formats:
+            extensions.append("chunks.json")
+        return extensions
+
+    async def _reuse_page(self, url: str, depth: int, previous: Dict[str, Any]):
+        """Copy an unchanged page's outputs from the previous crawl"""
+        loop = asyncio.get_running_loop()
+
+        if self.output_mode == "pack":
+            wanted = set(self._page_output_extensions())
+            files = [
+                (file["extension"], file["path"], file["content"])
+                for file in self._previous_pack.get(url)["files"]
+                if file["extension"] in wanted
+            ]
+            await self._pack_page(url, files)
+        else:
+            for extension in self._page_output_extensions():
+                file_path = self._get_file_path(url, extension)
+                source = self.validator_cache.previous_path(
+                    os.path.relpath(file_path, self.output_dir)
+                )
+                with self.metrics.timer("write"):
+                    await loop.run_in_executor(
+                        None, shutil.copyfile, source, file_path
+                    )
+                self._record_file(file_path, url, PAGE_OUTPUT_TYPES[extension])
 
-        # Generate AI-friendly outputs
-        await self._generate_ai_outputs(url, content, soup)
+        self._remember_validators(url, dict(previous))
+        if previous.get("summary"):
+            self.page_summaries[url] = previous["summary"]
+        if previous.get("terms"):
+            self.corpus_stats.add_document(url, previous["terms"])
+        self._count_page(url, reused=True)
 
+        if depth < self.max_depth:
+            self._queue_links(previous["links"], depth + 1)
+
+        await self._fetch_assets(previous.get("assets", []), url)
+
+    def _count_page(self, url: str, reused: bool = False):
+        """Count a downloaded (or reused) page"""
         self.pages_downloaded += 1
+        if reused:
+            self.pages_reused += 1
+        self._unjournaled_pages[url] = reused
 
-        # Extract and queue new URLs
-        if depth < self.max_depth:
-            links = self._extract_links(soup, url)
-            for link in links:
-                if link not in self.visited_urls:
-                    self.pending_urls.append((link, depth + 1))
-                    self.pages_found += 1
+    def _get_validators(self, response) -> Dict[str, Optional[str]]:
+        """Cache validators sent with a response"""
+        return {
+            "etag": response.headers.get("ETag"),
+            "last_modified": response.headers.get("Last-Modified"),
+        }
 
-        # Download assets
-        await self._download_assets(soup, url)
+    def _hash_content(self, content: bytes) -> str:
+        """Content hash used to detect unchanged pages and assets"""
+        return hashlib.sha256(content).hexdigest()
 
-    async def _generate_ai_outputs(self, url: str, content: str, soup: BeautifulSoup):
-        """Generate AI-friendly output formats"""
+    def _schedule_retry(self, url: str, depth: int) -> bool:
+        """Put a throttled page back on the frontier; False once out of retries"""
+        attempts = self._retries.get(url, 0)
+        if attempts >= self.max_retries:
+            return False
 
-        # Generate Markdown
-        if "markdown" in self.output_formats:
-            markdown = self.content_extractor.extract_markdown(soup, self.base_url)
-            markdown_path = self._get_file_path(url, "md")
-            await self._save_file(markdown, markdown_path, "text/markdown")
+        self._retries[url] = attempts + 1
+        self.visited_urls.discard(url)
+        self.frontier.requeue(url, depth)
+        self._work_available.set()
+        return True
 
-        # Generate JSON
-        if "json" in self.output_formats:
-            json_data = self.content_extractor.extract_structured_json(soup, url)
-            json_path = self._get_file_path(url, "json")
-            await self._save_file(
-                json.dumps(json_data, indent=2), json_path, "application/json"
-            )
+    async def _process_html(
+        self,
+        url: str,
+        depth: int,
+        content: str,
+        validators: Optional[Dict[str, Optional[str]]] = None,
+    ):
+        """Process HTML page and extract links"""
+        packed = self.output_mode == "pack"
 
-        # Generate metadata
-        if self.generate_metadata:
-            metadata = self.metadata_generator.generate_page_metadata(
-                url, content, soup
-            )
-            metadata_path = self._get_file_path(url, "metadata.json")
-            await self._save_file(
-                json.dumps(metadata, indent=2), metadata_path, "application/json"
+        # Save HTML file
+        if "html" in self.output_formats and not packed:
+            file_path = self._get_file_path(url, "html")
+            await self._save_file(content, file_path, "text/html", url=url)
+
+        # Parsing and AI-friendly outputs are CPU-bound; keep them off the loop
+        page = await self._run_page_processor(url, content)
+        for stage, seconds in page["timings"].items():
+            self.metrics.observe(stage, seconds)
+        if packed:
+            outputs = page["outputs"]
+            if "html" in self.output_formats:
+                outputs = [("html", content)] + outputs
+            await self._pack_page(
+                url,
+                [
+                    (
+                        extension,
+                        os.path.relpath(
+                            self._get_file_path(url, extension, make_dirs=False),
+                            self.output_dir,
+                        ),
+                        output,
+                    )
+                    for extension, output in outputs
+                ],
             )
+        else:
+            for extension, output in page["outputs"]:
+                output_path = self._get_file_path(url, extension)
+                await self._save_file(
+                    output, output_path, PAGE_OUTPUT_TYPES[extension], url=url
+                )
 
-            # Generate JSON-LD schema
-            jsonld_schema = self.metadata_generator.generate_jsonld_schema(
-                metadata, soup
-            )
-            schema_path = self._get_file_path(url, "schema.jsonld")
-            await self._save_file(
-                json.dumps(jsonld_schema, indent=2), schema_path, "application/ld+json"
-            )
+        self._count_page(url)
 
-        # Generate chunks
-        if "chunks" in self.output_formats:
-            sections = self.content_extractor.extract_structured_json(soup, url).get(
-                "sections", []
-            )
-            chunks = self.content_chunker.chunk_by_sections(sections, url)
+        # Extract and queue new URLs
+        links = page["links"]
+        if depth < self.max_depth:
+            self._queue_links(links, depth + 1)
 
-            # Save chunks as JSON
-            chunks_path = self._get_file_path(url, "chunks.json")
-            await self._save_file(
-                json.dumps(chunks, indent=2), chunks_path, "application/json"
-            )
+        # Download assets
+        assets = page["assets"]
+        await self._fetch_assets(assets, url)
+
+        record = dict(validators or {})
+        record.update(links=links, assets=assets)
+        if page["summary"]:
+            # Kept with the validators so reused and resumed pages have it too
+            record["summary"] = page["summary"]
+            self.page_summaries[url] = page["summary"]
+        if page["terms"]:
+            record["terms"] = page["terms"]
+            self.corpus_stats.add_document(url, page["terms"])
+        self._remember_validators(url, record)
+
+    async def _run_page_processor(self, url: str, content: str) -> Dict[str, Any]:
+        """Parse a page and build its outputs in the process pool"""
+        options = {
+            "base_url": self.base_url,
+            "output_formats": self.output_formats,
+            "generate_metadata": self.generate_metadata,
+            "chunk_size": self.chunk_size,
+            "chunk_overlap": self.chunk_overlap,
+            "include_css": self.include_css,
+            "include_js": self.include_js,
+            "include_images": self.include_images,
+            "parser_backend": self.parser_backend,
+            # The pack is compressed; pretty-printing is restored on export
+            "json_indent": None if self.output_mode == "pack" else 2,
+        }
+        if not self._process_pool:
+            return process_page(url, content, options)
 
-    async def _process_asset(self, url: str, response, content_type: str):
+        loop = asyncio.get_running_loop()
+        pool = self._process_pool
+        try:
+            return await loop.run_in_executor(pool, process_page, url, content, options)
+        except BrokenProcessPool:
+            # A worker died; retry the page once in a new pool
+            self._process_pool = _replace_process_pool(pool)
+
+        pool = self._process_pool
+        try:
+            return await loop.run_in_executor(pool, process_page, url, content, options)
+        except BrokenProcessPool:
+            # Likely this page kills its worker: fail it, but leave other
+            # pages a working pool
+            self._process_pool = _replace_process_pool(pool)
+            raise
+
+    def _queue_links(self, links: List[str], depth: int):
+        """Add links to the frontier and wake idle workers"""
+        queued = False
+        for link in links:
+            if self.frontier.push(link, depth):
+                queued = True
+                if self.journal:
+                    self.journal.url_queued(link, depth)
+        if queued:
+            self._work_available.set()
+
+    async def _process_asset(self, url: str, content: bytes, content_type: str):
         """Process non-HTML assets (images, CSS, JS)"""
         
         # Check for OpenAPI spec
         if self.openapi_parser.can_parse("", url): # URL check first
             try:
-                content_bytes = await response.read()
-                content_str = content_bytes.decode('utf-8')
+                content_str = content.decode('utf-8')
                 
                 if self.openapi_parser.can_parse(content_str, url):
                     parsed_data = self.openapi_parser.parse(content_str, url)
@@ -389,7 +1121,8 @@ class DocumentationCrawler:
                     await self._save_file(
                         json.dumps(parsed_data, indent=2), 
                         tools_path, 
-                        "application/json"
+                        "application/json",
+                        url=url,
                     )
             except Exception as e:
                 # Fallback to normal download if parsing fails
@@ -399,100 +1132,157 @@ class DocumentationCrawler:
             return
 
         file_path = self._get_file_path(url, self._get_file_extension(content_type))
-        # Ensure we haven't already read the stream
-        # (in real implementation, would need to handle stream consumption carefully)
-        # Re-reading response might be an issue if not buffered. 
-        # For this snippet, assuming we can re-read or didn't read if not openapi.
-        
-        # NOTE: aiohttp response.read() caches the result, so calling it again is fine.
-        content = await response.read()
-        await self._save_file(content, file_path, content_type, binary=True)
-
-    async def _download_assets(self, soup: BeautifulSoup, base_url: str):
-        """Download CSS, JS, and image assets"""
-        assets = []
-
-        # CSS files
-        if self.include_css:
-            for link in soup.find_all("link", rel="stylesheet"):
-                href = link.get("href")
-                if href:
-                    assets.append(urljoin(base_url, href))
-
-        # JS files
-        if self.include_js:
-            for script in soup.find_all("script", src=True):
-                src = script.get("src")
-                if src:
-                    assets.append(urljoin(base_url, src))
-
-        # Images - skip all images when include_images is False
-        if self.include_images:
-            for img in soup.find_all("img"):
-                src = img.get("src")
-                if src:
-                    assets.append(urljoin(base_url, src))
-
-        # Optimize HTML for text-only mode
-        if not self.include_images:
-            # Remove img tags entirely to save space and speed up processing
-            for img in soup.find_all("img"):
-                img.decompose()
-
-        if not self.include_fonts:
-            # Remove font-related links and styles
-            for link in soup.find_all("link", rel=lambda x: x and "font" in x.lower()):
-                link.decompose()
+        await self._save_file(content, file_path, content_type, binary=True, url=url)
 
-        # Download assets
+    async def _fetch_assets(self, assets: List[str], page_url: str):
+        """Download the assets referenced by a page concurrently"""
+        new_assets = []
         for asset_url in assets:
             if asset_url not in self.visited_urls:
                 self.visited_urls.add(asset_url)
-                try:
-                    async with self.session.get(asset_url) as response:
-                        if response.status == 200:
-                            content_type = response.headers.get("content-type", "")
-                            content = await response.read()
-                            file_path = self._get_file_path(
-                                asset_url, self._get_file_extension(content_type)
-                            )
-                            await self._save_file(
-                                content, file_path, content_type, binary=True
-                            )
-                except Exception as e:
-                    self.errors.append(
-                        f"Failed to download asset {asset_url}: {str(e)}"
+                new_assets.append(asset_url)
+
+        # Every request still goes through the global and per-host limits
+        await asyncio.gather(
+            *(self._fetch_asset(asset_url, page_url) for asset_url in new_assets)
+        )
+
+    async def _fetch_asset(self, asset_url: str, page_url: str):
+        """Download one asset, recording a failure as a crawl error"""
+        try:
+            await self._download_asset(asset_url, page_url)
+        except Exception as e:
+            self.errors.append(f"Failed to download asset {asset_url}: {str(e)}")
+
+    async def _download_asset(self, asset_url: str, page_url: str):
+        """Fetch a single asset, asking again while the host is throttling us"""
+        previous = self.validator_cache.lookup(asset_url)
+        previous_file = (
+            self.validator_cache.previous_path(previous["file"])
+            if previous and previous.get("file")
+            else None
+        )
+        headers = (
+            self.validator_cache.conditional_headers(asset_url)
+            if previous_file
+            else None
+        )
+
+        for attempt in range(self.max_retries + 1):
+            async with self._request(asset_url, headers) as response:
+                if (
+                    response.status in RETRYABLE_STATUSES
+                    and attempt < self.max_retries
+                ):
+                    # The rate limiter has already paused this host
+                    continue
+                if response.status == 304 and previous_file:
+                    unchanged = True
+                    content_type = previous["content_type"]
+                    record = dict(previous)
+                elif response.status != 200:
+                    return
+                else:
+                    unchanged = False
+                    content_type = response.headers.get("content-type", "")
+                    if not self._accept_asset(content_type, response.content_length):
+                        return
+
+                    file_path = self._get_file_path(
+                        asset_url, self._get_file_extension(content_type)
+                    )
+                    record = self._get_validators(response)
+                    content_hash = await self._stream_asset(response, file_path)
+                    if content_hash is None:
+                        return
+                    record["content_hash"] = content_hash
+            break
+
+        if unchanged:
+            file_path = self._get_file_path(
+                asset_url, self._get_file_extension(content_type)
+            )
+            loop = asyncio.get_running_loop()
+            with self.metrics.timer("write"):
+                if record.get("content_hash"):
+                    await loop.run_in_executor(
+                        None,
+                        self.blob_store.link,
+                        previous_file,
+                        record["content_hash"],
+                        file_path,
                     )
+                else:
+                    await loop.run_in_executor(
+                        None, shutil.copyfile, previous_file, file_path
+                    )
+        self._record_file(file_path, page_url, content_type)
 
-    def _extract_links(self, soup: BeautifulSoup, base_url: str) -> List[str]:
-        """Extract all internal links from HTML"""
-        links = []
+        record.update(
+            file=os.path.relpath(file_path, self.output_dir),
+            content_type=content_type,
+        )
+        self._remember_validators(asset_url, record)
+
+    def _accept_asset(self, content_type: str, content_length: Optional[int]) -> bool:
+        """Decide from the response headers whether an asset is worth fetching"""
+        if not self._should_download_asset(content_type) or (
+            self.max_asset_size
+            and content_length is not None
+            and content_length > self.max_asset_size
+        ):
+            self.assets_skipped += 1
+            return False
+        return True
 
-        for a_tag in soup.find_all("a", href=True):
-            href = a_tag.get("href")
-            if href:
-                # Normalize URL
-                full_url = urljoin(base_url, href)
+    async def _stream_asset(self, response, file_path: str) -> Optional[str]:
+        """Stream a response body into the blob store and link it at file_path
 
-                # Check if it's internal link
-                if self._is_internal_link(full_url):
-                    # Remove fragment and query parameters for comparison
-                    clean_url = full_url.split("#")[0].split("?")[0]
-                    if clean_url not in self.visited_urls:
-                        links.append(clean_url)
+        Returns the body's hash, or None if it is too large.
+        """
+        digest = hashlib.sha256()
+        size = 0
+        part_path = f"{file_path}.part"
+        started = time.perf_counter()
+        write_seconds = 0.0
 
-        return links
+        try:
+            async with aiofiles.open(part_path, "wb") as f:
+                async for chunk in response.content.iter_chunked(ASSET_CHUNK_SIZE):
+                    size += len(chunk)
+                    self.metrics.bytes_in += len(chunk)
+                    # Servers may omit or understate Content-Length
+                    if self.max_asset_size and size > self.max_asset_size:
+                        self.assets_skipped += 1
+                        return None
+                    digest.update(chunk)
+                    write_started = time.perf_counter()
+                    await f.write(chunk)
+                    write_seconds += time.perf_counter() - write_started
+            content_hash = digest.hexdigest()
+            write_started = time.perf_counter()
+            self.blob_store.link(part_path, content_hash, file_path)
+            write_seconds += time.perf_counter() - write_started
+        finally:
+            if os.path.exists(part_path):
+                os.remove(part_path)
+            # Reading and writing interleave; split the time between them
+            self.metrics.observe(
+                "body", time.perf_counter() - started - write_seconds
+            )
+            self.metrics.observe("write", write_seconds)
 
-    def _is_internal_link(self, url: str) -> bool:
-        """Check if URL is internal to the documentation site"""
-        base_domain = urlparse(self.base_url).netloc
-        link_domain = urlparse(url).netloc
+        return content_hash
 
-        # Empty domain means relative link
-        if not link_domain:
-            return True
+    def _remember_validators(self, url: str, record: Dict[str, Any]):
+        """Keep cache validators for the next crawl and in the journal"""
+        self.validator_cache.remember(url, record)
+        if self.journal:
+            self.journal.validators_recorded(url, record)
 
-        return link_domain == base_domain
+    def _is_internal_link(self, url: str) -> bool:
+        """Check if URL is internal to the documentation site"""
+        return is_internal_link(url, self.base_url)
 
     def _should_download_asset(self, content_type: str) -> bool:
         """Check if asset type should be downloaded"""
@@ -538,8 +1328,8 @@ class DocumentationCrawler:
         else:
             return "bin"
 
-    def _get_file_path(self, url: str, extension: str) -> str:
-        """Generate file path for URL"""
+    def _get_file_path(self, url: str, extension: str, make_dirs: bool = True) -> str:
+        """Generate file path for URL, creating its directory unless make_dirs is False"""
         parsed = urlparse(url)
 
         # Ensure output_dir exists
@@ -561,13 +1351,13 @@ class DocumentationCrawler:
         relative_path = re.sub(r"\.[^.]+$", "", relative_path)
 
         # Create directory structure
-        if "/" in relative_path:
+        if make_dirs and "/" in relative_path:
             dirs = relative_path.rsplit("/", 1)[0]
             os.makedirs(os.path.join(self.output_dir, dirs), exist_ok=True)
 
-        # Generate filename
+        # Generate filename (stable across runs so recrawls map to the same files)
         if parsed.query:
-            query_hash = hash(parsed.query) % 10000
+            query_hash = int(hashlib.md5(parsed.query.encode()).hexdigest(), 16) % 10000
             filename = f"{relative_path}_{query_hash}.{extension}"
         else:
             filename = f"{relative_path}.{extension}"
@@ -575,24 +1365,271 @@ class DocumentationCrawler:
         return os.path.join(self.output_dir, filename)
 
     async def _save_file(
-        self, content, file_path: str, content_type: str, binary=False
+        self,
+        content,
+        file_path: str,
+        content_type: str,
+        binary=False,
+        url: Optional[str] = None,
     ):
-        """Save file to disk"""
-        mode = "wb" if binary else "w"
-        encoding = None if binary else "utf-8"
+        """Queue a file for the writers; binary files go through the blob store
+
+        Waits only while the write queue is full.
+        """
+        url = url or self.current_page
+        if self._write_queue is None:
+            # No crawl running (and so no writers): write it now
+            loop = asyncio.get_running_loop()
+            with self.metrics.timer("write"):
+                size = await loop.run_in_executor(
+                    None, self._write_file, content, file_path, binary
+                )
+            self.metrics.bytes_out += size
+            self._record_file(file_path, url, content_type, size=size)
+            return
+
+        self._writes_queued += 1
+        await self._write_queue.put(
+            (self._writes_queued, content, file_path, content_type, binary, url)
+        )
+
+    def _start_writers(self):
+        """Create the write queue and its writer tasks for this crawl"""
+        self._write_queue = asyncio.Queue(self.write_queue_size)
+        self._write_error = None
+        self._writers = [
+            asyncio.create_task(self._writer()) for _ in range(self.write_workers)
+        ]
+        if self.page_pack:
+            self._pack_queue = asyncio.Queue(self.write_queue_size)
+            self._writers.append(asyncio.create_task(self._pack_writer()))
+
+    async def _drain_writes(self):
+        """Wait until every queued file is written; raise if one was not recorded"""
+        await self._write_queue.join()
+        if self._pack_queue is not None:
+            await self._pack_queue.join()
+        if self._write_error is not None:
+            raise self._write_error
+
+    async def _stop_writers(self):
+        """Let the writers drain the queue, then shut them down"""
+        if self._write_queue is None:
+            return
+
+        if not any(writer.done() for writer in self._writers):
+            await self._write_queue.join()
+            if self._pack_queue is not None:
+                await self._pack_queue.join()
+        for writer in self._writers:
+            writer.cancel()
+        await asyncio.gather(*self._writers, return_exceptions=True)
+        self._writers = []
+        self._write_queue = None
+        self._pack_queue = None
+
+    async def _writer(self):
+        """Apply queued writes in batches on a worker thread
+
+        A file that cannot be recorded is reported as an error and skipped,
+        so the queue always drains; _drain_writes then raises the first such
+        failure. Pages from that file on are not journaled as done.
+        """
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._write_queue.get()]
+            while len(batch) < WRITE_BATCH_SIZE and not self._write_queue.empty():
+                batch.append(self._write_queue.get_nowait())
+
+            try:
+                results = await loop.run_in_executor(None, self._write_batch, batch)
+            except BaseException:
+                for _ in batch:
+                    self._write_queue.task_done()
+                raise
+
+            for (sequence, _, file_path, content_type, _, url), (
+                size,
+                seconds,
+            ) in zip(batch, results):
+                try:
+                    self.metrics.observe("write", seconds)
+                    if isinstance(size, Exception):
+                        self.errors.append(f"Failed to write {file_path}: {size}")
+                    else:
+                        self.metrics.bytes_out += size
+                        self._record_file(file_path, url, content_type, size=size)
+                    self._write_finished(sequence)
+                except Exception as e:
+                    self.errors.append(f"Failed to record {file_path}: {str(e)}")
+                    if self._write_error is None:
+                        self._write_error = e
+                finally:
+                    self._write_queue.task_done()
+
+    def _write_batch(self, batch: List[Tuple]) -> List[Tuple[Any, float]]:
+        """Write a batch of queued files; runs on a worker thread
+
+        Returns (size in bytes or the exception raised, seconds) per file.
+        """
+        results = []
+        for _, content, file_path, _, binary, _ in batch:
+            started = time.perf_counter()
+            try:
+                size = self._write_file(content, file_path, binary)
+            except Exception as e:
+                size = e
+            results.append((size, time.perf_counter() - started))
+        return results
+
+    def _write_file(self, content, file_path: str, binary: bool) -> int:
+        """Write one file and return its size in bytes"""
+        if not binary:
+            data = content.encode("utf-8")
+            with open(file_path, "wb") as f:
+                f.write(data)
+            return len(data)
+
+        part_path = f"{file_path}.part"
+        try:
+            with open(part_path, "wb") as f:
+                f.write(content)
+            self.blob_store.link(part_path, self._hash_content(content), file_path)
+        finally:
+            if os.path.exists(part_path):
+                os.remove(part_path)
+        return len(content)
+
+    def _write_finished(self, sequence: int):
+        """Advance the count of files written with no gaps before them"""
+        self._writes_finished.add(sequence)
+        while self._writes_done_through + 1 in self._writes_finished:
+            self._writes_done_through += 1
+            self._writes_finished.remove(self._writes_done_through)
+        self._journal_written_pages()
+
+    def _journal_written_pages(self):
+        """Journal finished pages as done once their files are on disk"""
+        while self._pages_awaiting_writes:
+            url, sequence = self._pages_awaiting_writes[0]
+            if sequence > self._writes_done_through:
+                return
+            self._pages_awaiting_writes.popleft()
+            reused = self._unjournaled_pages.pop(url, None)
+            if reused is not None:
+                self._journaled_progress["pages_downloaded"] += 1
+                self._journaled_progress["pages_reused"] += reused
+            if self.journal:
+                self.journal.url_done(url)
+
+    async def _pack_page(self, url: str, files: List[Tuple[str, str, str]]):
+        """Queue a page's (extension, relative path, content) outputs for the pack
+
+        Waits only while the pack queue is full.
+        """
+        self._writes_queued += 1
+        await self._pack_queue.put((self._writes_queued, url, files))
+
+    async def _pack_writer(self):
+        """Append queued pages to the pack, in order, on a worker thread
+
+        Failures are handled as in _writer.
+        """
+        loop = asyncio.get_running_loop()
+        while True:
+            sequence, url, files = await self._pack_queue.get()
 
-        async with aiofiles.open(file_path, mode, encoding=encoding) as f:
-            await f.write(content)
+            try:
+                added, sizes, seconds = await loop.run_in_executor(
+                    None, self._append_to_pack, url, files
+                )
+            except BaseException:
+                self._pack_queue.task_done()
+                raise
 
-        # Record downloaded file
+            try:
+                self.metrics.observe("write", seconds)
+                if isinstance(added, Exception):
+                    self.errors.append(f"Failed to pack {url}: {added}")
+                    continue
+                self.metrics.bytes_out += added
+                for (extension, relative_path, _), size in zip(files, sizes):
+                    self._record_file(
+                        os.path.join(self.output_dir, relative_path),
+                        url,
+                        PAGE_OUTPUT_TYPES[extension],
+                        size=size,
+                    )
+                self._write_finished(sequence)
+            except Exception as e:
+                self.errors.append(f"Failed to record {url}: {str(e)}")
+                if self._write_error is None:
+                    self._write_error = e
+            finally:
+                self._pack_queue.task_done()
+
+    def _append_to_pack(
+        self, url: str, files: List[Tuple[str, str, str]]
+    ) -> Tuple[Any, List[int], float]:
+        """Append one page to the pack; runs on a worker thread
+
+        Returns (bytes added or the exception raised, size of each output,
+        seconds).
+        """
+        started = time.perf_counter()
+        try:
+            added = self.page_pack.add(url, files)
+        except Exception as e:
+            return e, [], time.perf_counter() - started
+        sizes = [len(content.encode("utf-8")) for _, _, content in files]
+        return added, sizes, time.perf_counter() - started
+
+    def _record_file(
+        self,
+        file_path: str,
+        url: Optional[str],
+        content_type: str,
+        size: Optional[int] = None,
+    ):
+        """Record a file written to the output directory
+
+        `size` is given when the caller already knows it (the writers, and
+        page outputs held in the pack, which have no file of their own at
+        `file_path`); the caller then counts it in bytes_out.
+        """
+        if size is None:
+            size = os.path.getsize(file_path)
+            self.metrics.bytes_out += size
         self.downloaded_files.append(
             {
                 "path": file_path,
-                "url": self.current_page,
+                "url": url,
                 "content_type": content_type,
-                "size": os.path.getsize(file_path),
+                "size": size,
             }
         )
+        self._count_output(file_path)
+        if self.journal:
+            self.journal.file_written(file_path, url, content_type, size)
+
+    def _count_output(self, file_path: str):
+        """Count a recorded file towards _get_ai_outputs_summary"""
+        directory, name = os.path.split(file_path)
+        if name in AI_SUMMARY_FILES and directory == self.output_dir:
+            counter = name
+        elif directory == os.path.join(self.output_dir, SITEMAP_SHARD_DIR):
+            counter = "sitemap_shards" if name != SHARD_INDEX_FILE else None
+        else:
+            counter = next(
+                (
+                    counter
+                    for extension, counter in OUTPUT_COUNTERS.items()
+                    if name.endswith(f".{extension}")
+                ),
+                None,
+            )
+        if counter:
+            self.output_counts[counter] = self.output_counts.get(counter, 0) + 1
 
     async def _generate_index(self):
         """Generate index.html file for navigation"""
@@ -745,16 +1782,29 @@ class DocumentationCrawler:
             "status": "running" if self.is_running else "stopped",
             "pages_found": self.pages_found,
             "pages_downloaded": self.pages_downloaded,
+            "pages_reused": self.pages_reused,
+            "assets_skipped": self.assets_skipped,
             "current_page": self.current_page,
             "errors": self.errors[-10:],  # Last 10 errors
             "start_time": self.start_time.isoformat() if self.start_time else None,
             "elapsed_seconds": elapsed,
             "estimated_completion": estimated_completion,
-            "pending_urls": len(self.pending_urls),
+            "pending_urls": len(self.frontier),
             "visited_urls": len(self.visited_urls),
+            "concurrency": self.concurrency,
+            "active_workers": self._active_workers,
+            "pending_writes": sum(
+                queue.qsize() for queue in (self._write_queue, self._pack_queue) if queue
+            ),
+            "host_concurrency": {
+                host: limit.snapshot() for host, limit in self._host_limits.items()
+            },
+            "rate_limits": self.rate_limiter.snapshot(),
         }
 
     async def stop(self):
         """Stop the crawling process"""
         self.should_stop = True
         self.is_running = False
+        if self._work_available is not None:
+            self._work_available.set()
@@ -33,6 +33,15 @@ def main():
     add_parser.add_argument("path", help="Path to the documentation folder")
     add_parser.add_argument("alias", help="Alias to assign")
 
+    # Resume command
+    resume_parser = subparsers.add_parser("resume", help="Resume an interrupted crawl")
+    resume_parser.add_argument("path", help="Output directory of the interrupted crawl")
+
+    # Export command
+    export_parser = subparsers.add_parser("export", help="Unpack a packed crawl into one file per output")
+    export_parser.add_argument("path", help="Output directory of the packed crawl")
+    export_parser.add_argument("--dest", help="Directory to export to (default: the crawl directory)")
+
     args = parser.parse_args()
     
     manager = LibraryManager()
@@ -105,6 +114,7 @@ def main():
         try:
             from vector_store import VectorStore
             from content_chunker import ContentChunker
+            from page_pack import PagePack, PagePackWriter
             import json
         except ImportError:
             print("Error: Missing dependencies. pip install sentence-transformers numpy", file=sys.stderr)
@@ -121,7 +131,19 @@ def main():
         chunks_path = os.path.join(store_path, "chunks.json")
         chunks = []
         
-        if os.path.exists(chunks_path):
+        if PagePackWriter.exists(store_path):
+            print("Loading chunks from the page pack...")
+            chunker = ContentChunker()
+            with PagePack(store_path) as pack:
+                for url in pack.urls():
+                    page_chunks = pack.read(url, "chunks.json")
+                    if page_chunks:
+                        chunks.extend(json.loads(page_chunks))
+                        continue
+                    markdown = pack.read(url, "md")
+                    if markdown:
+                        chunks.extend(chunker.chunk_markdown_file(markdown, url=url))
+        elif os.path.exists(chunks_path):
             print(f"Loading chunks from {chunks_path}...")
             with open(chunks_path, 'r', encoding='utf-8') as f:
                 chunks = json.load(f)
@@ -167,6 +189,33 @@ def main():
             print("Failed to add to library.", file=sys.stderr)
             sys.exit(1)
 
+    elif args.command == "resume":
+        import asyncio
+        from crawler import DocumentationCrawler
+
+        try:
+            crawler = DocumentationCrawler.resume(args.path)
+        except FileNotFoundError as e:
+            print(f"Error: {e}", file=sys.stderr)
+            sys.exit(1)
+
+        print(f"Resuming crawl of {crawler.base_url} ({len(crawler.frontier)} pages pending)...")
+        result = asyncio.run(crawler.crawl())
+        if not result["success"]:
+            print(f"Crawl failed: {result['errors'][-1]}", file=sys.stderr)
+            sys.exit(1)
+        print(f"Downloaded {result['pages_downloaded']} pages to {result['output_path']}.")
+
+    elif args.command == "export":
+        from file_manager import FileManager
+
+        try:
+            written = FileManager().export_pack(args.path, args.dest)
+        except FileNotFoundError as e:
+            print(f"Error: {e}", file=sys.stderr)
+            sys.exit(1)
+        print(f"Exported {written} files to {args.dest or args.path}.")
+
     else:
         parser.print_help()
 
@@ -5,6 +5,9 @@ from pathlib import Path
 from typing import Dict, List, Optional
 import json
 
+from blob_store import BlobStore
+from page_pack import PagePack, PagePackWriter
+
 class FileManager:
     def __init__(self):
         pass
@@ -85,10 +88,25 @@ class FileManager:
         
         return zip_path
     
-    def cleanup_directory(self, directory: str):
-        """Remove a directory and all its contents"""
+    def cleanup_directory(self, directory: str) -> Dict[str, int]:
+        """Remove a directory and all its contents, then free unused blobs"""
         if os.path.exists(directory):
             shutil.rmtree(directory, ignore_errors=True)
+
+        # Assets shared with other crawls stay until their last user is removed
+        return BlobStore.for_crawl(directory).collect_garbage()
+    
+    def read_page(self, directory: str, url: str, extension: str = "md") -> Optional[str]:
+        """Get one output of a packed page by URL (None if it is not packed)"""
+        if not PagePackWriter.exists(directory):
+            return None
+        with PagePack(directory) as pack:
+            return pack.read(url, extension)
+    
+    def export_pack(self, directory: str, destination: Optional[str] = None) -> int:
+        """Unpack a crawl's packed pages into the one-file-per-output layout"""
+        with PagePack(directory) as pack:
+            return pack.export(destination or directory)
     
     def generate_file_index(self, directory: str) -> Dict:
         """Generate a searchable index of all files"""
@@ -0,0 +1,60 @@
+"""
+HTML Parser Backends
+
+This module picks the tree builder BeautifulSoup uses to parse crawled
+pages. lxml is much faster than Python's built-in html.parser on large
+documentation pages, so it is the default whenever it is installed;
+html.parser remains available as a pure-Python fallback.
+"""
+
+from typing import List, Optional
+
+from bs4 import BeautifulSoup, FeatureNotFound
+
+# Fastest first
+HTML_BACKENDS = ["lxml", "html.parser"]
+
+_available: Optional[List[str]] = None
+
+
+def available_backends() -> List[str]:
+    """Backends that can be used in this environment, fastest first"""
+
+    global _available
+
+    if _available is None:
+        _available = []
+        for backend in HTML_BACKENDS:
+            try:
+                BeautifulSoup("", backend)
+            except FeatureNotFound:
+                continue
+            _available.append(backend)
+    return _available
+
+
+def default_backend() -> str:
+    """The fastest available backend"""
+
+    return available_backends()[0]
+
+
+def resolve_backend(backend: Optional[str] = None) -> str:
+    """Validate a backend name; None selects the default"""
+
+    if backend is None:
+        return default_backend()
+    if backend not in HTML_BACKENDS:
+        raise ValueError(
+            f"Unknown HTML parser backend '{backend}' "
+            f"(expected one of: {', '.join(HTML_BACKENDS)})"
+        )
+    if backend not in available_backends():
+        raise ValueError(f"HTML parser backend '{backend}' is not installed")
+    return backend
+
+
+def parse_html(content, backend: Optional[str] = None) -> BeautifulSoup:
+    """Parse an HTML document with the given (or default) backend"""
+
+    return BeautifulSoup(content, resolve_backend(backend))
@@ -1,15 +1,22 @@
 from fastapi import FastAPI, HTTPException, BackgroundTasks
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse, HTMLResponse
+from fastapi.responses import (
+    FileResponse,
+    HTMLResponse,
+    PlainTextResponse,
+    StreamingResponse,
+)
 from pydantic import BaseModel, HttpUrl
 import asyncio
 import os
 import json
+from collections import deque
 from datetime import datetime
-from typing import Dict, List, Optional
+from typing import Dict, List, Literal, Optional
 import uuid
 import logging
 
+from crawl_metrics import CrawlMetrics, render_prometheus
 from crawler import DocumentationCrawler
 from file_manager import FileManager
 from library_manager import LibraryManager
@@ -26,6 +33,13 @@ app.mount("/static", StaticFiles(directory="static"), name="static")
 # Global state management
 active_crawls: Dict[str, DocumentationCrawler] = {}
 crawl_results: Dict[str, Dict] = {}
+crawl_metrics: Dict[str, CrawlMetrics] = {}
+# Finished crawls keep their own metrics until MAX_FINISHED_METRICS newer
+# ones have finished, then only count towards the "older" totals, so the
+# number of crawl_id label values stays bounded
+MAX_FINISHED_METRICS = 20
+finished_metrics: deque = deque()
+older_metrics = CrawlMetrics()
 library_manager = LibraryManager()
 
 
@@ -38,6 +52,16 @@ class CrawlRequest(BaseModel):
     include_fonts: bool = True
     rate_limit: float = 1.0
     user_agent: str = "DocumentationAgent/1.0"
+    concurrency: int = 4
+    per_host_concurrency: int = 4
+    adaptive_concurrency: bool = False
+    max_asset_size: int = 10 * 1024 * 1024
+    output_mode: Literal["files", "pack"] = "files"
+    sitemap_shard_by: Optional[Literal["content_type", "path"]] = None
+
+
+class ResumeRequest(BaseModel):
+    output_path: str
 
 
 class CrawlStatus(BaseModel):
@@ -69,6 +93,15 @@ async def health_check():
     return {"status": "healthy", "service": "documentation-download-agent"}
 
 
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    """Per-stage crawl timings and byte counters in Prometheus text format"""
+    return PlainTextResponse(
+        render_prometheus({**crawl_metrics, "older": older_metrics}),
+        media_type="text/plain; version=0.0.4; charset=utf-8",
+    )
+
+
 @app.post("/api/start_crawl")
 async def start_crawl(request: CrawlRequest, background_tasks: BackgroundTasks):
     """Start a new documentation crawling process"""
@@ -84,6 +117,12 @@ async def start_crawl(request: CrawlRequest, background_tasks: BackgroundTasks):
         include_fonts=request.include_fonts,
         rate_limit=request.rate_limit,
         user_agent=request.user_agent,
+        concurrency=request.concurrency,
+        per_host_concurrency=request.per_host_concurrency,
+        adaptive_concurrency=request.adaptive_concurrency,
+        max_asset_size=request.max_asset_size,
+        output_mode=request.output_mode,
+        sitemap_shard_by=request.sitemap_shard_by,
     )
 
     active_crawls[crawl_id] = crawler
@@ -98,8 +137,18 @@ async def start_crawl(request: CrawlRequest, background_tasks: BackgroundTasks):
     }
 
 
+def retire_crawl_metrics(crawl_id: str):
+    """Fold the metrics of crawls past the newest finished ones into the totals"""
+    finished_metrics.append(crawl_id)
+    while len(finished_metrics) > MAX_FINISHED_METRICS:
+        metrics = crawl_metrics.pop(finished_metrics.popleft(), None)
+        if metrics is not None:
+            older_metrics.merge(metrics)
+
+
 async def run_crawl(crawl_id: str, crawler: DocumentationCrawler):
     """Run the crawling process in background"""
+    crawl_metrics[crawl_id] = crawler.metrics
     try:
         start_time = datetime.now()
         result = await crawler.crawl()
@@ -112,6 +161,7 @@ async def run_crawl(crawl_id: str, crawler: DocumentationCrawler):
             "file_structure": result.get("file_structure", {}),
             "errors": result.get("errors", []),
             "output_path": result.get("output_path", ""),
+            "metrics": result.get("metrics", {}),
             "completion_time": datetime.now().isoformat(),
         }
 
@@ -146,6 +196,7 @@ async def run_crawl(crawl_id: str, crawler: DocumentationCrawler):
                 logger.error(f"Failed to auto-register to library: {e}")
 
         logger.info(f"Crawl {crawl_id} completed: {result}")
+        crawler.publish("complete", **crawl_results[crawl_id])
 
         # Clean up active crawl
         if crawl_id in active_crawls:
@@ -158,8 +209,11 @@ async def run_crawl(crawl_id: str, crawler: DocumentationCrawler):
             "error": str(e),
             "completion_time": datetime.now().isoformat(),
         }
+        crawler.publish("complete", **crawl_results[crawl_id])
         if crawl_id in active_crawls:
             del active_crawls[crawl_id]
+    finally:
+        retire_crawl_metrics(crawl_id)
 
 
 @app.get("/api/crawl_status/{crawl_id}")
@@ -175,6 +229,54 @@ async def get_crawl_status(crawl_id: str):
         raise HTTPException(status_code=404, detail="Crawl not found")
 
 
+@app.get("/api/crawl_events/{crawl_id}")
+async def stream_crawl_events(crawl_id: str):
+    """Stream crawl progress as Server-Sent Events"""
+    if crawl_id in active_crawls:
+        crawler = active_crawls[crawl_id]
+        # Subscribe now: run_crawl may publish "complete" before the stream
+        # starts, and a later subscriber would wait for it forever
+        queue = crawler.subscribe()
+    elif crawl_id in crawl_results:
+        crawler = None
+    else:
+        raise HTTPException(status_code=404, detail="Crawl not found")
+
+    def format_event(event_type: str, data: Dict) -> str:
+        return f"event: {event_type}\ndata: {json.dumps(data)}\n\n"
+
+    async def event_stream():
+        if crawler is None:
+            yield format_event("complete", crawl_results[crawl_id])
+            return
+
+        try:
+            # Finished before we subscribed: its "complete" event is gone
+            if crawl_id in crawl_results:
+                yield format_event("complete", crawl_results[crawl_id])
+                return
+
+            # Current state first, so late subscribers start in sync
+            yield format_event("status", await crawler.get_status())
+            while True:
+                try:
+                    event = await asyncio.wait_for(queue.get(), timeout=15)
+                except asyncio.TimeoutError:
+                    yield ": keep-alive\n\n"
+                    continue
+                yield format_event(event["type"], event)
+                if event["type"] == "complete":
+                    break
+        finally:
+            crawler.unsubscribe(queue)
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 @app.get("/api/list_files/{crawl_id}")
 async def list_files(crawl_id: str):
     """List all downloaded files for a completed crawl"""
@@ -200,6 +302,21 @@ async def list_files(crawl_id: str):
     }
 
 
+@app.get("/api/page/{crawl_id}", response_class=PlainTextResponse)
+async def get_page(crawl_id: str, url: str, format: str = "md"):
+    """Read one output of a page from a crawl saved in pack mode"""
+    if crawl_id not in crawl_results:
+        raise HTTPException(status_code=404, detail="Crawl not found")
+
+    output_path = crawl_results[crawl_id].get("output_path", "")
+    file_manager = FileManager()
+    content = file_manager.read_page(output_path, url, format)
+    if content is None:
+        raise HTTPException(status_code=404, detail="Page not found in pack")
+
+    return PlainTextResponse(content)
+
+
 @app.get("/api/download_zip/{crawl_id}")
 async def download_zip(crawl_id: str):
     """Generate and download ZIP file of documentation"""
@@ -246,14 +363,48 @@ async def stop_crawl(crawl_id: str):
     }
 
 
+@app.post("/api/resume_crawl")
+async def resume_crawl(request: ResumeRequest, background_tasks: BackgroundTasks):
+    """Resume an interrupted crawl from the journal in its output directory"""
+    # Only crawls this server saved, and not one it is still running
+    output_path = os.path.realpath(request.output_path)
+    downloads = os.path.realpath("downloads")
+    if os.path.dirname(output_path) != downloads:
+        raise HTTPException(status_code=400, detail="Not a crawl in downloads/")
+    for crawler in active_crawls.values():
+        if crawler.output_dir and os.path.realpath(crawler.output_dir) == output_path:
+            raise HTTPException(status_code=409, detail="Crawl is already running")
+
+    try:
+        crawler = DocumentationCrawler.resume(output_path)
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail="Crawl journal not found")
+
+    crawl_id = str(uuid.uuid4())
+    active_crawls[crawl_id] = crawler
+
+    background_tasks.add_task(run_crawl, crawl_id, crawler)
+
+    return {
+        "crawl_id": crawl_id,
+        "status": "started",
+        "message": "Documentation crawling resumed successfully",
+    }
+
+
 @app.delete("/api/cleanup/{crawl_id}")
 async def cleanup_crawl(crawl_id: str):
     """Clean up crawl data and files"""
     # Remove from active crawls if exists
     if crawl_id in active_crawls:
         del active_crawls[crawl_id]
+    # Its metrics stay in the totals; only its own series goes
+    metrics = crawl_metrics.pop(crawl_id, None)
+    if metrics is not None:
+        older_metrics.merge(metrics)
 
     # Remove from results
+    freed = {"blobs_removed": 0, "bytes_freed": 0}
     if crawl_id in crawl_results:
         result = crawl_results[crawl_id]
         output_path = result.get("output_path", "")
@@ -261,7 +412,7 @@ async def cleanup_crawl(crawl_id: str):
         # Clean up files
         if os.path.exists(output_path):
             file_manager = FileManager()
-            file_manager.cleanup_directory(output_path)
+            freed = file_manager.cleanup_directory(output_path)
 
         del crawl_results[crawl_id]
 
@@ -269,6 +420,7 @@ async def cleanup_crawl(crawl_id: str):
         "crawl_id": crawl_id,
         "status": "cleaned",
         "message": "Crawl data cleaned up successfully",
+        **freed,
     }
 
 
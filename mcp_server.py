@@ -1,11 +1,14 @@
 import asyncio
+import json
 import os
 import sys
 import logging
 from typing import Any, List
 
 from mcp.server.fastmcp import FastMCP
+from ai_sitemap_generator import SHARD_INDEX_FILE, load_sitemap_shard
 from library_manager import LibraryManager
+from page_pack import PagePack
 
 # Initialize FastMCP server
 mcp = FastMCP("DocsAI")
@@ -39,6 +42,50 @@ def get_documentation_context(alias: str) -> str:
     except Exception as e:
         return f"Error reading context: {str(e)}"
 
+@mcp.tool()
+def get_documentation_page(alias: str, url: str) -> str:
+    """Get the Markdown of a single page, by URL, from a packed documentation set."""
+    item = library_manager.get_item(alias)
+    if not item:
+        return f"Error: Documentation '{alias}' not found."
+
+    try:
+        with PagePack(item["link_path"]) as pack:
+            content = pack.read(url, "md") or pack.read(url, "html")
+    except FileNotFoundError:
+        return f"Error: '{alias}' was not crawled in pack mode."
+
+    if content is None:
+        return f"Error: No page for '{url}' in {alias}."
+    return content
+
+@mcp.tool()
+def get_documentation_sitemap(alias: str, shard: str = "") -> str:
+    """
+    Get the JSON sitemap of a documentation set. Large sets are split into
+    shards (by content type or path prefix); call without a shard to list
+    them, then fetch only the shard you need.
+    """
+    item = library_manager.get_item(alias)
+    if not item:
+        return f"Error: Documentation '{alias}' not found."
+
+    sitemap_path = os.path.join(item["link_path"], "ai-sitemap.json")
+    shard_dir = os.path.join(item["link_path"], "ai-sitemap")
+    if os.path.isfile(sitemap_path):
+        with open(sitemap_path, "r", encoding="utf-8") as f:
+            return f.read()
+    if not os.path.isfile(os.path.join(shard_dir, SHARD_INDEX_FILE)):
+        return f"Error: No sitemap found for '{alias}'."
+
+    if not shard:
+        with open(os.path.join(shard_dir, SHARD_INDEX_FILE), "r", encoding="utf-8") as f:
+            return f.read()
+    sitemap = load_sitemap_shard(shard_dir, shard)
+    if sitemap is None:
+        return f"Error: No shard '{shard}' in the sitemap of {alias}."
+    return json.dumps(sitemap, indent=2)
+
 @mcp.tool()
 def search_documentation(alias: str, query: str) -> str:
     """
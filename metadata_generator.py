@@ -8,86 +8,92 @@ for better AI consumption and semantic understanding.
 
 import re
 import json
+from collections import Counter
+from itertools import chain
 from typing import Dict, List, Optional, Any
 from bs4 import BeautifulSoup
 from urllib.parse import urlparse
 from datetime import datetime
 
+from page_analysis import DomStats, collect_dom_stats
+from phrase_matcher import PhraseMatcher
+
 
 class MetadataGenerator:
     """Generates rich metadata for documentation pages"""
 
     def __init__(self):
-        # Content type patterns
+        # Content type phrases, matched anywhere in the lowercased text (a
+        # space matches any run of whitespace)
         self.content_patterns = {
             "api_reference": [
-                r"api\s+reference",
-                r"api\s+docs",
-                r"api\s+documentation",
-                r"endpoint",
-                r"method",
-                r"parameter",
-                r"response",
-                r"authentication",
-                r"authorization",
+                "api reference",
+                "api docs",
+                "api documentation",
+                "endpoint",
+                "method",
+                "parameter",
+                "response",
+                "authentication",
+                "authorization",
             ],
             "tutorial": [
-                r"tutorial",
-                r"getting\s+started",
-                r"guide",
-                r"walkthrough",
-                r"learn",
-                r"beginner",
-                r"introduction",
-                r"quick\s+start",
+                "tutorial",
+                "getting started",
+                "guide",
+                "walkthrough",
+                "learn",
+                "beginner",
+                "introduction",
+                "quick start",
             ],
             "faq": [
-                r"faq",
-                r"frequently\s+asked",
-                r"questions?",
-                r"troubleshoot",
-                r"common\s+issues",
-                r"help",
-                r"support",
+                "faq",
+                "frequently asked",
+                "question",
+                "troubleshoot",
+                "common issues",
+                "help",
+                "support",
             ],
             "how_to": [
-                r"how\s+to",
-                r"install",
-                r"setup",
-                r"configure",
-                r"deploy",
-                r"build",
-                r"run",
-                r"create",
-                r"implement",
+                "how to",
+                "install",
+                "setup",
+                "configure",
+                "deploy",
+                "build",
+                "run",
+                "create",
+                "implement",
             ],
             "reference": [
-                r"reference",
-                r"glossary",
-                r"terminology",
-                r"dictionary",
-                r"syntax",
-                r"specification",
-                r"standard",
+                "reference",
+                "glossary",
+                "terminology",
+                "dictionary",
+                "syntax",
+                "specification",
+                "standard",
             ],
             "conceptual": [
-                r"concepts?",
-                r"overview",
-                r"architecture",
-                r"design",
-                r"understanding",
-                r"background",
-                r"theory",
+                "concept",
+                "overview",
+                "architecture",
+                "design",
+                "understanding",
+                "background",
+                "theory",
             ],
             "troubleshooting": [
-                r"troubleshoot",
-                r"debug",
-                r"error",
-                r"fix",
-                r"problem",
-                r"issue",
-                r"solution",
-                r"resolve",
+                "troubleshoot",
+                "debug",
+                "error",
+                "fix",
+                "problem",
+                "issue",
+                "solution",
+                "resolve",
             ],
         }
 
@@ -118,39 +124,158 @@ class MetadataGenerator:
             "platform": ["linux", "macos", "windows", "ios", "android", "web"],
         }
 
+        # Technical terms counted for the complexity score
+        self.technical_terms = [
+            "function",
+            "class",
+            "method",
+            "api",
+            "endpoint",
+            "parameter",
+            "config",
+        ]
+
+        # Common words never used as keywords
+        self.stop_words = {
+            "the",
+            "and",
+            "for",
+            "are",
+            "but",
+            "not",
+            "you",
+            "all",
+            "can",
+            "had",
+            "her",
+            "was",
+            "one",
+            "our",
+            "out",
+            "day",
+            "get",
+            "has",
+            "him",
+            "his",
+            "how",
+            "its",
+            "may",
+            "new",
+            "now",
+            "old",
+            "see",
+            "two",
+            "way",
+            "who",
+            "boy",
+            "did",
+            "her",
+            "his",
+            "let",
+            "put",
+            "say",
+            "she",
+            "too",
+            "use",
+            "that",
+            "with",
+            "have",
+            "this",
+            "will",
+            "your",
+            "from",
+            "they",
+            "know",
+            "want",
+            "been",
+            "good",
+            "much",
+            "some",
+            "time",
+            "very",
+            "when",
+            "come",
+            "here",
+            "just",
+            "like",
+            "long",
+            "make",
+            "many",
+            "over",
+            "such",
+            "take",
+            "than",
+            "them",
+            "well",
+            "were",
+        }
+
+        # Every phrase above, found in a single scan of the page text
+        self._phrase_matcher = PhraseMatcher(
+            set(
+                chain(
+                    *self.content_patterns.values(),
+                    *self.taxonomy_keywords.values(),
+                    self.technical_terms,
+                )
+            )
+        )
+
     def generate_page_metadata(
-        self, url: str, content: str, soup: BeautifulSoup
+        self,
+        url: str,
+        content: str,
+        soup: BeautifulSoup,
+        stats: Optional[DomStats] = None,
+        term_counts: Optional[Counter] = None,
     ) -> Dict[str, Any]:
-        """Generate comprehensive metadata for a documentation page"""
+        """Generate comprehensive metadata for a documentation page
 
-        title = self._extract_title(soup)
-        description = self._extract_description(soup)
+        `stats` come from a PageAnalysis and `term_counts` from count_terms;
+        they are computed here when not given.
+        """
+
+        if stats is None:
+            stats = collect_dom_stats(soup)
+        if term_counts is None:
+            term_counts = self.count_terms(content)
+        title = self._extract_title(stats)
+        description = self._extract_description(stats)
+        phrase_counts = self._count_phrases(title, description, content)
 
         return {
             "url": url,
             "title": title,
             "description": description,
-            "content_type": self._classify_content_type(content, title, description),
-            "taxonomies": self._extract_taxonomies(content, title, url),
+            "content_type": self._classify_content_type(phrase_counts),
+            "taxonomies": self._extract_taxonomies(phrase_counts, title, url),
             "entities": self._extract_entities(content),
-            "version": self._extract_version(content, soup),
-            "last_updated": self._extract_last_updated(soup),
+            "version": self._extract_version(content, stats),
+            "last_updated": self._extract_last_updated(stats),
             "word_count": len(content.split()),
-            "code_blocks_count": len(soup.find_all(["pre", "code"])),
-            "heading_count": len(soup.find_all(["h1", "h2", "h3", "h4", "h5", "h6"])),
-            "link_count": len(soup.find_all("a", href=True)),
-            "image_count": len(soup.find_all("img")),
-            "keywords": self._extract_keywords(content),
+            "code_blocks_count": stats.code_blocks_count,
+            "heading_count": stats.heading_count,
+            "link_count": stats.link_count,
+            "image_count": stats.image_count,
+            "keywords": self._extract_keywords(term_counts),
             "reading_time": self._estimate_reading_time(content),
-            "complexity_score": self._calculate_complexity_score(content, soup),
+            "complexity_score": self._calculate_complexity_score(
+                content, stats, phrase_counts
+            ),
             "metadata_generated": datetime.now().isoformat(),
         }
 
     def generate_jsonld_schema(
-        self, metadata: Dict[str, Any], soup: BeautifulSoup
+        self,
+        metadata: Dict[str, Any],
+        soup: BeautifulSoup,
+        stats: Optional[DomStats] = None,
     ) -> Dict[str, Any]:
         """Generate JSON-LD structured data for the page"""
 
+        if stats is None:
+            stats = collect_dom_stats(soup)
+
         schema = {
             "@context": "https://schema.org",
             "@type": self._get_schema_type(metadata["content_type"]),
@@ -161,11 +286,11 @@ class MetadataGenerator:
 
         # Add content-specific schema properties
         if metadata["content_type"] == "faq":
-            schema.update(self._generate_faq_schema(soup))
+            schema.update(self._generate_faq_schema(stats))
         elif metadata["content_type"] == "how_to":
-            schema.update(self._generate_howto_schema(soup))
+            schema.update(self._generate_howto_schema(stats))
         elif metadata["content_type"] == "api_reference":
-            schema.update(self._generate_api_schema(soup))
+            schema.update(self._generate_api_schema(stats))
 
         # Add common properties
         if metadata.get("last_updated"):
@@ -227,20 +352,47 @@ class MetadataGenerator:
 
         return summary
 
-    def _classify_content_type(self, content: str, title: str, description: str) -> str:
+    def _count_phrases(
+        self, title: str, description: str, content: str
+    ) -> Dict[str, Counter]:
+        """Count every known phrase in one scan of the page text
+
+        Returns "content_types" (counts over the title, description and
+        content), "taxonomies" (matches in the title and content) and
+        "terms" (counts in the content). Like str.count, occurrences of the
+        same phrase are only counted when they do not overlap.
+        """
+
+        title, description, content = title.lower(), description.lower(), content.lower()
+        text = f"{title} {description} {content}"
+        description_start = len(title) + 1
+        content_start = description_start + len(description) + 1
+
+        counts = {"content_types": Counter(), "taxonomies": Counter(), "terms": Counter()}
+        match_ends: Dict[str, int] = {}
+        term_ends: Dict[str, int] = {}
+
+        for start, end, phrase in self._phrase_matcher.finditer(text):
+            if start >= match_ends.get(phrase, 0):
+                counts["content_types"][phrase] += 1
+                match_ends[phrase] = end
+            if not description_start <= start < content_start:
+                counts["taxonomies"][phrase] += 1
+            if start >= content_start and start >= term_ends.get(phrase, 0):
+                counts["terms"][phrase] += 1
+                term_ends[phrase] = end
+
+        return counts
+
+    def _classify_content_type(self, phrase_counts: Dict[str, Counter]) -> str:
         """Classify the content type based on text analysis"""
 
-        # Combine all text for analysis
-        text = f"{title} {description} {content}".lower()
-
         # Score each content type
-        scores = {}
-        for content_type, patterns in self.content_patterns.items():
-            score = 0
-            for pattern in patterns:
-                matches = len(re.findall(pattern, text, re.IGNORECASE))
-                score += matches
-            scores[content_type] = score
+        counts = phrase_counts["content_types"]
+        scores = {
+            content_type: sum(counts[pattern] for pattern in patterns)
+            for content_type, patterns in self.content_patterns.items()
+        }
 
         # Return highest scoring type, or "general" if no clear match
         max_score = max(scores.values()) if scores else 0
@@ -250,18 +402,15 @@ class MetadataGenerator:
         return "general"
 
     def _extract_taxonomies(
-        self, content: str, title: str, url: str
+        self, phrase_counts: Dict[str, Counter], title: str, url: str
     ) -> Dict[str, List[str]]:
         """Extract taxonomy tags from content"""
 
-        text = f"{title} {content}".lower()
+        counts = phrase_counts["taxonomies"]
         taxonomies = {}
 
         for tax_type, keywords in self.taxonomy_keywords.items():
-            matches = []
-            for keyword in keywords:
-                if keyword.lower() in text:
-                    matches.append(keyword)
+            matches = [keyword for keyword in keywords if counts[keyword]]
             if matches:
                 taxonomies[tax_type] = matches
 
@@ -327,49 +476,45 @@ class MetadataGenerator:
 
         return entities
 
-    def _extract_title(self, soup: BeautifulSoup) -> str:
+    def _extract_title(self, stats: DomStats) -> str:
         """Extract page title with fallback logic"""
 
         # Try title tag
-        title_tag = soup.find("title")
-        if title_tag and title_tag.get_text(strip=True):
-            return title_tag.get_text(strip=True)
+        if stats.title:
+            return stats.title
 
         # Try h1
-        h1 = soup.find("h1")
-        if h1 and h1.get_text(strip=True):
-            return h1.get_text(strip=True)
+        if stats.h1:
+            return stats.h1
 
         # Try og:title
-        og_title = soup.find("meta", attrs={"property": "og:title"})
+        og_title = stats.meta_tag("property", "og:title")
         if og_title and og_title.get("content"):
             return og_title["content"]
 
         return "Untitled Page"
 
-    def _extract_description(self, soup: BeautifulSoup) -> str:
+    def _extract_description(self, stats: DomStats) -> str:
         """Extract page description"""
 
         # Try meta description
-        meta_desc = soup.find("meta", attrs={"name": "description"})
+        meta_desc = stats.meta_tag("name", "description")
         if meta_desc and meta_desc.get("content"):
             return meta_desc["content"]
 
         # Try og:description
-        og_desc = soup.find("meta", attrs={"property": "og:description"})
+        og_desc = stats.meta_tag("property", "og:description")
         if og_desc and og_desc.get("content"):
             return og_desc["content"]
 
         # Try first substantial paragraph
-        paragraphs = soup.find_all("p")
-        for p in paragraphs:
-            text = p.get_text(strip=True)
-            if len(text) > 50:  # Substantial content
-                return text[:200] + "..." if len(text) > 200 else text
+        text = stats.lead_paragraph
+        if text:
+            return text[:200] + "..." if len(text) > 200 else text
 
         return ""
 
-    def _extract_version(self, content: str, soup: BeautifulSoup) -> Optional[str]:
+    def _extract_version(self, content: str, stats: DomStats) -> Optional[str]:
         """Extract version information"""
 
         # Try common version patterns
@@ -385,7 +530,7 @@ class MetadataGenerator:
                 return match.group(1) if match.group(1) else match.group(2)
 
         # Try URL path for version
-        url = soup.find("meta", attrs={"property": "og:url"})
+        url = stats.meta_tag("property", "og:url")
         if url:
             url_path = url.get("content", "")
             version_match = re.search(r"/v?(\d+\.\d+)/", url_path)
@@ -394,20 +539,19 @@ class MetadataGenerator:
 
         return None
 
-    def _extract_last_updated(self, soup: BeautifulSoup) -> Optional[str]:
+    def _extract_last_updated(self, stats: DomStats) -> Optional[str]:
         """Extract last updated/modified date"""
 
         # Try common date meta tags
-        date_selectors = [
-            ("meta", {"name": "last-modified"}),
-            ("meta", {"property": "article:modified_time"}),
-            ("meta", {"name": "revised"}),
-            ("time", {"datetime": True}),
-            ("time", {}),
+        date_tags = [
+            stats.meta_tag("name", "last-modified"),
+            stats.meta_tag("property", "article:modified_time"),
+            stats.meta_tag("name", "revised"),
+            stats.dated_time,
+            stats.time,
         ]
 
-        for selector in date_selectors:
-            tag = soup.find(*selector)
+        for tag in date_tags:
             if tag:
                 date_str = tag.get("content") or tag.get("datetime") or tag.get_text()
                 if date_str:
@@ -423,94 +567,21 @@ class MetadataGenerator:
 
         return None
 
-    def _extract_keywords(self, content: str) -> List[str]:
-        """Extract important keywords using TF-IDF style scoring"""
+    def count_terms(self, content: str) -> Counter:
+        """Count a page's keyword candidates: words of 4+ letters, minus stop words
 
-        # Simple keyword extraction (in a real implementation, use proper NLP)
-        words = re.findall(r"\b[a-zA-Z]{4,}\b", content.lower())
+        The counts feed both the page's own keywords and, through the
+        crawler, the corpus-wide keyword ranking in corpus_stats.
+        """
 
-        # Remove common stop words
-        stop_words = {
-            "the",
-            "and",
-            "for",
-            "are",
-            "but",
-            "not",
-            "you",
-            "all",
-            "can",
-            "had",
-            "her",
-            "was",
-            "one",
-            "our",
-            "out",
-            "day",
-            "get",
-            "has",
-            "him",
-            "his",
-            "how",
-            "its",
-            "may",
-            "new",
-            "now",
-            "old",
-            "see",
-            "two",
-            "way",
-            "who",
-            "boy",
-            "did",
-            "her",
-            "his",
-            "let",
-            "put",
-            "say",
-            "she",
-            "too",
-            "use",
-            "that",
-            "with",
-            "have",
-            "this",
-            "will",
-            "your",
-            "from",
-            "they",
-            "know",
-            "want",
-            "been",
-            "good",
-            "much",
-            "some",
-            "time",
-            "very",
-            "when",
-            "come",
-            "here",
-            "just",
-            "like",
-            "long",
-            "make",
-            "many",
-            "over",
-            "such",
-            "take",
-            "than",
-            "them",
-            "well",
-            "were",
-        }
-
-        keywords = [word for word in words if word not in stop_words]
+        words = re.findall(r"\b[a-zA-Z]{4,}\b", content.lower())
+        stop_words = self.stop_words
+        return Counter(word for word in words if word not in stop_words)
 
-        # Count frequency and return top keywords
-        from collections import Counter
+    def _extract_keywords(self, term_counts: Counter) -> List[str]:
+        """The page's most frequent terms"""
 
-        keyword_counts = Counter(keywords)
-        return [word for word, count in keyword_counts.most_common(20)]
+        return [word for word, count in term_counts.most_common(20)]
 
     def _estimate_reading_time(self, content: str) -> int:
         """Estimate reading time in minutes"""
@@ -519,34 +590,25 @@ class MetadataGenerator:
         word_count = len(content.split())
         return max(1, round(word_count / words_per_minute))
 
-    def _calculate_complexity_score(self, content: str, soup: BeautifulSoup) -> float:
+    def _calculate_complexity_score(
+        self, content: str, stats: DomStats, phrase_counts: Dict[str, Counter]
+    ) -> float:
         """Calculate content complexity score (0-10)"""
 
         score = 0
 
         # Code density
-        code_blocks = soup.find_all(["pre", "code"])
-        code_chars = sum(len(block.get_text()) for block in code_blocks)
-        code_ratio = code_chars / len(content) if content else 0
+        code_ratio = stats.code_chars / len(content) if content else 0
         score += code_ratio * 5  # Up to 5 points for code density
 
         # Technical terms (simple heuristic)
-        technical_indicators = [
-            "function",
-            "class",
-            "method",
-            "api",
-            "endpoint",
-            "parameter",
-            "config",
-        ]
-        tech_count = sum(content.lower().count(term) for term in technical_indicators)
+        terms = phrase_counts["terms"]
+        tech_count = sum(terms[term] for term in self.technical_terms)
         tech_score = min(3, tech_count / 10)  # Up to 3 points for technical terms
         score += tech_score
 
-        # Heading complexity
-        headings = soup.find_all(["h1", "h2", "h3", "h4", "h5", "h6"])
-        heading_score = min(2, len(headings) / 5)  # Up to 2 points for structure
+        # Heading complexity (up to 2 points for structure)
+        heading_score = min(2, stats.heading_count / 5)
         score += heading_score
 
         return round(min(10, score), 1)
@@ -566,14 +628,13 @@ class MetadataGenerator:
 
         return schema_mapping.get(content_type, "Article")
 
-    def _generate_faq_schema(self, soup: BeautifulSoup) -> Dict[str, Any]:
+    def _generate_faq_schema(self, stats: DomStats) -> Dict[str, Any]:
         """Generate FAQ schema from page content"""
 
         faqs = []
 
         # Look for common FAQ patterns
-        questions = soup.find_all(["h2", "h3", "h4"])
-        answers = soup.find_all("p")
+        questions = [h for h in stats.headings if h.name in ("h2", "h3", "h4")]
 
         # Simple heuristic: question headings followed by answer paragraphs
         for i, q in enumerate(questions):
@@ -600,13 +661,13 @@ class MetadataGenerator:
 
         return {"mainEntity": faqs} if faqs else {}
 
-    def _generate_howto_schema(self, soup: BeautifulSoup) -> Dict[str, Any]:
+    def _generate_howto_schema(self, stats: DomStats) -> Dict[str, Any]:
         """Generate HowTo schema from page content"""
 
         steps = []
 
         # Look for ordered lists or step indicators
-        ol = soup.find("ol")
+        ol = stats.ordered_list
         if ol:
             for i, li in enumerate(ol.find_all("li")):
                 steps.append(
@@ -619,7 +680,7 @@ class MetadataGenerator:
 
         return {"step": steps} if steps else {}
 
-    def _generate_api_schema(self, soup: BeautifulSoup) -> Dict[str, Any]:
+    def _generate_api_schema(self, stats: DomStats) -> Dict[str, Any]:
         """Generate API reference schema"""
 
         # This would be more complex in a real implementation
@@ -0,0 +1,130 @@
+"""
+Page Analysis for AI-Friendly Documentation
+
+This module defines the intermediate representation built once per page
+by ContentExtractor.analyze_page. The Markdown, JSON, metadata, JSON-LD
+and chunk writers all read from it instead of re-scanning the parsed tree.
+"""
+
+from typing import Any, Dict, List, Optional, Tuple
+
+from bs4 import BeautifulSoup, Tag
+
+HEADING_TAGS = ["h1", "h2", "h3", "h4", "h5", "h6"]
+HEADING_SET = frozenset(HEADING_TAGS)
+
+
+class DomStats:
+    """Structural counts and landmark elements from one walk over a page
+
+    Besides the element counts used for metadata and scoring, this keeps
+    the first occurrence of everything the title, description, version,
+    date and schema lookups would otherwise search the tree for.
+    """
+
+    def __init__(self):
+        self.headings: List[Tag] = []
+        self.code_blocks_count = 0
+        self.code_chars = 0  # Text length of every pre and code element
+        self.link_count = 0
+        self.image_count = 0
+        self.title: Optional[str] = None  # Text of the first <title>
+        self.h1: Optional[str] = None  # Text of the first <h1>
+        self.meta: Dict[Tuple[str, str], Tag] = {}  # First meta per name/property
+        self.first_paragraph: Optional[str] = None
+        self.lead_paragraph: Optional[str] = None  # First <p> over 50 characters
+        self.ordered_list: Optional[Tag] = None  # First <ol>
+        self.time: Optional[Tag] = None  # First <time>
+        self.dated_time: Optional[Tag] = None  # First <time> with a datetime
+
+    @property
+    def heading_count(self) -> int:
+        return len(self.headings)
+
+    def meta_tag(self, attribute: str, value: str) -> Optional[Tag]:
+        """The first <meta> whose `attribute` ("name" or "property") is `value`"""
+
+        return self.meta.get((attribute, value))
+
+    def counts(self) -> Dict[str, int]:
+        """The element counts, as reported in page metadata"""
+
+        return {
+            "code_blocks_count": self.code_blocks_count,
+            "code_chars": self.code_chars,
+            "heading_count": self.heading_count,
+            "link_count": self.link_count,
+            "image_count": self.image_count,
+        }
+
+
+class PageAnalysis:
+    """Everything the output writers need from one parsed page"""
+
+    def __init__(
+        self,
+        url: str,
+        title: str,
+        description: str,
+        sections: List[Dict[str, Any]],
+        code_blocks: List[Dict[str, Any]],
+        links: Dict[str, List[str]],
+        stats: DomStats,
+        main_content: Optional[Tag] = None,
+    ):
+        self.url = url
+        self.title = title
+        self.description = description
+        self.sections = sections  # Heading hierarchy with section text
+        self.code_blocks = code_blocks
+        self.links = links  # {"internal": [...], "external": [...]}
+        self.stats = stats  # Counts and landmarks, see collect_dom_stats
+        self.main_content = main_content  # Cleaned copy of the main content area
+
+
+def collect_dom_stats(soup: BeautifulSoup) -> DomStats:
+    """Walk the parsed tree once and collect a DomStats"""
+
+    stats = DomStats()
+    for element in soup.descendants:
+        if not isinstance(element, Tag):
+            continue
+        name = element.name
+
+        if name in HEADING_SET:
+            stats.headings.append(element)
+            if name == "h1" and stats.h1 is None:
+                stats.h1 = element.get_text(strip=True)
+        elif name == "pre" or name == "code":
+            stats.code_blocks_count += 1
+            stats.code_chars += len(element.get_text())
+        elif name == "a":
+            if element.get("href") is not None:
+                stats.link_count += 1
+        elif name == "img":
+            stats.image_count += 1
+        elif name == "p":
+            if stats.lead_paragraph is None:
+                text = element.get_text(strip=True)
+                if stats.first_paragraph is None:
+                    stats.first_paragraph = text
+                if len(text) > 50:
+                    stats.lead_paragraph = text
+        elif name == "meta":
+            for attribute in ("name", "property"):
+                value = element.get(attribute)
+                if isinstance(value, str):
+                    stats.meta.setdefault((attribute, value), element)
+        elif name == "title":
+            if stats.title is None:
+                stats.title = element.get_text(strip=True)
+        elif name == "ol":
+            if stats.ordered_list is None:
+                stats.ordered_list = element
+        elif name == "time":
+            if stats.time is None:
+                stats.time = element
+            if stats.dated_time is None and element.get("datetime") is not None:
+                stats.dated_time = element
+
+    return stats
@@ -0,0 +1,277 @@
+"""
+Packed Page Output
+
+This module stores each page's outputs (HTML, Markdown, JSON, metadata,
+JSON-LD, chunks) as one zlib-compressed record in an append-only pack file
+inside the crawl directory, instead of up to six small files per page. A
+sidecar index holds one JSON line per record with its URL, offset and
+length, so readers can fetch a page by URL without scanning the pack.
+
+Records are only ever appended. If a page is packed twice (a resumed crawl
+redoes the pages that were in flight) the later record wins. Every record
+starts with its length, so a missing or stale index can be rebuilt from
+the pack. Readers rebuild it in memory and never change the files, since
+a writer may be appending; the writer rewrites the index and drops a
+record cut short by a crash.
+"""
+
+import json
+import os
+import struct
+import zlib
+from typing import Dict, Iterator, List, Optional, Tuple
+
+PACK_FILE = "pages.pack"
+INDEX_FILE = "pages.pack.idx"
+
+# Big-endian payload length in front of every record
+RECORD_HEADER = struct.Struct(">I")
+
+# Outputs stored compact in the pack and pretty-printed again on export
+JSON_EXTENSIONS = {"json", "metadata.json", "schema.jsonld", "chunks.json"}
+
+
+def _encode(url: str, files: List[Tuple[str, str, str]]) -> bytes:
+    record = {
+        "url": url,
+        "files": [
+            {"extension": extension, "path": path, "content": content}
+            for extension, path, content in files
+        ],
+    }
+    return zlib.compress(json.dumps(record).encode("utf-8"))
+
+
+def _decode(payload: bytes) -> Dict:
+    return json.loads(zlib.decompress(payload).decode("utf-8"))
+
+
+def _scan(f, offset: int) -> Iterator[Tuple[str, int, int]]:
+    """Yield (url, offset, length) for the complete records from `offset` on"""
+
+    f.seek(offset)
+    while True:
+        header = f.read(RECORD_HEADER.size)
+        if len(header) < RECORD_HEADER.size:
+            return
+        (length,) = RECORD_HEADER.unpack(header)
+        payload = f.read(length)
+        if len(payload) < length:
+            return
+        try:
+            url = _decode(payload)["url"]
+        except (zlib.error, ValueError, KeyError):
+            return
+        yield url, offset, length
+        offset += RECORD_HEADER.size + length
+
+
+def _read_index(directory: str) -> Tuple[Dict[str, Tuple[int, int]], bool]:
+    """Load the sidecar index; the flag is False if any line was unreadable"""
+
+    entries: Dict[str, Tuple[int, int]] = {}
+    intact = True
+    try:
+        with open(os.path.join(directory, INDEX_FILE), "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                    entries[entry["url"]] = (entry["offset"], entry["length"])
+                except (ValueError, KeyError):
+                    intact = False
+    except FileNotFoundError:
+        intact = False
+    return entries, intact
+
+
+def _index_end(entries: Dict[str, Tuple[int, int]]) -> int:
+    """Pack offset just past the last indexed record"""
+
+    return max(
+        (offset + RECORD_HEADER.size + length for offset, length in entries.values()),
+        default=0,
+    )
+
+
+def _scan_index(directory: str) -> Tuple[Dict[str, Tuple[int, int]], int, bool]:
+    """The index brought in line with the pack, without changing either file
+
+    Returns the index entries in pack order, the end of the last complete
+    record, and whether the index file is missing any of them.
+    """
+
+    pack_path = os.path.join(directory, PACK_FILE)
+    entries, intact = _read_index(directory)
+    pack_size = os.path.getsize(pack_path) if os.path.exists(pack_path) else 0
+
+    # The pack is written before the index, so only the tail can be missing
+    entries = {
+        url: (offset, length)
+        for url, (offset, length) in sorted(entries.items(), key=lambda e: e[1][0])
+        if offset + RECORD_HEADER.size + length <= pack_size
+    }
+    end = _index_end(entries)
+
+    scanned = []
+    if pack_size > end:
+        with open(pack_path, "rb") as f:
+            scanned = list(_scan(f, end))
+        for url, offset, length in scanned:
+            entries.pop(url, None)
+            entries[url] = (offset, length)
+            end = offset + RECORD_HEADER.size + length
+
+    return entries, end, bool(scanned) or not intact
+
+
+def _recover_index(directory: str) -> Dict[str, Tuple[int, int]]:
+    """Bring the index in line with the pack and drop a torn last record
+
+    Only for the writer: a reader could cut off a record being appended.
+    Returns the index entries, in pack order.
+    """
+
+    pack_path = os.path.join(directory, PACK_FILE)
+    index_path = os.path.join(directory, INDEX_FILE)
+    entries, end, stale = _scan_index(directory)
+
+    if os.path.exists(pack_path) and os.path.getsize(pack_path) > end:
+        with open(pack_path, "r+b") as f:
+            f.truncate(end)
+
+    if stale:
+        tmp_path = f"{index_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            for url, (offset, length) in entries.items():
+                f.write(json.dumps({"url": url, "offset": offset, "length": length}))
+                f.write("\n")
+        os.replace(tmp_path, index_path)
+
+    return entries
+
+
+class PagePackWriter:
+    """Appends page records to a crawl directory's pack and index"""
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        # A resumed crawl appends after whatever the last run left intact
+        self.urls = set(_recover_index(directory))
+        self._pack = open(os.path.join(directory, PACK_FILE), "ab")
+        self._index = open(os.path.join(directory, INDEX_FILE), "a", encoding="utf-8")
+        self._offset = self._pack.tell()
+
+    @staticmethod
+    def exists(directory: str) -> bool:
+        """Check whether a crawl directory has packed pages"""
+
+        return os.path.isfile(os.path.join(directory, PACK_FILE))
+
+    def add(self, url: str, files: List[Tuple[str, str, str]]) -> int:
+        """Append a page's (extension, relative path, content) outputs
+
+        Returns the number of bytes added to the pack.
+        """
+
+        payload = _encode(url, files)
+        self._pack.write(RECORD_HEADER.pack(len(payload)))
+        self._pack.write(payload)
+        self._pack.flush()
+
+        entry = {"url": url, "offset": self._offset, "length": len(payload)}
+        self._index.write(json.dumps(entry) + "\n")
+        self._index.flush()
+
+        self._offset += RECORD_HEADER.size + len(payload)
+        self.urls.add(url)
+        return RECORD_HEADER.size + len(payload)
+
+    def close(self):
+        """Flush and close the pack and its index"""
+
+        self._pack.close()
+        self._index.close()
+
+
+class PagePack:
+    """Random access by URL to the pages in a crawl directory's pack"""
+
+    def __init__(self, directory: str):
+        if not PagePackWriter.exists(directory):
+            raise FileNotFoundError(f"No page pack found in {directory}")
+
+        self.directory = directory
+        # Records the index is missing (after a crash between writing a
+        # record and indexing it) are found by scanning past its end
+        self._entries, _, _ = _scan_index(directory)
+        self._pack = open(os.path.join(directory, PACK_FILE), "rb")
+
+    def __enter__(self) -> "PagePack":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, url: str) -> bool:
+        return url in self._entries
+
+    def urls(self) -> List[str]:
+        """URLs of the packed pages, in the order they were written"""
+
+        return list(self._entries)
+
+    def get(self, url: str) -> Optional[Dict]:
+        """A page's record: its URL and a list of files (extension, path, content)"""
+
+        entry = self._entries.get(url)
+        if entry is None:
+            return None
+
+        offset, length = entry
+        self._pack.seek(offset + RECORD_HEADER.size)
+        return _decode(self._pack.read(length))
+
+    def read(self, url: str, extension: str) -> Optional[str]:
+        """One output of a page, such as its "md" or "metadata.json" file"""
+
+        record = self.get(url)
+        if record is None:
+            return None
+        for file in record["files"]:
+            if file["extension"] == extension:
+                return file["content"]
+        return None
+
+    def records(self) -> Iterator[Dict]:
+        """Every page's record, in the order they were written"""
+
+        for url in list(self._entries):
+            yield self.get(url)
+
+    def export(self, destination: str) -> int:
+        """Write the packed pages out in the one-file-per-output layout
+
+        Returns the number of files written.
+        """
+
+        written = 0
+        for record in self.records():
+            for file in record["files"]:
+                path = os.path.join(destination, file["path"])
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+
+                content = file["content"]
+                if file["extension"] in JSON_EXTENSIONS:
+                    content = json.dumps(json.loads(content), indent=2)
+                with open(path, "w", encoding="utf-8") as f:
+                    f.write(content)
+                written += 1
+        return written
+
+    def close(self):
+        """Close the pack file"""
+
+        self._pack.close()
@@ -0,0 +1,213 @@
+"""
+Page Processor for the Documentation Crawler
+
+This module holds the CPU-bound part of crawling a page: parsing the HTML,
+extracting links and assets, and building the AI-friendly outputs
+(Markdown, JSON, metadata, JSON-LD, chunks). It runs in worker processes,
+so everything it takes and returns must be picklable; the crawler only
+gets back the serialized output files, the URLs to follow and how long
+each stage took.
+"""
+
+import json
+import time
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import urljoin, urlparse
+
+from bs4 import BeautifulSoup
+
+from ai_sitemap_generator import summarize_page_metadata
+from content_chunker import ContentChunker
+from content_extractor import ContentExtractor
+from corpus_stats import document_terms
+from html_backend import parse_html
+from metadata_generator import MetadataGenerator
+
+# Generators are created once per worker process and reused across pages
+_content_extractor: Optional[ContentExtractor] = None
+_metadata_generator: Optional[MetadataGenerator] = None
+_content_chunkers: Dict[Tuple[int, float], ContentChunker] = {}
+
+
+def process_page(url: str, content: str, options: Dict[str, Any]) -> Dict[str, Any]:
+    """Parse an HTML page and build its outputs
+
+    Returns a dict with "outputs" (a list of (extension, text) pairs in the
+    order they should be written), "summary" (the page's metadata reduced by
+    summarize_page_metadata, or None without metadata), "terms" (the page's
+    term counts from corpus_stats.document_terms, or None without metadata),
+    "links", "assets" and "timings" (seconds per stage, see
+    crawl_metrics.STAGES).
+    """
+
+    timings: Dict[str, float] = {}
+    started = time.perf_counter()
+    soup = parse_html(content, options["parser_backend"])
+    timings["parse"] = time.perf_counter() - started
+
+    outputs, summary, terms = generate_ai_outputs(url, content, soup, options, timings)
+
+    return {
+        "outputs": outputs,
+        "summary": summary,
+        "terms": terms,
+        "links": extract_links(soup, url, options["base_url"]),
+        "assets": extract_assets(soup, url, options),
+        "timings": timings,
+    }
+
+
+def generate_ai_outputs(
+    url: str,
+    content: str,
+    soup: BeautifulSoup,
+    options: Dict[str, Any],
+    timings: Optional[Dict[str, float]] = None,
+) -> Tuple[
+    List[Tuple[str, str]], Optional[Dict[str, Any]], Optional[Dict[str, Any]]
+]:
+    """Generate AI-friendly output formats, timing each stage into `timings`
+
+    Returns the outputs, the page's metadata summary and its term counts
+    for the corpus statistics (both None when metadata generation is off).
+    """
+
+    content_extractor, metadata_generator, content_chunker = _get_generators(
+        options["chunk_size"], options["chunk_overlap"]
+    )
+    output_formats = options["output_formats"]
+    indent = options.get("json_indent", 2)
+    outputs = []
+    summary = None
+    terms = None
+    if timings is None:
+        timings = {}
+
+    # One analysis pass shared by every output format
+    started = time.perf_counter()
+    analysis = content_extractor.analyze_page(
+        soup,
+        url,
+        options["base_url"],
+        include_main_content="markdown" in output_formats,
+    )
+    timings["extract"] = time.perf_counter() - started
+
+    # Generate Markdown
+    if "markdown" in output_formats:
+        started = time.perf_counter()
+        outputs.append(("md", content_extractor.render_markdown(analysis)))
+        timings["markdown"] = time.perf_counter() - started
+
+    # Generate JSON (a direct dump of the analysis, counted as extraction)
+    if "json" in output_formats:
+        started = time.perf_counter()
+        json_data = content_extractor.render_structured_json(analysis)
+        outputs.append(("json", json.dumps(json_data, indent=indent)))
+        timings["extract"] += time.perf_counter() - started
+
+    # Generate metadata
+    if options["generate_metadata"]:
+        started = time.perf_counter()
+        # Tokenized once for both the page's keywords and the corpus
+        term_counts = metadata_generator.count_terms(content)
+        metadata = metadata_generator.generate_page_metadata(
+            url, content, soup, analysis.stats, term_counts
+        )
+        outputs.append(("metadata.json", json.dumps(metadata, indent=indent)))
+        summary = summarize_page_metadata(metadata)
+        terms = document_terms(term_counts)
+
+        # Generate JSON-LD schema
+        jsonld_schema = metadata_generator.generate_jsonld_schema(
+            metadata, soup, analysis.stats
+        )
+        outputs.append(("schema.jsonld", json.dumps(jsonld_schema, indent=indent)))
+        timings["metadata"] = time.perf_counter() - started
+
+    # Generate chunks
+    if "chunks" in output_formats:
+        started = time.perf_counter()
+        chunks = content_chunker.chunk_by_sections(analysis.sections, url)
+        outputs.append(("chunks.json", json.dumps(chunks, indent=indent)))
+        timings["chunking"] = time.perf_counter() - started
+
+    return outputs, summary, terms
+
+
+def extract_links(soup: BeautifulSoup, page_url: str, base_url: str) -> List[str]:
+    """Extract all internal links from HTML"""
+    links = []
+
+    for a_tag in soup.find_all("a", href=True):
+        href = a_tag.get("href")
+        if href:
+            # Normalize URL
+            full_url = urljoin(page_url, href)
+
+            # Check if it's internal link
+            if is_internal_link(full_url, base_url):
+                # Remove fragment and query parameters for comparison
+                clean_url = full_url.split("#")[0].split("?")[0]
+                links.append(clean_url)
+
+    return links
+
+
+def is_internal_link(url: str, base_url: str) -> bool:
+    """Check if URL is internal to the documentation site"""
+    base_domain = urlparse(base_url).netloc
+    link_domain = urlparse(url).netloc
+
+    # Empty domain means relative link
+    if not link_domain:
+        return True
+
+    return link_domain == base_domain
+
+
+def extract_assets(
+    soup: BeautifulSoup, page_url: str, options: Dict[str, Any]
+) -> List[str]:
+    """Collect the CSS, JS and image URLs a page references"""
+    assets = []
+
+    # CSS files
+    if options["include_css"]:
+        for link in soup.find_all("link", rel="stylesheet"):
+            href = link.get("href")
+            if href:
+                assets.append(urljoin(page_url, href))
+
+    # JS files
+    if options["include_js"]:
+        for script in soup.find_all("script", src=True):
+            src = script.get("src")
+            if src:
+                assets.append(urljoin(page_url, src))
+
+    # Images - skip all images when include_images is False
+    if options["include_images"]:
+        for img in soup.find_all("img"):
+            src = img.get("src")
+            if src:
+                assets.append(urljoin(page_url, src))
+
+    return assets
+
+
+def _get_generators(
+    chunk_size: int, chunk_overlap: float
+) -> Tuple[ContentExtractor, MetadataGenerator, ContentChunker]:
+    global _content_extractor, _metadata_generator
+
+    if _content_extractor is None:
+        _content_extractor = ContentExtractor()
+        _metadata_generator = MetadataGenerator()
+
+    chunker = _content_chunkers.get((chunk_size, chunk_overlap))
+    if chunker is None:
+        chunker = ContentChunker(chunk_size, chunk_overlap)
+        _content_chunkers[(chunk_size, chunk_overlap)] = chunker
+
+    return _content_extractor, _metadata_generator, chunker
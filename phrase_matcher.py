@@ -0,0 +1,76 @@
+"""
+Phrase Matching for Metadata Generation
+
+This module finds every occurrence of a fixed set of phrases in one scan
+of a text. The phrases are merged into a prefix tree that is compiled to
+a single regular expression, so the regex engine skips ahead to the next
+possible phrase start in C. Every match is then walked down the tree to
+report all phrases that start at the same position (such as both "api"
+and "api reference").
+
+Phrases are lowercased and matched against lowercased text. A space in a
+phrase matches any run of whitespace.
+"""
+
+import re
+from typing import Dict, Iterable, Iterator, Tuple
+
+# Key marking the end of a phrase in the prefix tree
+_END = ""
+
+
+class PhraseMatcher:
+    """Finds all occurrences of a set of phrases in one pass"""
+
+    def __init__(self, phrases: Iterable[str]):
+        self._root: Dict[str, dict] = {}
+        for phrase in phrases:
+            key = " ".join(phrase.lower().split())
+            if not key:
+                continue
+            node = self._root
+            for char in key:
+                node = node.setdefault(char, {})
+            node[_END] = phrase
+
+        self._pattern = re.compile(self._to_regex(self._root))
+
+    @classmethod
+    def _to_regex(cls, node: Dict[str, dict]) -> str:
+        branches = [
+            (r"\s+" if char == " " else re.escape(char)) + cls._to_regex(child)
+            for char, child in sorted(node.items())
+            if char != _END
+        ]
+        if not branches:
+            return ""
+
+        regex = branches[0] if len(branches) == 1 else f"(?:{'|'.join(branches)})"
+        # Greedy, so the longest phrase starting at a position is matched
+        return f"(?:{regex})?" if _END in node else regex
+
+    def finditer(self, text: str) -> Iterator[Tuple[int, int, str]]:
+        """Yield (start, end, phrase) for every occurrence in lowercased text
+
+        Occurrences come ordered by start and may overlap, both of different
+        phrases and of the same phrase.
+        """
+
+        search = self._pattern.search
+        match = search(text)
+        while match:
+            start = match.start()
+            node = self._root
+            position = start
+            for char in match.group():
+                if char.isspace():
+                    if position > start and text[position - 1].isspace():
+                        position += 1
+                        continue
+                    char = " "
+                node = node[char]
+                position += 1
+                if _END in node:
+                    yield start, position, node[_END]
+
+            match = search(text, start + 1)
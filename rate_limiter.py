@@ -0,0 +1,213 @@
+"""
+Rate Limiter for the Documentation Crawler
+
+This module provides per-host token buckets that every crawler request
+goes through (pages, assets and OpenAPI specs). Hosts can be slowed down
+by a robots.txt Crawl-delay and paused entirely after a 429/503 response
+carrying a Retry-After header.
+"""
+
+import asyncio
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Any, Dict, Optional
+
+
+class TokenBucket:
+    """Token bucket that refills at `rate` tokens per second up to `capacity`"""
+
+    def __init__(self, rate: float, capacity: float = 1.0):
+        self.rate = rate  # Tokens per second; 0 disables throttling
+        self.capacity = max(1.0, capacity)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+
+    def reserve(self) -> float:
+        """Take one token and return how long the caller must wait for it"""
+
+        now = time.monotonic()
+        wait = max(0.0, self.blocked_until - now)
+
+        if self.rate <= 0:
+            return wait
+
+        # Refill, then let the balance go negative: each caller reserves its
+        # own slot in the future, so concurrent waiters never share a token
+        elapsed = now - self.updated
+        self.tokens = min(self.capacity, self.tokens + elapsed * self.rate)
+        self.updated = now
+        self.tokens -= 1
+
+        if self.tokens < 0:
+            wait = max(wait, -self.tokens / self.rate)
+
+        return wait
+
+    async def acquire(self):
+        """Wait until a request is allowed"""
+
+        wait = self.reserve()
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+    def block_for(self, seconds: float):
+        """Refuse to hand out tokens for the next `seconds` seconds"""
+
+        self.blocked_until = max(self.blocked_until, time.monotonic() + seconds)
+
+
+class HostRateLimiter:
+    """Keeps one token bucket per host"""
+
+    def __init__(
+        self,
+        rate: float,
+        burst: int = 1,
+        base_backoff: float = 1.0,
+        max_backoff: float = 300.0,
+    ):
+        self.rate = rate  # Default requests per second per host
+        self.burst = burst
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+
+        self.buckets: Dict[str, TokenBucket] = {}
+        self.crawl_delays: Dict[str, float] = {}
+        self.strikes: Dict[str, int] = {}
+
+    def bucket(self, host: str) -> TokenBucket:
+        """Get (or create) the bucket for a host"""
+
+        bucket = self.buckets.get(host)
+        if bucket is None:
+            bucket = TokenBucket(self.rate, self.burst)
+            self.buckets[host] = bucket
+        return bucket
+
+    async def acquire(self, host: str):
+        """Wait for permission to send one request to a host"""
+
+        await self.bucket(host).acquire()
+
+    def set_crawl_delay(self, host: str, delay: float):
+        """Apply a robots.txt Crawl-delay (seconds between requests) to a host"""
+
+        if delay <= 0:
+            return
+
+        self.crawl_delays[host] = delay
+        bucket = self.bucket(host)
+        delay_rate = 1.0 / delay
+        if bucket.rate <= 0 or delay_rate < bucket.rate:
+            bucket.rate = delay_rate
+        # A crawl delay means one request at a time, not bursts
+        bucket.capacity = 1.0
+        bucket.tokens = min(bucket.tokens, 1.0)
+
+    def penalize(self, host: str, retry_after: Optional[float] = None) -> float:
+        """Pause a host after a 429/503; returns the pause applied in seconds"""
+
+        strikes = self.strikes.get(host, 0) + 1
+        self.strikes[host] = strikes
+
+        if retry_after is None:
+            delay = self.base_backoff * (2 ** (strikes - 1))
+        else:
+            delay = retry_after
+        delay = min(delay, self.max_backoff)
+
+        self.bucket(host).block_for(delay)
+        return delay
+
+    def record_success(self, host: str):
+        """Reset the backoff for a host after a successful response"""
+
+        self.strikes.pop(host, None)
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """Per-host limiter state for status reporting"""
+
+        now = time.monotonic()
+        return {
+            host: {
+                "requests_per_second": round(bucket.rate, 3) if bucket.rate else None,
+                "tokens": round(max(bucket.tokens, 0.0), 2),
+                "crawl_delay": self.crawl_delays.get(host),
+                "paused_for_seconds": round(max(0.0, bucket.blocked_until - now), 1),
+                "strikes": self.strikes.get(host, 0),
+            }
+            for host, bucket in self.buckets.items()
+        }
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Parse a Retry-After header (delta-seconds or HTTP-date) into seconds"""
+
+    if not value:
+        return None
+
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+
+def _product_token(user_agent: str) -> str:
+    """The lowercased product token of a user agent, without its version"""
+
+    return user_agent.split("/")[0].strip().lower()
+
+
+def parse_crawl_delay(robots_txt: str, user_agent: str) -> Optional[float]:
+    """Return the robots.txt Crawl-delay that applies to `user_agent`
+
+    A group applies when one of its user-agent lines names the crawler's
+    product token (case-insensitively); groups for "*" are the fallback.
+    """
+
+    agent = _product_token(user_agent)
+    specific = None
+    default = None
+
+    group_agents = []
+    in_rules = False
+    for line in robots_txt.splitlines():
+        line = line.split("#", 1)[0].strip()
+        if ":" not in line:
+            continue
+        field, value = [part.strip() for part in line.split(":", 1)]
+        field = field.lower()
+
+        if field == "user-agent":
+            # A user-agent line after rules starts a new group
+            if in_rules:
+                group_agents = []
+                in_rules = False
+            group_agents.append(_product_token(value))
+            continue
+
+        in_rules = True
+        if field != "crawl-delay":
+            continue
+        try:
+            delay = float(value)
+        except ValueError:
+            continue
+
+        for group_agent in group_agents:
+            if group_agent == "*":
+                default = delay if default is None else default
+            elif group_agent == agent and specific is None:
+                specific = delay
+
+    return specific if specific is not None else default
@@ -2,6 +2,8 @@ class DocumentationAgent {
     constructor() {
         this.currentCrawlId = null;
         this.statusInterval = null;
+        this.eventSource = null;
+        this.recentErrors = [];
         this.startTime = null;
         this.fileStructure = null;
         
@@ -48,6 +50,7 @@ class DocumentationAgent {
         this.progressPercentage = document.getElementById('progress-percentage');
         this.progressFill = document.getElementById('progress-fill');
         this.currentPage = document.getElementById('current-page');
+        this.stageTimings = document.getElementById('stage-timings');
         
         // File browser
         this.fileSearch = document.getElementById('file-search');
@@ -244,12 +247,71 @@ class DocumentationAgent {
     }
     
     startStatusMonitoring() {
+        // Prefer the push stream; fall back to polling where it is unavailable
+        if (window.EventSource) {
+            this.startEventStream();
+        } else {
+            this.startPolling();
+        }
+    }
+    
+    startEventStream() {
+        this.recentErrors = [];
+        this.stages = [];
+        this.updateStageTimings();
+        this.eventSource = new EventSource(`/api/crawl_events/${this.currentCrawlId}`);
+        
+        const onStatus = (event) => this.updateStatusDisplay(JSON.parse(event.data));
+        this.eventSource.addEventListener('status', onStatus);
+        this.eventSource.addEventListener('page', onStatus);
+        
+        this.eventSource.addEventListener('crawl_error', (event) => {
+            // Keep the last 10, like the polled status does
+            this.recentErrors = [...this.recentErrors, JSON.parse(event.data).message].slice(-10);
+            this.updateErrorLog(this.recentErrors);
+        });
+        
+        this.eventSource.addEventListener('stage', (event) => {
+            const stage = JSON.parse(event.data);
+            this.stages = [...this.stages, stage];
+            this.updateStageTimings();
+        });
+        
+        this.eventSource.addEventListener('complete', (event) => {
+            const status = JSON.parse(event.data);
+            this.stopStatusMonitoring();
+            this.updateStatusDisplay(status);
+            if (status.errors && status.errors.length > 0) {
+                this.updateErrorLog(status.errors.slice(-10));
+            }
+            this.onCrawlComplete(status);
+        });
+        
+        this.eventSource.onerror = () => {
+            // Connection dropped or streaming is blocked by a proxy
+            console.warn('Progress stream unavailable, falling back to polling');
+            this.closeEventStream();
+            if (this.currentCrawlId) {
+                this.startPolling();
+            }
+        };
+    }
+    
+    closeEventStream() {
+        if (this.eventSource) {
+            this.eventSource.close();
+            this.eventSource = null;
+        }
+    }
+    
+    startPolling() {
         this.statusInterval = setInterval(async () => {
             await this.updateCrawlStatus();
         }, 2000);
     }
     
     stopStatusMonitoring() {
+        this.closeEventStream();
         if (this.statusInterval) {
             clearInterval(this.statusInterval);
             this.statusInterval = null;
@@ -335,6 +397,15 @@ class DocumentationAgent {
         }
     }
     
+    updateStageTimings() {
+        // Finished crawl stages, e.g. "fetch 12.4s · index 0.1s"
+        const names = { fetch: 'fetch', index: 'index', ai_summaries: 'AI summaries' };
+        this.stageTimings.textContent = 'Stages: ' + this.stages
+            .map((stage) => `${names[stage.stage] || stage.stage} ${stage.seconds.toFixed(1)}s`)
+            .join(' · ');
+        this.stageTimings.classList.toggle('hidden', this.stages.length === 0);
+    }
+    
     async onCrawlComplete(status) {
         this.startButton.disabled = false;
         this.stopButton.disabled = true;
@@ -583,6 +654,8 @@ class DocumentationAgent {
         this.progressPercentage.textContent = '0%';
         this.progressFill.style.width = '0%';
         this.currentPage.textContent = 'Ready to crawl';
+        this.stages = [];
+        this.updateStageTimings();
     }
     
     animateCompletion() {
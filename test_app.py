@@ -5,6 +5,7 @@ Tests the basic functionality without starting the full web server
 """
 
 import asyncio
+import json
 import sys
 import os
 
@@ -55,6 +56,15 @@ async def test_crawler():
         print(f"   Path: {file_path}")
         
         print("✅ File path generation working")
+
+        # Test frontier deduplication
+        print("\n🧭 Testing crawl frontier...")
+        for _ in range(3):
+            crawler.frontier.push("https://example.com/docs/page1", 1)
+        print(f"   Pending: {len(crawler.frontier)}, Found: {crawler.pages_found}")
+        assert len(crawler.frontier) == 2 and crawler.pages_found == 2
+
+        print("✅ Frontier deduplication working")
         
     except Exception as e:
         print(f"❌ Crawler test failed: {e}")
@@ -109,6 +119,1135 @@ async def test_file_manager():
     
     return True
 
+PARSER_FIXTURE_HTML = """<!DOCTYPE html>
+<html>
+<head>
+<title>Install Guide</title>
+<meta name="description" content="How to install and configure the example client library.">
+<link rel="stylesheet" href="/static/site.css">
+</head>
+<body>
+<nav class="sidebar"><ul><li><a href="/docs/intro">Intro</a></li></ul></nav>
+<main>
+<h1 id="install">Install Guide</h1>
+<p>This guide explains how to install the client and configure the api endpoint.</p>
+<h2 id="usage">Usage</h2>
+<p>Call <code>client.connect(url)</code> to open a connection to the server.</p>
+<pre><code class="language-python">from example import Client
+client = Client()
+client.connect("https://api.example.com")</code></pre>
+<ul><li>First step</li><li>Second step</li></ul>
+<h3 id="options">Options</h3>
+<ol><li>Set the timeout</li><li>Set the retries</li></ol>
+<p>See the <a href="/docs/reference">reference</a> or <a href="https://github.com/example">GitHub</a>.</p>
+<img src="/static/diagram.png" alt="Diagram">
+</main>
+<footer><p>Copyright</p></footer>
+</body>
+</html>
+"""
+
+
+def test_parser_backends():
+    """Check that every HTML parser backend produces equivalent outputs"""
+    print("\n🧪 Testing HTML Parser Backends...")
+
+    try:
+        from content_extractor import ContentExtractor
+        from html_backend import available_backends, default_backend, parse_html
+        from metadata_generator import MetadataGenerator
+
+        backends = available_backends()
+        print(f"   Available: {', '.join(backends)} (default: {default_backend()})")
+        if len(backends) < 2:
+            print("⚠️  Only one backend installed, nothing to compare")
+            return True
+
+        extractor = ContentExtractor()
+        metadata_generator = MetadataGenerator()
+        url = "https://example.com/docs/install"
+
+        outputs = {}
+        for backend in backends:
+            soup = parse_html(PARSER_FIXTURE_HTML, backend)
+            analysis = extractor.analyze_page(soup, url, "https://example.com/docs")
+            metadata = metadata_generator.generate_page_metadata(
+                url, PARSER_FIXTURE_HTML, soup, analysis.stats
+            )
+            metadata.pop("metadata_generated")
+            outputs[backend] = {
+                "title": analysis.title,
+                "description": analysis.description,
+                "sections": analysis.sections,
+                "code_blocks": analysis.code_blocks,
+                "links": {k: sorted(v) for k, v in analysis.links.items()},
+                "stats": analysis.stats.counts(),
+                "markdown": extractor.render_markdown(analysis),
+                # Entities are de-duplicated through sets, so order varies
+                "entities": {k: sorted(v) for k, v in metadata.pop("entities").items()},
+                "metadata": json.dumps(metadata, sort_keys=True),
+            }
+
+        reference = outputs[backends[0]]
+        for backend in backends[1:]:
+            for key, value in reference.items():
+                assert outputs[backend][key] == value, f"{backend} differs in {key}"
+            print(f"   {backend} matches {backends[0]}")
+
+        print("✅ Parser backends produce equivalent output")
+
+    except Exception as e:
+        print(f"❌ Parser backend test failed: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+    return True
+
+def test_paragraph_chunking():
+    """Check that paragraph chunks are spans of the source text"""
+    print("\n🧪 Testing Paragraph Chunking...")
+
+    try:
+        from content_chunker import ContentChunker
+
+        paragraphs = [
+            f"Paragraph {i} explains one step. It has a second sentence! "
+            f"And a third one? Finally a fourth sentence ends it."
+            for i in range(40)
+        ]
+        markdown = "# Intro\n\nShort intro.\n\n## Guide\n\n" + "\n\n".join(paragraphs)
+        chunker = ContentChunker(chunk_size=100, overlap=0.15)
+        chunks = chunker.chunk_markdown_file(markdown, "https://example.com/guide")
+
+        assert [chunk["metadata"]["chunk_type"] for chunk in chunks[:2]] == [
+            "markdown_section",
+            "paragraph_group",
+        ]
+        for chunk in chunks:
+            metadata = chunk["metadata"]
+            span = markdown[metadata["start_char"] : metadata["end_char"]]
+            assert span == chunk["content"], metadata
+
+        groups = [chunk["metadata"] for chunk in chunks[1:]]
+        assert len(groups) > 5
+        assert groups[0]["start_char"] == markdown.index("## Guide")
+        assert groups[-1]["end_char"] == len(markdown)
+        for previous, following in zip(groups, groups[1:]):
+            # Each chunk repeats the end of the one before it
+            length = previous["end_char"] - previous["start_char"]
+            overlap = previous["end_char"] - following["start_char"]
+            assert 0 < overlap <= length * chunker.overlap
+            assert following["token_count"] <= chunker.chunk_size
+
+        print(f"✅ {len(groups)} overlapping paragraph chunks slice the source text")
+
+    except Exception as e:
+        print(f"❌ Paragraph chunking test failed: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+    return True
+
+def test_boilerplate_removal():
+    """Check that UI elements are removed and unwanted attributes stripped"""
+    print("\n🧪 Testing Boilerplate Removal...")
+
+    try:
+        from bs4 import BeautifulSoup
+        from content_extractor import ContentExtractor
+
+        html = """<html><head><link rel="shortcut icon" href="/i.png">
+<link rel="preload" href="/f.woff"></head><body><nav><a href="/">Home</a></nav>
+<main id="content" class="docs" data-page="1" aria-label="Docs" title="Guide">
+<div class="Site-Sidebar"><p>Links</p></div><p id="mainMenu">Menu</p>
+<p style="color: red" onclick="go()">Keep <a href="page">this</a>.</p>
+<pre class="language-python"><code>print(1)</code></pre><script>x()</script>
+</main><footer>Copyright</footer></body></html>"""
+        soup = BeautifulSoup(html, "html.parser")
+        main = ContentExtractor()._clean_main_content(soup, "https://example.com/docs/")
+
+        assert str(main).split() == [
+            '<main',
+            'title="Guide">',
+            "<p>Keep",
+            '<a',
+            'href="https://example.com/docs/page">this</a>.</p>',
+            "<pre><code>print(1)</code></pre>",
+            "</main>",
+        ], str(main)
+        assert soup.find("nav") is not None, "The original page was modified"
+
+        print("✅ Boilerplate removed in a single pass")
+
+    except Exception as e:
+        print(f"❌ Boilerplate removal test failed: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+    return True
+
+def test_section_extraction():
+    """Check that sections get their content through wrappers and repeated titles"""
+    print("\n🧪 Testing Section Extraction...")
+
+    try:
+        from bs4 import BeautifulSoup
+        from content_extractor import ContentExtractor
+
+        html = """<html><body><article>
+<h1>Tabs</h1><p>Manage tabs.</p>
+<div class="heading"><h2 id="get">get</h2><a href="#get">#</a></div>
+<p>Gets a tab.</p>
+<h3>Parameters</h3><ul><li>tabId</li></ul>
+<div class="heading"><h2 id="query">query</h2></div>
+<p>Finds tabs.</p>
+<h3>Parameters</h3><ul><li>queryInfo</li></ul>
+</article><footer><p>Copyright</p></footer></body></html>"""
+        sections = ContentExtractor()._extract_sections(BeautifulSoup(html, "html.parser"))
+
+        def outline(sections):
+            return [
+                (section["title"], section["content"], outline(section["subsections"]))
+                for section in sections
+            ]
+
+        assert outline(sections) == [
+            (
+                "Tabs",
+                "Manage tabs.",
+                [
+                    ("get", "Gets a tab.", [("Parameters", "• tabId", [])]),
+                    ("query", "Finds tabs.", [("Parameters", "• queryInfo", [])]),
+                ],
+            )
+        ], outline(sections)
+
+        print("✅ Section extraction working")
+
+    except Exception as e:
+        print(f"❌ Section extraction test failed: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+    return True
+
+def test_blob_store():
+    """Check that assets are shared between crawls and freed with the last one"""
+    print("\n🧪 Testing Blob Store...")
+
+    import hashlib
+    import tempfile
+
+    try:
+        from blob_store import BlobStore
+        from file_manager import FileManager
+
+        with tempfile.TemporaryDirectory() as downloads:
+            content = b"body { color: red; }"
+            digest = hashlib.sha256(content).hexdigest()
+            crawls = [os.path.join(downloads, name) for name in ("a_1", "b_2")]
+
+            for crawl_dir in crawls:
+                os.makedirs(crawl_dir)
+                source = os.path.join(crawl_dir, "style.css.part")
+                with open(source, "wb") as f:
+                    f.write(content)
+                BlobStore.for_crawl(crawl_dir).link(
+                    source, digest, os.path.join(crawl_dir, "style.css")
+                )
+                os.remove(source)
+
+            store = BlobStore.for_crawl(crawls[0])
+            assert os.path.isfile(store.path(digest))
+            for crawl_dir in crawls:
+                with open(os.path.join(crawl_dir, "style.css"), "rb") as f:
+                    assert f.read() == content
+
+            file_manager = FileManager()
+            freed = file_manager.cleanup_directory(crawls[0])
+            assert freed["blobs_removed"] == 0, "blob freed while still in use"
+            assert os.path.isfile(store.path(digest))
+
+            freed = file_manager.cleanup_directory(crawls[1])
+            assert freed == {"blobs_removed": 1, "bytes_freed": len(content)}
+            assert not os.path.exists(store.path(digest))
+
+        print("✅ Blob store shares assets and frees unused blobs")
+
+    except Exception as e:
+        print(f"❌ Blob store test failed: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+    return True
+
+def test_page_pack():
+    """Check random access, crash recovery and export of packed pages"""
+    print("\n🧪 Testing Page Pack...")
+
+    import tempfile
+
+    try:
+        from page_pack import INDEX_FILE, PACK_FILE, PagePack, PagePackWriter
+
+        with tempfile.TemporaryDirectory() as crawl_dir:
+            writer = PagePackWriter(crawl_dir)
+            writer.add(
+                "https://example.com/docs/install",
+                [
+                    ("md", "install.md", "# Install"),
+                    ("metadata.json", "install.metadata.json", '{"title": "Install"}'),
+                ],
+            )
+            writer.add("https://example.com/docs", [("md", "index.md", "# Old")])
+            writer.add("https://example.com/docs", [("md", "index.md", "# Home")])
+            writer.close()
+
+            with PagePack(crawl_dir) as pack:
+                assert len(pack) == 2
+                assert pack.read("https://example.com/docs", "md") == "# Home"
+                assert pack.read("https://example.com/docs/install", "html") is None
+            print("   Random access by URL works; the newest record wins")
+
+            # Lose the index and tear the last record, as a crash could
+            os.remove(os.path.join(crawl_dir, INDEX_FILE))
+            with open(os.path.join(crawl_dir, PACK_FILE), "ab") as f:
+                f.write(b"\x00\x00\x01\x00partial")
+
+            # Readers rebuild the index in memory and leave the files alone,
+            # as a writer could be appending to them
+            pack_size = os.path.getsize(os.path.join(crawl_dir, PACK_FILE))
+            with PagePack(crawl_dir) as pack:
+                assert pack.read("https://example.com/docs", "md") == "# Home"
+                assert len(pack) == 2
+            assert os.path.getsize(os.path.join(crawl_dir, PACK_FILE)) == pack_size
+            assert not os.path.exists(os.path.join(crawl_dir, INDEX_FILE))
+
+            writer = PagePackWriter(crawl_dir)
+            writer.add("https://example.com/docs/usage", [("md", "usage.md", "# Usage")])
+            writer.close()
+
+            with PagePack(crawl_dir) as pack:
+                assert pack.urls() == [
+                    "https://example.com/docs/install",
+                    "https://example.com/docs",
+                    "https://example.com/docs/usage",
+                ]
+                assert pack.read("https://example.com/docs/usage", "md") == "# Usage"
+
+                export_dir = os.path.join(crawl_dir, "export")
+                assert pack.export(export_dir) == 4
+            print("   Index rebuilt and torn record dropped after a crash")
+
+            # Pack a record without indexing it: the index is intact but stale
+            writer = PagePackWriter(crawl_dir)
+            writer._index.close()
+            writer._index = open(os.devnull, "w")
+            writer.add("https://example.com/docs/faq", [("md", "faq.md", "# FAQ")])
+            writer.close()
+
+            with PagePack(crawl_dir) as pack:
+                assert pack.read("https://example.com/docs/faq", "md") == "# FAQ"
+                assert len(pack) == 4
+            print("   Records missing from a stale index are recovered")
+
+            with open(os.path.join(export_dir, "install.metadata.json")) as f:
+                assert json.load(f) == {"title": "Install"}
+            with open(os.path.join(export_dir, "index.md")) as f:
+                assert f.read() == "# Home"
+
+        print("✅ Page pack stores, recovers and exports pages")
+
+    except Exception as e:
+        print(f"❌ Page pack test failed: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+    return True
+
+def test_page_summaries():
+    """Check that sitemaps built from page summaries match full metadata"""
+    print("\n🧪 Testing Page Metadata Summaries...")
+
+    import re
+
+    try:
+        from ai_sitemap_generator import AISitemapGenerator, summarize_page_metadata
+
+        pages_metadata = [
+            {
+                "url": "https://example.com/docs/api",
+                "title": "API Reference for Clients",
+                "description": "Every endpoint the client library exposes, with examples",
+                "content_type": "api_reference",
+                "taxonomies": {"topics": ["api"]},
+                "entities": {"api_endpoints": ["GET /users"], "functions": ["get"]},
+                "last_updated": "2024-01-01",
+                "word_count": 1200,
+                "code_blocks_count": 4,
+                "keywords": ["api", "client", "endpoint"],
+                "reading_time": 6,
+                "complexity_score": 0.7,
+            },
+            {
+                "url": "https://example.com/docs/intro",
+                "title": "Introduction",
+                "description": "",
+                "content_type": "conceptual",
+                "entities": {},
+                "last_updated": None,
+                "word_count": 300,
+                "code_blocks_count": 0,
+                "keywords": ["intro"],
+                "reading_time": 2,
+            },
+        ]
+        summaries = [summarize_page_metadata(page) for page in pages_metadata]
+
+        generator = AISitemapGenerator()
+        for render in (
+            lambda pages: generator.generate_llms_txt(pages, "example.com", "https://example.com/docs"),
+            lambda pages: generator.generate_ai_sitemap_json(pages, "example.com", "https://example.com/docs"),
+            generator.generate_summary_report,
+        ):
+            # Generation timestamps are the only expected difference
+            full, compact = (
+                re.sub(r"\d{4}-\d\d-\d\dT[\d:.]+", "<now>", json.dumps(render(pages)))
+                for pages in (pages_metadata, summaries)
+            )
+            assert full == compact
+
+        print("✅ Summaries produce the same sitemaps as full metadata")
+
+    except Exception as e:
+        print(f"❌ Page summary test failed: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+    return True
+
+def test_streaming_sitemaps():
+    """Check streamed and sharded sitemaps against the in-memory ones"""
+    print("\n🧪 Testing Streaming Sitemaps...")
+
+    import io
+    import re
+    import tempfile
+
+    try:
+        from ai_sitemap_generator import AISitemapGenerator, load_sitemap_shard
+
+        base_url = "https://example.com/docs"
+        pages_metadata = [
+            {
+                "url": f"{base_url}/{section}/page{i}",
+                "title": f"{section.title()} page {i}",
+                "content_type": content_type,
+                "word_count": 100 * i,
+            }
+            for i, (section, content_type) in enumerate(
+                [("guide", "tutorial"), ("api", "api_reference"), ("guide", "how_to")]
+            )
+        ]
+        # The site root is sharded as "index", next to the shard index itself
+        pages_metadata.append(
+            {"url": "https://example.com/", "title": "Home", "content_type": "general"}
+        )
+        generator = AISitemapGenerator()
+
+        llms_txt = io.StringIO()
+        generator.write_llms_txt(llms_txt, pages_metadata, "example.com", base_url)
+        expected = generator.generate_llms_txt(pages_metadata, "example.com", base_url)
+        # Only the generation timestamps may differ
+        now = re.compile(r"\d{4}-\d\d-\d\dT[\d:.]+")
+        assert now.sub("", llms_txt.getvalue()) == now.sub("", expected)
+
+        sitemap = io.StringIO()
+        generator.write_ai_sitemap_json(sitemap, pages_metadata, "example.com", base_url)
+        streamed = json.loads(sitemap.getvalue())
+        expected = generator.generate_ai_sitemap_json(pages_metadata, "example.com", base_url)
+        assert streamed["mainEntity"] == expected["mainEntity"]
+        print("   Streamed llms.txt and ai-sitemap.json match")
+
+        with tempfile.TemporaryDirectory() as shard_dir:
+            index = generator.write_sharded_sitemap(
+                shard_dir, pages_metadata, "example.com", base_url, shard_by="path"
+            )
+            assert [(s["name"], s["pages"]) for s in index["shards"]] == [
+                ("api", 1),
+                ("guide", 2),
+                ("index", 1),
+            ]
+            with open(os.path.join(shard_dir, "index.json"), encoding="utf-8") as f:
+                assert json.load(f) == index
+            root = load_sitemap_shard(shard_dir, "index")
+            assert [page["url"] for page in root["mainEntity"]] == [
+                "https://example.com/"
+            ]
+            guide = load_sitemap_shard(shard_dir, "guide")
+            assert [page["url"] for page in guide["mainEntity"]] == [
+                f"{base_url}/guide/page0",
+                f"{base_url}/guide/page2",
+            ]
+            assert load_sitemap_shard(shard_dir, "missing") is None
+        print("   Sharded sitemap splits by path prefix")
+
+        print("✅ Streaming sitemaps working")
+
+    except Exception as e:
+        print(f"❌ Streaming sitemap test failed: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+    return True
+
+def test_phrase_matcher():
+    """Check that one scan finds overlapping phrases and counts like str.count"""
+    print("\n🧪 Testing Phrase Matcher...")
+
+    try:
+        from metadata_generator import MetadataGenerator
+        from phrase_matcher import PhraseMatcher
+
+        matcher = PhraseMatcher(["api", "api reference", "reference", "go", "django"])
+        text = "the api\n  reference for django"
+        found = [(text[start:end], phrase) for start, end, phrase in matcher.finditer(text)]
+        assert found == [
+            ("api", "api"),
+            ("api\n  reference", "api reference"),
+            ("reference", "reference"),
+            ("django", "django"),
+            ("go", "go"),
+        ], found
+
+        generator = MetadataGenerator()
+        content = "Install the API. Then configure the API endpoint for Django."
+        counts = generator._count_phrases("Setup Guide", "How to install", content)
+        lowered = f"setup guide how to install {content.lower()}"
+        for patterns in generator.content_patterns.values():
+            for pattern in patterns:
+                assert counts["content_types"][pattern] == lowered.count(pattern)
+        for term in generator.technical_terms:
+            assert counts["terms"][term] == content.lower().count(term)
+        assert generator._extract_taxonomies(counts, "Setup Guide", "") == {
+            "framework": ["django"],
+            "language": ["go"],
+        }
+
+        print("✅ Phrase matcher working")
+
+    except Exception as e:
+        print(f"❌ Phrase matcher test failed: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+    return True
+
+def test_corpus_keywords():
+    """Check that keywords are ranked against the whole crawl"""
+    print("\n🧪 Testing Corpus Keywords...")
+
+    try:
+        from corpus_stats import CorpusStats, document_terms
+        from metadata_generator import MetadataGenerator
+
+        generator = MetadataGenerator()
+        pages = {
+            "install": "documentation install install package documentation",
+            "deploy": "documentation deploy docker container documentation",
+            "upgrade": "documentation upgrade release notes documentation",
+        }
+        corpus = CorpusStats()
+        for url, text in pages.items():
+            corpus.add_document(url, document_terms(generator.count_terms(text)))
+        assert corpus.document_frequency("documentation") == 3
+
+        # Words on every page rank below the ones that set a page apart
+        keywords = corpus.keywords()
+        assert keywords["install"][:2] == ["install", "package"], keywords
+        assert keywords["deploy"][-1] == "documentation", keywords
+
+        # BM25 by hand, with N=3 and an average length of 3:
+        #   idf(df=1) = ln(1 + 2.5/1.5) = 0.981, idf(df=2) = ln(1 + 1.5/2.5) = 0.470
+        #   a: norm = 1.2 * (0.25 + 0.75 * 5/3) = 1.8
+        #      q = 0.981 * 1 * 2.2 / 2.8 = 0.771, p = 0.470 * 4 * 2.2 / 5.8 = 0.713
+        #   b: p and s score the same and tie alphabetically
+        #   c: norm = 0.9, t = 0.981 * 2.2 / 1.9 = 1.136, s = 0.470 * 2.2 / 1.9 = 0.544
+        scored = CorpusStats()
+        scored.add_document("a", {"length": 5, "counts": "p:4 q:1"})
+        scored.add_document("b", {"length": 2, "counts": "p:1 s:1"})
+        scored.add_document("c", {"length": 2, "counts": "s:1 t:1"})
+        assert scored.keywords() == {"a": ["q", "p"], "b": ["p", "s"], "c": ["t", "s"]}
+        assert scored.keywords(1) == {"a": ["q"], "b": ["p"], "c": ["t"]}
+
+        # Re-adding a page replaces its terms
+        corpus.add_document("install", document_terms(generator.count_terms("docker")))
+        assert corpus.document_frequency("documentation") == 2
+        assert corpus.document_frequency("install") == 0
+        assert corpus.document_frequency("docker") == 2
+
+        print("✅ Corpus keywords working")
+
+    except Exception as e:
+        print(f"❌ Corpus keywords test failed: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+    return True
+
+def test_rate_limiting():
+    """Check token buckets, Retry-After and robots.txt Crawl-delay parsing"""
+    print("\n🧪 Testing Rate Limiting...")
+
+    try:
+        from datetime import datetime, timedelta, timezone
+        from email.utils import format_datetime
+        from rate_limiter import TokenBucket, parse_crawl_delay, parse_retry_after
+
+        # A burst of two, then one token every 0.1 seconds
+        bucket = TokenBucket(rate=10, capacity=2)
+        waits = [bucket.reserve() for _ in range(4)]
+        assert waits[:2] == [0.0, 0.0], waits
+        assert 0.09 < waits[2] <= 0.1 and 0.19 < waits[3] <= 0.2, waits
+
+        bucket = TokenBucket(rate=0)
+        assert bucket.reserve() == 0.0
+        bucket.block_for(5)
+        assert 4.9 < bucket.reserve() <= 5
+        print("   Token buckets space out requests and honour pauses")
+
+        assert parse_retry_after("120") == 120.0
+        assert parse_retry_after(" 7 ") == 7.0
+        retry_at = datetime.now(timezone.utc) + timedelta(seconds=60)
+        assert 55 < parse_retry_after(format_datetime(retry_at, usegmt=True)) <= 60
+        past = datetime.now(timezone.utc) - timedelta(hours=1)
+        assert parse_retry_after(format_datetime(past, usegmt=True)) == 0.0
+        assert parse_retry_after("soon") is None
+        assert parse_retry_after("") is None and parse_retry_after(None) is None
+        print("   Retry-After parsed in seconds and HTTP-date forms")
+
+        robots_txt = """
+User-agent: Agent
+Crawl-delay: 30
+
+User-agent: documentationagent
+User-agent: OtherBot
+Disallow: /private
+Crawl-delay: 2 # seconds
+
+User-agent: *
+Crawl-delay: 10
+"""
+        assert parse_crawl_delay(robots_txt, "DocumentationAgent/1.0") == 2.0
+        assert parse_crawl_delay(robots_txt, "Agent/2.0") == 30.0
+        # Substrings of the product token no longer match
+        assert parse_crawl_delay(robots_txt, "DocumentationAgentPro/1.0") == 10.0
+        assert parse_crawl_delay("User-agent: Doc\nCrawl-delay: 5", "Doc/1.0") == 5.0
+        assert parse_crawl_delay("User-agent: Doc\nCrawl-delay: 5", "Docs/1.0") is None
+        print("   Crawl-delay matched by product token, with * as the fallback")
+
+        print("✅ Rate limiting working")
+
+    except Exception as e:
+        print(f"❌ Rate limiting test failed: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+    return True
+
+async def test_adaptive_concurrency():
+    """Check AIMD limits and that waiters never lose a wakeup"""
+    print("\n🧪 Testing Adaptive Concurrency...")
+
+    try:
+        from concurrency_controller import AdaptiveConcurrencyLimit
+
+        limit = AdaptiveConcurrencyLimit(initial=2, minimum=1, maximum=4, window=4)
+
+        # Additive increase while p95 latency stays flat, up to the ceiling
+        for expected in [3, 4, 4]:
+            for _ in range(4):
+                limit.record_response(200, 0.1)
+            assert limit.current_limit == expected, limit.snapshot()
+
+        # No increase once latency grows beyond the tolerance
+        limit.limit = 3
+        for _ in range(4):
+            limit.record_response(200, 0.5)
+        assert limit.current_limit == 3
+
+        # Multiplicative decrease, once per round of requests, down to the floor
+        limit.record_response(503, 0.1)
+        assert limit.current_limit == 1 and limit.limit == 1.5
+        limit.record_failure()
+        assert limit.limit == 1.5, "Cut twice for the same round"
+        limit.record_response(200, 0.1)
+        limit.record_failure()
+        limit.record_response(200, 0.1)
+        limit.record_response(429, 0.1)
+        assert limit.limit == 1 and limit.decreases == 3, limit.snapshot()
+        print("   AIMD increases, decreases and stays within its bounds")
+
+        # A woken waiter that is cancelled passes its slot on
+        limit = AdaptiveConcurrencyLimit(initial=1, adaptive=False)
+        await limit.acquire()
+        first = asyncio.create_task(limit.acquire())
+        second = asyncio.create_task(limit.acquire())
+        await asyncio.sleep(0)
+
+        limit.release()
+        first.cancel()
+        await asyncio.wait_for(second, timeout=1)
+        assert first.cancelled() and limit.in_flight == 1
+        print("   Cancelled waiters hand their wakeup to the next one")
+
+        print("✅ Adaptive concurrency working")
+
+    except Exception as e:
+        print(f"❌ Adaptive concurrency test failed: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+    return True
+
+async def test_conditional_recrawl():
+    """Check that a 304 reuses the previous crawl's files and validators"""
+    print("\n🧪 Testing Conditional Recrawl...")
+
+    try:
+        import tempfile
+        from contextlib import asynccontextmanager
+        from types import SimpleNamespace
+        from crawl_cache import ValidatorCache, find_previous_crawl
+        from crawler import DocumentationCrawler
+
+        url = "https://example.com/docs/guide"
+        record = {
+            "etag": '"v1"',
+            "last_modified": "Mon, 05 Oct 2026 10:00:00 GMT",
+            "content_hash": "abc",
+            "links": ["https://example.com/docs/next"],
+            "assets": [],
+            "summary": {"url": url, "title": "Guide"},
+        }
+        outputs = {
+            "html": "<html><body>Guide</body></html>",
+            "metadata.json": '{"title": "Guide"}',
+            "schema.jsonld": '{"@type": "TechArticle"}',
+        }
+
+        with tempfile.TemporaryDirectory() as parent:
+            # The previous crawl of the site, and an older one it supersedes
+            previous_dir = os.path.join(parent, "example_com_20261017_120000")
+            older_dir = os.path.join(parent, "example_com_20261001_120000")
+            for directory, records in [(previous_dir, {url: record}), (older_dir, {})]:
+                os.makedirs(directory)
+                cache = ValidatorCache()
+                cache.current.update(records)
+                cache.save(directory)
+            for extension, content in outputs.items():
+                with open(os.path.join(previous_dir, f"guide.{extension}"), "w") as f:
+                    f.write(content)
+
+            output_dir = os.path.join(parent, "example_com_20261018_120000")
+            os.makedirs(output_dir)
+            assert find_previous_crawl(output_dir) == previous_dir
+
+            crawler = DocumentationCrawler(
+                base_url="https://example.com/docs", max_depth=2, process_workers=0
+            )
+            crawler.output_dir = output_dir
+            crawler.validator_cache = ValidatorCache.from_latest_crawl(output_dir)
+            crawler.session = object()
+            crawler._work_available = asyncio.Event()
+
+            sent_headers = []
+
+            @asynccontextmanager
+            async def not_modified(request_url, headers=None):
+                sent_headers.append(headers)
+                yield SimpleNamespace(status=304, headers={})
+
+            crawler._request = not_modified
+            await crawler._process_page(url, 0)
+
+            assert sent_headers == [
+                {
+                    "If-None-Match": '"v1"',
+                    "If-Modified-Since": "Mon, 05 Oct 2026 10:00:00 GMT",
+                }
+            ], sent_headers
+            assert not crawler.errors, crawler.errors
+            assert crawler.pages_downloaded == 1 and crawler.pages_reused == 1
+            for extension, content in outputs.items():
+                with open(os.path.join(output_dir, f"guide.{extension}")) as f:
+                    assert f.read() == content, extension
+            assert len(crawler.downloaded_files) == len(outputs)
+            assert crawler.page_summaries[url] == record["summary"]
+            assert "https://example.com/docs/next" in [u for u, _ in crawler.frontier]
+            print("   304 copied the previous outputs and queued the known links")
+
+            # The validators carry over to the next crawl
+            crawler.validator_cache.save(output_dir)
+            assert ValidatorCache(output_dir).previous == {url: record}
+            print("   Validators saved again for the next recrawl")
+
+        print("✅ Conditional recrawl working")
+
+    except Exception as e:
+        print(f"❌ Conditional recrawl test failed: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+    return True
+
+async def test_shared_process_pool():
+    """Check that crawls share one page processing pool, replaced if it breaks"""
+    print("\n🧪 Testing Shared Process Pool...")
+
+    try:
+        from concurrent.futures.process import BrokenProcessPool
+        import crawler
+
+        first = crawler._acquire_process_pool(1)
+        second = crawler._acquire_process_pool(4)
+        assert first is second, "Each crawl started its own pool"
+
+        crawler._release_process_pool()
+        assert crawler._process_pool is first, "Shut down while still in use"
+        assert first.submit(sum, [1, 2, 3]).result(timeout=30) == 6
+
+        crawler._release_process_pool()
+        assert crawler._process_pool is None and crawler._process_pool_users == 0
+        assert crawler._acquire_process_pool(1) is not first
+        crawler._release_process_pool()
+
+        print("✅ Crawls share one process pool, shut down by the last")
+
+        # A worker that dies breaks the pool; the next page gets a new one
+        docs = crawler.DocumentationCrawler(
+            base_url="https://example.com/docs", process_workers=1
+        )
+        broken = docs._process_pool = crawler._acquire_process_pool(1)
+        try:
+            broken.submit(os._exit, 1).result(timeout=30)
+        except BrokenProcessPool:
+            pass
+        try:
+            page = await docs._run_page_processor(
+                "https://example.com/docs/guide",
+                "<html><body><h1>Guide</h1><p>Text.</p></body></html>",
+            )
+            assert page["outputs"], page
+            assert docs._process_pool is crawler._process_pool
+            assert docs._process_pool is not broken
+            assert crawler._process_pool_users == 1
+        finally:
+            crawler._release_process_pool()
+        assert crawler._process_pool is None
+
+        print("✅ A broken process pool is replaced and the page retried")
+
+    except Exception as e:
+        print(f"❌ Shared process pool test failed: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+    return True
+
+async def test_crawl_resume():
+    """Check that a crawl killed mid-way resumes without redoing or recounting pages"""
+    print("\n🧪 Testing Crawl Resume...")
+
+    try:
+        import sqlite3
+        import tempfile
+        from contextlib import asynccontextmanager
+        from crawl_journal import JOURNAL_FILE
+        from crawler import DocumentationCrawler
+
+        base_url = "https://example.com/docs"
+        page_urls = [f"{base_url}/p{i}" for i in range(1, 6)]
+        links = "".join(f'<a href="{url}">{url}</a>' for url in page_urls)
+        site = {base_url: f"<html><body><h1>Docs</h1>{links}</body></html>"}
+        for url in page_urls:
+            site[url] = f"<html><body><h1>{url}</h1><p>Page text.</p></body></html>"
+
+        class FakeResponse:
+            status = 200
+            headers = {"content-type": "text/html"}
+
+            def __init__(self, body):
+                self.body = body
+
+            async def read(self):
+                return self.body.encode("utf-8")
+
+            async def text(self):
+                return self.body
+
+        def serve(crawler, fetched, on_fetch=None):
+            @asynccontextmanager
+            async def request(url, headers=None):
+                fetched.append(url)
+                if on_fetch:
+                    on_fetch(url)
+                # Let the writers catch up, as they would during a real fetch
+                await asyncio.sleep(0.01)
+                yield FakeResponse(site[url])
+
+            crawler._request = request
+
+        cwd = os.getcwd()
+        with tempfile.TemporaryDirectory() as parent:
+            os.chdir(parent)
+            try:
+                crawler = DocumentationCrawler(
+                    base_url=base_url,
+                    max_depth=1,
+                    concurrency=1,
+                    output_formats=["html"],
+                    generate_metadata=False,
+                    process_workers=0,
+                )
+                killed_dir = os.path.join(parent, "killed")
+
+                def kill_before_fourth_page(url):
+                    # What a crash would leave: only what the journal committed
+                    if url != page_urls[3]:
+                        return
+                    os.makedirs(killed_dir)
+                    source = sqlite3.connect(
+                        os.path.join(crawler.output_dir, JOURNAL_FILE)
+                    )
+                    target = sqlite3.connect(os.path.join(killed_dir, JOURNAL_FILE))
+                    source.backup(target)
+                    source.close()
+                    target.close()
+
+                fetched = []
+                serve(crawler, fetched, kill_before_fourth_page)
+                result = await crawler.crawl()
+                assert result["pages_downloaded"] == len(site)
+
+                resumed = DocumentationCrawler.resume(killed_dir)
+                done = [url for url in site if url in resumed.visited_urls]
+                pending = [url for url, _ in resumed.frontier]
+                assert done and pending
+                assert set(done) | set(pending) == set(site)
+                assert page_urls[3] in pending
+                print(f"✅ Resumed with {len(done)} done, {len(pending)} pending")
+
+                # Pages counted before the kill but not journaled as done are
+                # counted again when they are reprocessed, not twice
+                assert resumed.pages_downloaded == len(done)
+
+                refetched = []
+                serve(resumed, refetched)
+                result = await resumed.crawl()
+                assert sorted(refetched) == sorted(pending)
+                assert result["pages_downloaded"] == len(site)
+                assert result["output_path"] == killed_dir
+                print("✅ Done pages skipped, pending pages fetched, counts exact")
+            finally:
+                os.chdir(cwd)
+
+        return True
+
+    except Exception as e:
+        print(f"❌ Crawl resume test failed: {e}")
+        import traceback
+
+        traceback.print_exc()
+        return False
+
+async def test_write_failures():
+    """Check that a file the writers cannot record fails the crawl, not hangs it"""
+    print("\n🧪 Testing Write Failures...")
+
+    try:
+        import tempfile
+        from crawler import DocumentationCrawler
+
+        with tempfile.TemporaryDirectory() as output_dir:
+            crawler = DocumentationCrawler(
+                base_url="https://example.com/docs", write_workers=1
+            )
+            crawler.output_dir = output_dir
+            record_file = crawler._record_file
+
+            def record_file_failing(file_path, *args, **kwargs):
+                if file_path.endswith("b.md"):
+                    raise OSError("journal unavailable")
+                record_file(file_path, *args, **kwargs)
+
+            crawler._record_file = record_file_failing
+            crawler._start_writers()
+            try:
+                for name in ["a.md", "b.md", "c.md"]:
+                    path = os.path.join(output_dir, name)
+                    await crawler._save_file(name, path, "text/markdown")
+
+                try:
+                    await asyncio.wait_for(crawler._drain_writes(), timeout=5)
+                    raise AssertionError("The recording failure was not raised")
+                except OSError:
+                    pass
+            finally:
+                await crawler._stop_writers()
+
+            recorded = [os.path.basename(f["path"]) for f in crawler.downloaded_files]
+            assert recorded == ["a.md", "c.md"], recorded
+            assert any("Failed to record" in error for error in crawler.errors)
+            # Files queued after the failed one are not counted as written
+            assert crawler._writes_done_through == 1
+
+        print("✅ Writers drain the queue and report recording failures")
+
+    except Exception as e:
+        print(f"❌ Write failures test failed: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+    return True
+
+async def test_packed_crawl():
+    """Check that pack mode appends pages through the writer stage"""
+    print("\n🧪 Testing Packed Crawl...")
+
+    try:
+        import tempfile
+        import threading
+        from contextlib import asynccontextmanager
+        from crawl_journal import CrawlJournal
+        from crawler import DocumentationCrawler
+        from page_pack import PagePack, PagePackWriter
+
+        base_url = "https://example.com/docs"
+        page_urls = [f"{base_url}/p{i}" for i in range(1, 4)]
+        links = "".join(f'<a href="{url}">{url}</a>' for url in page_urls)
+        site = {base_url: f"<html><body><h1>Docs</h1>{links}</body></html>"}
+        for url in page_urls:
+            site[url] = f"<html><body><h1>{url}</h1><p>Page text.</p></body></html>"
+
+        class FakeResponse:
+            status = 200
+            headers = {"content-type": "text/html"}
+
+            def __init__(self, body):
+                self.body = body
+
+            async def read(self):
+                return self.body.encode("utf-8")
+
+            async def text(self):
+                return self.body
+
+        # Record which threads append to the pack
+        add = PagePackWriter.add
+        threads = set()
+
+        def add_recording_thread(pack, url, files):
+            threads.add(threading.get_ident())
+            return add(pack, url, files)
+
+        cwd = os.getcwd()
+        with tempfile.TemporaryDirectory() as parent:
+            os.chdir(parent)
+            PagePackWriter.add = add_recording_thread
+            try:
+                crawler = DocumentationCrawler(
+                    base_url=base_url,
+                    max_depth=1,
+                    output_formats=["html", "markdown"],
+                    generate_metadata=False,
+                    process_workers=0,
+                    output_mode="pack",
+                )
+
+                @asynccontextmanager
+                async def request(url, headers=None):
+                    yield FakeResponse(site[url])
+
+                crawler._request = request
+                result = await crawler.crawl()
+            finally:
+                PagePackWriter.add = add
+                os.chdir(cwd)
+
+            output_dir = os.path.join(parent, result["output_path"])
+            assert result["pages_downloaded"] == len(site)
+            assert threads and threading.get_ident() not in threads
+            with PagePack(output_dir) as pack:
+                assert sorted(pack.urls()) == sorted(site)
+                assert pack.read(page_urls[0], "html") == site[page_urls[0]]
+            print("✅ Pages packed off the event loop")
+
+            journal = CrawlJournal(output_dir)
+            try:
+                assert sorted(journal.done_urls()) == sorted(site)
+                assert journal.get("progress")["pages_downloaded"] == len(site)
+            finally:
+                journal.close()
+            print("✅ Packed pages journaled as done")
+
+        return True
+
+    except Exception as e:
+        print(f"❌ Packed crawl test failed: {e}")
+        import traceback
+
+        traceback.print_exc()
+        return False
+
+def test_metrics_totals():
+    """Check that merged crawl metrics keep every count"""
+    print("\n🧪 Testing Metrics Totals...")
+
+    try:
+        from crawl_metrics import CrawlMetrics, render_prometheus
+
+        older = CrawlMetrics()
+        for seconds in (0.003, 0.2):
+            metrics = CrawlMetrics()
+            metrics.observe("write", seconds)
+            metrics.bytes_in += 100
+            metrics.record_response(200)
+            older.merge(metrics)
+        metrics.record_response(404)
+        older.merge(metrics)
+
+        assert older.stages["write"].count == 3
+        assert older.stages["write"].counts[0] == 1
+        assert older.bytes_in == 300
+        assert older.responses == {200: 3, 404: 1}
+        text = render_prometheus({"older": older})
+        assert 'docs_crawl_responses_total{crawl_id="older",code="200"} 3' in text
+        print("✅ Merged metrics keep every count")
+
+    except Exception as e:
+        print(f"❌ Metrics totals test failed: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+    return True
+
 def test_directory_structure():
     """Test the directory structure"""
     print("\n📂 Testing Directory Structure...")
@@ -159,14 +1298,108 @@ async def run_all_tests():
     
     # Test file manager
     file_manager_ok = await test_file_manager()
+
+    # Test parser backends
+    parser_backends_ok = test_parser_backends()
+
+    # Test paragraph chunking
+    paragraph_chunking_ok = test_paragraph_chunking()
+
+    # Test boilerplate removal
+    boilerplate_removal_ok = test_boilerplate_removal()
+
+    # Test section extraction
+    section_extraction_ok = test_section_extraction()
+
+    # Test blob store
+    blob_store_ok = test_blob_store()
+
+    # Test page pack
+    page_pack_ok = test_page_pack()
+
+    # Test page metadata summaries
+    page_summaries_ok = test_page_summaries()
+
+    # Test streaming sitemaps
+    streaming_sitemaps_ok = test_streaming_sitemaps()
+
+    # Test phrase matcher
+    phrase_matcher_ok = test_phrase_matcher()
+
+    # Test corpus keywords
+    corpus_keywords_ok = test_corpus_keywords()
+    
+    # Test rate limiting
+    rate_limiting_ok = test_rate_limiting()
+    
+    # Test adaptive concurrency
+    adaptive_concurrency_ok = await test_adaptive_concurrency()
+    
+    # Test conditional recrawl
+    conditional_recrawl_ok = await test_conditional_recrawl()
+    
+    # Test shared process pool
+    shared_process_pool_ok = await test_shared_process_pool()
+    
+    # Test crawl resume
+    crawl_resume_ok = await test_crawl_resume()
+    
+    # Test write failures
+    write_failures_ok = await test_write_failures()
+    
+    # Test packed crawl
+    packed_crawl_ok = await test_packed_crawl()
+    
+    # Test metrics totals
+    metrics_totals_ok = test_metrics_totals()
     
     print("\n📊 Test Results Summary")
     print("=" * 30)
     print(f"Directory Structure: {'✅ PASS' if structure_ok else '❌ FAIL'}")
     print(f"Crawler: {'✅ PASS' if crawler_ok else '❌ FAIL'}")
     print(f"File Manager: {'✅ PASS' if file_manager_ok else '❌ FAIL'}")
+    print(f"Parser Backends: {'✅ PASS' if parser_backends_ok else '❌ FAIL'}")
+    print(f"Paragraph Chunking: {'✅ PASS' if paragraph_chunking_ok else '❌ FAIL'}")
+    print(f"Boilerplate Removal: {'✅ PASS' if boilerplate_removal_ok else '❌ FAIL'}")
+    print(f"Section Extraction: {'✅ PASS' if section_extraction_ok else '❌ FAIL'}")
+    print(f"Blob Store: {'✅ PASS' if blob_store_ok else '❌ FAIL'}")
+    print(f"Page Pack: {'✅ PASS' if page_pack_ok else '❌ FAIL'}")
+    print(f"Page Summaries: {'✅ PASS' if page_summaries_ok else '❌ FAIL'}")
+    print(f"Streaming Sitemaps: {'✅ PASS' if streaming_sitemaps_ok else '❌ FAIL'}")
+    print(f"Phrase Matcher: {'✅ PASS' if phrase_matcher_ok else '❌ FAIL'}")
+    print(f"Corpus Keywords: {'✅ PASS' if corpus_keywords_ok else '❌ FAIL'}")
+    print(f"Rate Limiting: {'✅ PASS' if rate_limiting_ok else '❌ FAIL'}")
+    print(f"Adaptive Concurrency: {'✅ PASS' if adaptive_concurrency_ok else '❌ FAIL'}")
+    print(f"Conditional Recrawl: {'✅ PASS' if conditional_recrawl_ok else '❌ FAIL'}")
+    print(f"Shared Process Pool: {'✅ PASS' if shared_process_pool_ok else '❌ FAIL'}")
+    print(f"Crawl Resume: {'✅ PASS' if crawl_resume_ok else '❌ FAIL'}")
+    print(f"Write Failures: {'✅ PASS' if write_failures_ok else '❌ FAIL'}")
+    print(f"Packed Crawl: {'✅ PASS' if packed_crawl_ok else '❌ FAIL'}")
+    print(f"Metrics Totals: {'✅ PASS' if metrics_totals_ok else '❌ FAIL'}")
     
-    all_passed = structure_ok and crawler_ok and file_manager_ok
+    all_passed = (
+        structure_ok
+        and crawler_ok
+        and file_manager_ok
+        and parser_backends_ok
+        and paragraph_chunking_ok
+        and boilerplate_removal_ok
+        and section_extraction_ok
+        and blob_store_ok
+        and page_pack_ok
+        and page_summaries_ok
+        and streaming_sitemaps_ok
+        and phrase_matcher_ok
+        and corpus_keywords_ok
+        and rate_limiting_ok
+        and adaptive_concurrency_ok
+        and conditional_recrawl_ok
+        and shared_process_pool_ok
+        and crawl_resume_ok
+        and write_failures_ok
+        and packed_crawl_ok
+        and metrics_totals_ok
+    )
     
     if all_passed:
         print(f"\n🎉 All tests passed! The application should work correctly.")